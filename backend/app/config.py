@@ -14,6 +14,33 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./insyte.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Optional read replica for dashboard and analytics reads
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+if DATABASE_READ_URL and DATABASE_READ_URL.startswith("postgres://"):
+    DATABASE_READ_URL = DATABASE_READ_URL.replace("postgres://", "postgresql://", 1)
+# Reads fall back to the primary when the replica lags more than this
+READ_REPLICA_MAX_LAG_SECONDS = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "30"))
+# Seconds between heartbeat writes to the primary and lag checks on the replica
+READ_REPLICA_CHECK_SECONDS = float(os.getenv("READ_REPLICA_CHECK_SECONDS", "5"))
+
+# Engine profile: "auto" picks "sqlite" or "postgres" from DATABASE_URL;
+# "sqlite-baseline"/"postgres-baseline" keep the driver defaults (see
+# app/database.py and benchmark_db.py)
+DB_PROFILE = os.getenv("DB_PROFILE", "auto")
+# Postgres connection pool per process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Seconds to wait for a free connection, and before a connection is replaced
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Postgres statement_timeout in milliseconds (0 disables it)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+# SQLite page cache in KiB, memory-mapped I/O size in bytes, and how long a
+# writer waits for the lock in milliseconds
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
 # API Keys
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 STRIPE_API_KEY = os.getenv("STRIPE_API_KEY")
@@ -21,10 +48,68 @@ STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 CALENDLY_API_KEY = os.getenv("CALENDLY_API_KEY")
 CALENDLY_WEBHOOK_SECRET = os.getenv("CALENDLY_WEBHOOK_SECRET")
 
+# Third-party API base URLs
+# Point every integration at the local simulator (python simulator.py),
+# e.g. API_SIMULATOR_URL=http://localhost:8010; the per-API settings below
+# override it individually
+API_SIMULATOR_URL = os.getenv("API_SIMULATOR_URL", "").rstrip("/")
+
+def _api_base_url(name: str, default: str, simulator_path: str) -> str:
+    if os.getenv(name):
+        return os.getenv(name).rstrip("/")
+    if API_SIMULATOR_URL:
+        return f"{API_SIMULATOR_URL}{simulator_path}"
+    return default
+
+YOUTUBE_API_BASE_URL = _api_base_url("YOUTUBE_API_BASE_URL", "https://www.googleapis.com/youtube/v3", "/youtube/v3")
+YOUTUBE_ANALYTICS_BASE_URL = _api_base_url("YOUTUBE_ANALYTICS_BASE_URL", "https://youtubeanalytics.googleapis.com/v2", "/youtubeanalytics/v2")
+GOOGLE_OAUTH_BASE_URL = _api_base_url("GOOGLE_OAUTH_BASE_URL", "https://oauth2.googleapis.com", "/oauth2")
+STRIPE_API_BASE_URL = _api_base_url("STRIPE_API_BASE_URL", "https://api.stripe.com", "/stripe")
+CALENDLY_API_BASE_URL = _api_base_url("CALENDLY_API_BASE_URL", "https://api.calendly.com", "/calendly")
+
+# Outbound HTTP client shared by the third-party integrations
+# Seconds to establish a connection / to wait for response data
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+# Retries after a 429/5xx or connection error, with jittered exponential backoff
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.5"))
+# Keep-alive connections kept per host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+# Consecutive failures that open a service's circuit breaker, and seconds
+# it fails fast before letting a trial request through
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+
+# Third-party API health checks
+# Seconds a cached result is served before the background task refreshes it
+API_HEALTH_TTL_SECONDS = int(os.getenv("API_HEALTH_TTL_SECONDS", "300"))
+# Hard deadline in seconds for one round of checks
+API_HEALTH_TIMEOUT_SECONDS = float(os.getenv("API_HEALTH_TIMEOUT_SECONDS", "5"))
+
+# Runtime health probes (/status/runtime)
+# Seconds between event-loop lag samples and between database pings
+RUNTIME_PROBE_INTERVAL_SECONDS = float(os.getenv("RUNTIME_PROBE_INTERVAL_SECONDS", "1"))
+RUNTIME_DB_PING_SECONDS = float(os.getenv("RUNTIME_DB_PING_SECONDS", "5"))
+
+# Query instrumentation (Server-Timing, /status/queries)
+# Statements slower than this many milliseconds go to the slow-query log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))
+# Log the EXPLAIN plan of slow SELECTs
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+# Warn when one request runs the same statement more than this many times
+QUERY_REPEAT_WARN_THRESHOLD = int(os.getenv("QUERY_REPEAT_WARN_THRESHOLD", "10"))
+
+# Prometheus metrics: the API serves /metrics itself; the worker serves
+# its own on this port (0 disables it)
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+
 # YouTube OAuth
 YOUTUBE_CLIENT_ID = os.getenv("YOUTUBE_CLIENT_ID")
 YOUTUBE_CLIENT_SECRET = os.getenv("YOUTUBE_CLIENT_SECRET")
 YOUTUBE_REDIRECT_URI = os.getenv("YOUTUBE_REDIRECT_URI", "http://localhost:8001/api/v1/auth/youtube/callback")
+# Cached access tokens are refreshed this many minutes before they expire
+YOUTUBE_TOKEN_REFRESH_MARGIN_MINUTES = int(os.getenv("YOUTUBE_TOKEN_REFRESH_MARGIN_MINUTES", "5"))
 
 # Security
 SECRET_KEY = os.getenv("SECRET_KEY", "default-insecure-key")
@@ -63,4 +148,77 @@ APP_VERSION = "0.1.0"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
 
 # Scheduled task settings
-YOUTUBE_REFRESH_INTERVAL = int(os.getenv("YOUTUBE_REFRESH_INTERVAL", "6")) 
\ No newline at end of file
+YOUTUBE_REFRESH_INTERVAL = int(os.getenv("YOUTUBE_REFRESH_INTERVAL", "6")) 
+
+# YouTube fetch layer
+# Parallel videos.list requests during a refresh
+YOUTUBE_MAX_CONCURRENCY = int(os.getenv("YOUTUBE_MAX_CONCURRENCY", "4"))
+# Per-request timeout in seconds
+YOUTUBE_REQUEST_TIMEOUT = float(os.getenv("YOUTUBE_REQUEST_TIMEOUT", "10"))
+# Upper bound on request starts per second across all concurrent requests
+YOUTUBE_MAX_REQUESTS_PER_SECOND = float(os.getenv("YOUTUBE_MAX_REQUESTS_PER_SECOND", "10"))
+# SQLite file holding cached API responses and their ETags
+YOUTUBE_CACHE_PATH = os.getenv("YOUTUBE_CACHE_PATH", "./youtube_cache.db")
+# Least recently used responses are evicted beyond this many entries
+YOUTUBE_CACHE_MAX_ENTRIES = int(os.getenv("YOUTUBE_CACHE_MAX_ENTRIES", "10000"))
+# How long snippet/contentDetails are served from cache before revalidating
+YOUTUBE_STATIC_TTL_HOURS = int(os.getenv("YOUTUBE_STATIC_TTL_HOURS", "168"))
+
+# Adaptive refresh scheduling
+# Data API quota units the refresh scheduler may spend per day (one
+# videos.list call of up to 50 IDs costs 1 unit)
+YOUTUBE_DAILY_QUOTA_BUDGET = int(os.getenv("YOUTUBE_DAILY_QUOTA_BUDGET", "2000"))
+# How often the scheduler looks for videos that are due, in minutes
+YOUTUBE_SCHEDULER_TICK_MINUTES = int(os.getenv("YOUTUBE_SCHEDULER_TICK_MINUTES", "15"))
+# Shortest refresh interval for the hottest videos, in minutes; the longest
+# is YOUTUBE_REFRESH_INTERVAL hours
+YOUTUBE_MIN_REFRESH_MINUTES = int(os.getenv("YOUTUBE_MIN_REFRESH_MINUTES", "30"))
+
+# YouTube Analytics ingest
+# Days of analytics (ending today) averaged into watch time and retention
+ANALYTICS_LOOKBACK_DAYS = int(os.getenv("ANALYTICS_LOOKBACK_DAYS", "28"))
+# How often the worker ingests the per-video report, in hours
+ANALYTICS_INGEST_INTERVAL = int(os.getenv("ANALYTICS_INGEST_INTERVAL", "24"))
+
+# Video metrics history
+# Raw snapshots older than this are downsampled to one point per day
+SNAPSHOT_RAW_DAYS = int(os.getenv("SNAPSHOT_RAW_DAYS", "7"))
+# Daily snapshots older than this are downsampled to one point per week
+SNAPSHOT_DAILY_DAYS = int(os.getenv("SNAPSHOT_DAILY_DAYS", "90"))
+
+# Click-to-booking matching
+# How far back from a booking we look for the click that produced it
+CLICK_MATCH_WINDOW_HOURS = int(os.getenv("CLICK_MATCH_WINDOW_HOURS", "72"))
+# Time proximity score halves every CLICK_MATCH_HALF_LIFE_HOURS
+CLICK_MATCH_HALF_LIFE_HOURS = float(os.getenv("CLICK_MATCH_HALF_LIFE_HOURS", "24"))
+# Maximum number of candidate clicks scored per booking
+CLICK_MATCH_MAX_CANDIDATES = int(os.getenv("CLICK_MATCH_MAX_CANDIDATES", "200"))
+# Candidates scoring below this are not attributed
+CLICK_MATCH_MIN_SCORE = float(os.getenv("CLICK_MATCH_MIN_SCORE", "0.05"))
+# Recent clicks kept in memory per video (0 disables the buffer, e.g. when
+# running several web processes that do not share memory)
+CLICK_MATCH_BUFFER_SIZE = int(os.getenv("CLICK_MATCH_BUFFER_SIZE", "500"))
+
+# Multi-touch attribution
+# Clicks older than this before a sale are not part of its path
+MULTITOUCH_LOOKBACK_DAYS = int(os.getenv("MULTITOUCH_LOOKBACK_DAYS", "30"))
+# Time-decay credit halves for every MULTITOUCH_HALF_LIFE_DAYS before the sale
+MULTITOUCH_HALF_LIFE_DAYS = float(os.getenv("MULTITOUCH_HALF_LIFE_DAYS", "7"))
+# Only the most recent touches of a path are credited
+MULTITOUCH_MAX_TOUCHES = int(os.getenv("MULTITOUCH_MAX_TOUCHES", "50"))
+# How often the worker recomputes credit, and how many days back
+ATTRIBUTION_ROLLUP_INTERVAL = int(os.getenv("ATTRIBUTION_ROLLUP_INTERVAL", "1"))
+ATTRIBUTION_ROLLUP_DAYS = int(os.getenv("ATTRIBUTION_ROLLUP_DAYS", "90"))
+
+# Background worker
+# How often recent Stripe payments are checked for missed webhooks, in minutes
+STRIPE_RECONCILE_INTERVAL_MINUTES = int(os.getenv("STRIPE_RECONCILE_INTERVAL_MINUTES", "30"))
+# Number of recent payment intents checked per reconciliation run
+STRIPE_RECONCILE_LIMIT = int(os.getenv("STRIPE_RECONCILE_LIMIT", "100"))
+# Random +/- fraction applied to every job interval so runs don't line up
+WORKER_JOB_JITTER = float(os.getenv("WORKER_JOB_JITTER", "0.1"))
+# Identifies this worker instance in leases and heartbeats (default: host and pid)
+WORKER_ID = os.getenv("WORKER_ID")
+# How often each worker reports it is alive and renews its leases, in seconds;
+# a worker silent for three intervals is considered gone
+WORKER_HEARTBEAT_SECONDS = int(os.getenv("WORKER_HEARTBEAT_SECONDS", "30"))
@@ -1,29 +1,246 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-from app.config import DATABASE_URL, IS_PRODUCTION
-
-# Create the SQLAlchemy engine with appropriate settings
-# For SQLite (development), we need check_same_thread=False
-# For PostgreSQL (production), we don't use this parameter
-if IS_PRODUCTION or not DATABASE_URL.startswith('sqlite'):
-    # PostgreSQL or other production database
-    engine = create_engine(DATABASE_URL)
-else:
-    # SQLite for development
-    engine = create_engine(
-        DATABASE_URL, connect_args={"check_same_thread": False}
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import (
+    DATABASE_URL,
+    DATABASE_READ_URL,
+    READ_REPLICA_MAX_LAG_SECONDS,
+    READ_REPLICA_CHECK_SECONDS,
+    DB_PROFILE,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_STATEMENT_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+ENGINE_PROFILES = ("sqlite", "sqlite-baseline", "postgres", "postgres-baseline")
+
+def sqlite_pragmas(url: str, profile: str) -> Dict[str, Any]:
+    """PRAGMAs run on every new SQLite connection for a profile"""
+    if profile == "sqlite-baseline":
+        # Rollback journal; set explicitly because WAL mode persists in the file
+        return {"journal_mode": "DELETE"}
+
+    pragmas: Dict[str, Any] = {
+        # Readers don't block the writer and vice versa
+        "journal_mode": "WAL",
+        # Durable at checkpoints rather than on every commit; safe with WAL
+        "synchronous": "NORMAL",
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+        # Negative means KiB rather than pages
+        "cache_size": -SQLITE_CACHE_SIZE_KB,
+        "mmap_size": SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY"
+    }
+    if make_url(url).database in (None, "", ":memory:"):
+        del pragmas["journal_mode"]
+    return pragmas
+
+def resolve_profile(url: str, profile: str = "auto") -> str:
+    """The engine profile for a URL; "auto" picks the tuned one for its dialect"""
+    is_sqlite = url.startswith("sqlite")
+    if profile == "auto":
+        return "sqlite" if is_sqlite else "postgres"
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE {profile!r}; expected auto or one of {', '.join(ENGINE_PROFILES)}")
+    if profile.startswith("sqlite") != is_sqlite:
+        raise ValueError(f"DB_PROFILE {profile!r} doesn't match DATABASE_URL")
+    return profile
+
+def create_db_engine(url: str = DATABASE_URL, profile: Optional[str] = None) -> Engine:
+    """
+    Create the SQLAlchemy engine for a named profile
+
+    sqlite: WAL journal, relaxed fsync, busy timeout, larger page cache
+        and memory-mapped reads, so click writes and dashboard reads
+        don't block each other
+    postgres: sized pool with overflow, pre-ping to drop dead connections,
+        periodic recycling and a server-side statement timeout
+    *-baseline: driver and SQLAlchemy defaults, for comparison
+
+    Args:
+        url: Database URL
+        profile: Profile name or "auto" (default: DB_PROFILE)
+
+    Returns:
+        Configured engine
+    """
+    profile = resolve_profile(url, profile or DB_PROFILE)
+
+    if profile.startswith("sqlite"):
+        # SQLite connections are shared across threads by the pool
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        pragmas = sqlite_pragmas(url, profile)
+
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+        return engine
+
+    if profile == "postgres-baseline":
+        return create_engine(url)
+
+    connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        connect_args=connect_args
     )
 
+class ReplicaRouter:
+    """
+    Decides whether read-only work may use the read replica.
+
+    The API periodically stamps the replication_heartbeat row on the
+    primary; the stamp's age as seen on the replica is the replication
+    lag. Reads go to the replica while that lag is within max_lag and the
+    replica answers, otherwise to the primary. Lag is re-checked at most
+    every check_interval seconds, by the background task when it runs and
+    inline otherwise.
+
+    The replica must receive the primary's replication_heartbeat table
+    (a Postgres streaming replica, or a replicated SQLite file); one
+    without the table or the row is never used.
+    """
+
+    def __init__(self, primary: Engine, replica: Optional[Engine],
+                 max_lag: float = READ_REPLICA_MAX_LAG_SECONDS,
+                 check_interval: float = READ_REPLICA_CHECK_SECONDS):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self.healthy = False
+        self.checked_at = 0.0
+        self._check_lock = threading.Lock()
+
+    def write_heartbeat(self) -> None:
+        """Stamp the current time on the primary"""
+        now = time.time()
+        with self.primary.begin() as conn:
+            updated = conn.execute(
+                text("UPDATE replication_heartbeat SET heartbeat_at = :now WHERE id = 1"), {"now": now}
+            ).rowcount
+            if not updated:
+                conn.execute(text("INSERT INTO replication_heartbeat (id, heartbeat_at) VALUES (1, :now)"), {"now": now})
+
+    def check(self) -> bool:
+        """Measure replication lag and decide whether the replica is usable"""
+        try:
+            with self.replica.connect() as conn:
+                stamped = conn.execute(text("SELECT heartbeat_at FROM replication_heartbeat WHERE id = 1")).scalar()
+            self.lag = time.time() - stamped if stamped is not None else None
+        except DBAPIError as e:
+            logger.error(f"Read replica check failed: {e}")
+            self.lag = None
+        healthy = self.lag is not None and self.lag <= self.max_lag
+        if healthy != self.healthy:
+            logger.warning(f"Read replica {'in use' if healthy else 'bypassed'} (lag: {self.lag})")
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+        return healthy
+
+    def use_replica(self) -> bool:
+        if self.replica is None:
+            return False
+        if time.monotonic() - self.checked_at > self.check_interval and self._check_lock.acquire(blocking=False):
+            # One caller re-checks; the others use the last result meanwhile
+            try:
+                self.check()
+            finally:
+                self._check_lock.release()
+        return self.healthy
+
+    def mark_unhealthy(self) -> None:
+        """Send reads to the primary until the next successful check"""
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+    async def run(self) -> None:
+        """Write heartbeats and check lag every check_interval until cancelled"""
+        if self.replica is None:
+            return
+        while True:
+            try:
+                await asyncio.to_thread(self.write_heartbeat)
+                await asyncio.to_thread(self.check)
+            except Exception as e:
+                logger.error(f"Replication heartbeat failed: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "configured": self.replica is not None,
+            "in_use": self.replica is not None and self.healthy,
+            "lag_seconds": round(self.lag, 2) if self.lag is not None else None,
+            "max_lag_seconds": self.max_lag
+        }
+
+# Create the SQLAlchemy engine for the configured profile
+engine = create_db_engine()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica, same profile family as the primary
+read_engine = create_db_engine(DATABASE_READ_URL) if DATABASE_READ_URL else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
+
+replica_router = ReplicaRouter(engine, read_engine)
+
 Base = declarative_base()
 
+def read_session() -> Session:
+    """
+    Session for read-only work: on the replica while it is fresh enough,
+    otherwise on the primary. Never write through it.
+    """
+    if replica_router.use_replica():
+        return ReadSessionLocal()
+    return SessionLocal()
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency for read-only routes (dashboards, listings, attribution lookups)
+def get_read_db():
+    db = read_session()
+    try:
+        yield db
+    except DBAPIError:
+        if db.get_bind() is read_engine:
+            replica_router.mark_unhealthy()
+        raise
+    finally:
+        db.close()
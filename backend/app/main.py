@@ -2,14 +2,16 @@ import sys
 import os
 import importlib.util
 from pathlib import Path
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 # Add the parent directory to sys.path to allow absolute imports
 parent_dir = str(Path(__file__).resolve().parent.parent)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import config settings
@@ -22,11 +24,15 @@ from app.config import (
 )
 
 # Import directly from the model files
-from app.database import engine
-from app.models import Base
+from app.database import engine, read_engine, replica_router
+from app.migrations import ensure_schema
+from app.services.api_health import api_health_cache
+from app.services.metrics import MetricsMiddleware
+from app.services.query_stats import RequestQueries, current_request, query_monitor
+from app.services.runtime import runtime_monitor
 
 # Import the routes
-from app.routes import dashboard, links, redirect, webhooks, status, auth
+from app.routes import dashboard, links, redirect, webhooks, status, auth, metrics
 
 # Set up logging
 logging.basicConfig(
@@ -39,24 +45,41 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Create tables - with error handling for production databases
+# Migrations run at deploy time (migrate.py from render-start.sh); at
+# startup this is a single version query unless the schema is behind
 try:
-    logger.info("Attempting to create database tables...")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
+    ensure_schema(engine)
 except Exception as e:
-    logger.error(f"Error creating database tables: {e}")
+    logger.error(f"Error checking database schema: {e}")
     if IS_PRODUCTION:
-        logger.warning("In production environment, database migrations should be handled carefully")
-        logger.warning("Consider using Alembic for database migrations in production")
+        logger.warning("Run python migrate.py against this database before starting the server")
     else:
         # In development, we can re-raise the error
         raise
 
+# Statement counts and timings for Server-Timing, N+1 warnings and the slow-query log
+query_monitor.instrument(engine)
+if read_engine is not None:
+    query_monitor.instrument(read_engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background tasks that live as long as the server
+    tasks = [
+        asyncio.create_task(api_health_cache.run()),
+        asyncio.create_task(runtime_monitor.run()),
+        asyncio.create_task(replica_router.run())
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
 app = FastAPI(
     title=APP_NAME,
     description=APP_DESCRIPTION,
-    version=APP_VERSION
+    version=APP_VERSION,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -68,6 +91,31 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+@app.middleware("http")
+async def count_in_flight_requests(request: Request, call_next):
+    runtime_monitor.request_started()
+    try:
+        return await call_next(request)
+    finally:
+        runtime_monitor.request_finished()
+
+@app.middleware("http")
+async def record_query_stats(request: Request, call_next):
+    queries = RequestQueries()
+    token = current_request.set(queries)
+    try:
+        response = await call_next(request)
+    finally:
+        current_request.reset(token)
+    # Statements run while streaming a response body aren't included
+    route = request.scope.get("route")
+    query_monitor.finish_request(f"{request.method} {route.path if route else 'unmatched'}", queries)
+    response.headers.append("Server-Timing", queries.server_timing())
+    return response
+
+# Outermost, so latencies include the other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(dashboard.router)
 app.include_router(links.router)
@@ -75,6 +123,7 @@ app.include_router(redirect.router)
 app.include_router(webhooks.router)
 app.include_router(status.router)
 app.include_router(auth.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
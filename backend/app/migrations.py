@@ -0,0 +1,174 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.database import Base
+from app.models import ReplicationHeartbeat, SchemaMigration
+from app.schema import add_missing_columns, backfill_email_hashes, create_missing_indexes
+from app.services.coordination import advisory_lock_key
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change, applied at most once per database"""
+    version: int
+    description: str
+    upgrade: Callable[[Engine], None]
+
+
+# Lookup indexes for joins and date ranges. click_events.video_id is
+# already covered by ix_click_events_video_id_timestamp, and bookings are
+# looked up by email through ix_booking_events_email_hash_timestamp.
+LOOKUP_INDEXES = [
+    ("ix_click_events_timestamp", "click_events", "timestamp"),
+    ("ix_booking_events_click_id", "booking_events", "click_id"),
+    ("ix_sale_events_booking_id", "sale_events", "booking_id")
+]
+
+
+def baseline(engine: Engine) -> None:
+    """
+    Everything the old create-at-startup path did: missing tables, nullable
+    columns and indexes, then the email_hash backfill. Safe on databases
+    that already ran it.
+    """
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    # Built by their own migration, concurrently on Postgres
+    create_missing_indexes(engine, exclude=[name for name, _, _ in LOOKUP_INDEXES])
+    backfill_email_hashes(engine)
+
+
+def add_lookup_indexes(engine: Engine) -> None:
+    """Create LOOKUP_INDEXES without blocking writes on Postgres"""
+    postgres = engine.dialect.name == "postgresql"
+    concurrently = "CONCURRENTLY " if postgres else ""
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if postgres:
+            # A build on a large table outlasts DB_STATEMENT_TIMEOUT_MS, and a
+            # cancelled concurrent build leaves an INVALID index behind
+            conn.exec_driver_sql("SET statement_timeout = 0")
+        try:
+            for name, table, column in LOOKUP_INDEXES:
+                if postgres:
+                    valid = conn.execute(
+                        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+                    ).scalar()
+                    if valid is False:
+                        # IF NOT EXISTS would keep the unusable leftover
+                        logger.warning(f"Dropping invalid index {name} left by an interrupted build")
+                        conn.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                logger.info(f"Creating index {name}")
+                conn.exec_driver_sql(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({column})")
+        finally:
+            if postgres:
+                # Back to the connection's default before it returns to the pool
+                conn.exec_driver_sql("RESET statement_timeout")
+
+
+def add_replication_heartbeat(engine: Engine) -> None:
+    ReplicationHeartbeat.__table__.create(bind=engine, checkfirst=True)
+
+
+def add_video_published_at(engine: Engine) -> None:
+    # Nullable column; existing videos fall back to created_at until rediscovered
+    add_missing_columns(engine)
+
+
+# Append new migrations with the next version; never edit applied ones
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Baseline schema", baseline),
+    Migration(2, "Lookup indexes on click, booking and sale foreign keys", add_lookup_indexes),
+    Migration(3, "Replication heartbeat table", add_replication_heartbeat),
+    Migration(4, "Video publish date", add_video_published_at)
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(engine: Engine) -> int:
+    """
+    Highest applied migration version; 0 for a database never migrated
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+    except DBAPIError:
+        # No schema_migrations table yet
+        return 0
+
+
+def run_migrations(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations in order
+
+    On Postgres an advisory lock keeps concurrent deploys from running
+    them twice; the version is re-read once the lock is held.
+
+    Args:
+        engine: SQLAlchemy engine
+        target: Last version to apply (default: LATEST_VERSION)
+
+    Returns:
+        Versions applied by this call
+    """
+    target = LATEST_VERSION if target is None else target
+    lock_conn = None
+    if engine.dialect.name == "postgresql":
+        lock_conn = engine.connect()
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": advisory_lock_key("schema_migrations")})
+        lock_conn.commit()
+
+    applied = []
+    try:
+        SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+        version = current_version(engine)
+        for migration in MIGRATIONS:
+            if migration.version <= version or migration.version > target:
+                continue
+            logger.info(f"Applying migration {migration.version}: {migration.description}")
+            migration.upgrade(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(SchemaMigration).values(
+                    version=migration.version,
+                    description=migration.description
+                ))
+            applied.append(migration.version)
+    finally:
+        if lock_conn is not None:
+            # The lock belongs to the session, and close() only returns the
+            # connection to the pool, so release it explicitly
+            try:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": advisory_lock_key("schema_migrations")})
+                lock_conn.commit()
+            except DBAPIError:
+                # Discard the connection (and the lock with its session)
+                lock_conn.invalidate()
+            lock_conn.close()
+
+    if applied:
+        logger.info(f"Schema migrated to version {applied[-1]}")
+    return applied
+
+
+def ensure_schema(engine: Engine) -> bool:
+    """
+    Startup check: one query when the schema is current, migrating only
+    when it is behind (e.g. local development without a deploy step)
+
+    Returns:
+        True if migrations were applied
+    """
+    version = current_version(engine)
+    if version >= LATEST_VERSION:
+        return False
+    logger.warning(f"Schema is at version {version}, expected {LATEST_VERSION}; migrating now")
+    return bool(run_migrations(engine))
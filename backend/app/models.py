@@ -1,20 +1,44 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Text, Boolean, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from datetime import datetime
+from typing import Optional
+import hashlib
 
 from app.database import Base
 
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Normalize an email address for matching (trimmed, lowercase)"""
+    if not email:
+        return None
+    normalized = email.strip().lower()
+    return normalized or None
+
+def hash_email(email: Optional[str]) -> Optional[str]:
+    """SHA-256 hex digest of the normalized email, used as the lookup key"""
+    normalized = normalize_email(email)
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
 class VideoMetrics(Base):
     __tablename__ = "video_metrics"
 
     id = Column(Integer, primary_key=True, index=True)
     slug = Column(String, unique=True, index=True)
     title = Column(String, index=True)
+    youtube_id = Column(String, unique=True, index=True, nullable=True)  # YouTube video ID
     views = Column(Integer, default=0)
     likes = Column(Integer, default=0)
     comments = Column(Integer, default=0)
     avg_watch_time = Column(Float, default=0.0)  # in seconds
+    avg_view_percentage = Column(Float, nullable=True)  # Average share of the video watched, 0-100
+    watch_time_minutes = Column(Float, nullable=True)  # Estimated minutes watched over the analytics window
+    analytics_updated_at = Column(DateTime, nullable=True)  # Last YouTube Analytics ingest
+    last_refreshed_at = Column(DateTime, nullable=True)  # Last YouTube statistics fetch
+    next_refresh_at = Column(DateTime, nullable=True, index=True)  # When the refresh scheduler picks it up next
+    views_per_hour = Column(Float, nullable=True)  # View growth rate between the last two refreshes
+    published_at = Column(DateTime, nullable=True)  # YouTube publish date, when known
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -29,36 +53,101 @@ class ClickEvent(Base):
     ip_address = Column(String)
     user_agent = Column(String)
     referrer = Column(String, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)  # Dashboard date ranges across videos
 
     # Relationships
     video = relationship("VideoMetrics", back_populates="clicks")
     booking = relationship("BookingEvent", back_populates="click", uselist=False)
 
+    # Candidate clicks for a booking are looked up by video within a time window
+    __table_args__ = (
+        Index("ix_click_events_video_id_timestamp", "video_id", "timestamp"),
+    )
+
 class BookingEvent(Base):
     __tablename__ = "booking_events"
 
     id = Column(Integer, primary_key=True, index=True)
-    click_id = Column(Integer, ForeignKey("click_events.id"))
+    click_id = Column(Integer, ForeignKey("click_events.id"), index=True)
     email = Column(String)
+    email_hash = Column(String(64))
     name = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    # Calendly invitee URI, so replayed or re-imported events are skipped
+    external_id = Column(String, unique=True, index=True)
 
     # Relationships
     click = relationship("ClickEvent", back_populates="booking")
     sale = relationship("SaleEvent", back_populates="booking", uselist=False)
 
+    @validates("email")
+    def _set_email_hash(self, key, email):
+        # Keep the lookup key in sync with the raw address
+        self.email_hash = hash_email(email)
+        return email
+
+# Latest booking for an email is a single seek on this index
+Index(
+    "ix_booking_events_email_hash_timestamp",
+    BookingEvent.email_hash,
+    BookingEvent.timestamp.desc()
+)
+
 class SaleEvent(Base):
     __tablename__ = "sale_events"
 
     id = Column(Integer, primary_key=True, index=True)
-    booking_id = Column(Integer, ForeignKey("booking_events.id"))
+    booking_id = Column(Integer, ForeignKey("booking_events.id"), index=True)
     amount = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
+    # Stripe payment intent id, so replayed or re-imported events are skipped
+    external_id = Column(String, unique=True, index=True)
 
     # Relationship
     booking = relationship("BookingEvent", back_populates="sale")
 
+class AttributionCredit(Base):
+    """Credit a video receives for a sale under one attribution model"""
+    __tablename__ = "attribution_credit"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sale_id = Column(Integer, ForeignKey("sale_events.id"), index=True)
+    video_id = Column(Integer, ForeignKey("video_metrics.id"), index=True)
+    model = Column(String)
+    credit = Column(Float)  # share of the sale, 0-1
+    revenue = Column(Float)  # credit * sale amount
+    sale_timestamp = Column(DateTime)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    # Dashboard reads are filtered by model and sale date
+    __table_args__ = (
+        Index("ix_attribution_credit_model_sale_timestamp", "model", "sale_timestamp"),
+    )
+
+class VideoMetricsSnapshot(Base):
+    """
+    One point in a video's statistics history.
+
+    Keyframes hold absolute counts; other rows hold the change since the
+    previous point of the same video. Old raw points are downsampled to
+    daily and then weekly resolution.
+    """
+    __tablename__ = "video_metrics_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("video_metrics.id"))
+    timestamp = Column(DateTime, default=datetime.utcnow)
+    resolution = Column(String, default="raw")  # raw, daily or weekly
+    is_keyframe = Column(Boolean, default=False)
+    views = Column(Integer, default=0)
+    likes = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+
+    # History reads seek by video and time range
+    __table_args__ = (
+        Index("ix_video_metrics_snapshots_video_id_timestamp", "video_id", "timestamp"),
+    )
+
 class Link(Base):
     __tablename__ = "links"
     
@@ -86,4 +175,38 @@ class YouTubeToken(Base):
         """Check if the token is expired."""
         if not self.expires_at:
             return True
-        return datetime.utcnow() > self.expires_at 
\ No newline at end of file
+        return datetime.utcnow() > self.expires_at 
+
+class WorkerLease(Base):
+    """Lease giving one worker instance exclusive ownership of a singleton job"""
+    __tablename__ = "worker_leases"
+
+    name = Column(String, primary_key=True)  # Job name
+    holder = Column(String)  # Worker id
+    expires_at = Column(DateTime)
+
+class WorkerHeartbeat(Base):
+    """Liveness of each running worker instance, used to shard work"""
+    __tablename__ = "worker_heartbeats"
+
+    worker_id = Column(String, primary_key=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    last_seen = Column(DateTime, default=datetime.utcnow)
+
+class SchemaMigration(Base):
+    """A schema migration applied to this database (see app/migrations.py)"""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
+class ReplicationHeartbeat(Base):
+    """
+    Single row the API rewrites on the primary; its age on the read replica
+    is the replication lag
+    """
+    __tablename__ = "replication_heartbeat"
+
+    id = Column(Integer, primary_key=True)
+    heartbeat_at = Column(Float)  # Unix time of the last write
@@ -3,12 +3,15 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 import requests
 import os
+from urllib.parse import urlencode
 from typing import Optional
 from datetime import datetime, timedelta
 
 from app.database import get_db
-from app.config import YOUTUBE_API_KEY, FRONTEND_URL
+from app.config import YOUTUBE_API_KEY, FRONTEND_URL, GOOGLE_OAUTH_BASE_URL
 from app.models import YouTubeToken
+from app.services.http_client import http_client
+from app.services.token_cache import token_cache
 
 router = APIRouter(
     prefix="/auth",
@@ -48,6 +51,9 @@ def store_youtube_tokens(db: Session, tokens: dict):
     db.commit()
     db.refresh(token)
     
+    # Make the YouTube client pick up the new token
+    token_cache.invalidate()
+    
     return token
 
 @router.get("/youtube/login")
@@ -66,13 +72,14 @@ async def youtube_login():
         "client_id": YOUTUBE_CLIENT_ID,
         "redirect_uri": YOUTUBE_REDIRECT_URI,
         "response_type": "code",
-        "scope": "https://www.googleapis.com/auth/youtube.readonly",
+        # Analytics scope is needed for the watch time ingest
+        "scope": "https://www.googleapis.com/auth/youtube.readonly https://www.googleapis.com/auth/yt-analytics.readonly",
         "access_type": "offline",
         "prompt": "consent"
     }
     
     # Build the authorization URL with parameters
-    auth_url_with_params = f"{auth_url}?{'&'.join([f'{k}={v}' for k, v in params.items()])}"
+    auth_url_with_params = f"{auth_url}?{urlencode(params)}"
     
     # Redirect to Google's authorization page
     return RedirectResponse(url=auth_url_with_params)
@@ -91,7 +98,7 @@ async def youtube_callback(code: Optional[str] = None, error: Optional[str] = No
         return RedirectResponse(url=f"{FRONTEND_URL}/settings?error=no_code")
     
     # Exchange authorization code for access token
-    token_url = "https://oauth2.googleapis.com/token"
+    token_url = f"{GOOGLE_OAUTH_BASE_URL}/token"
     token_data = {
         "client_id": YOUTUBE_CLIENT_ID,
         "client_secret": YOUTUBE_CLIENT_SECRET,
@@ -102,7 +109,8 @@ async def youtube_callback(code: Optional[str] = None, error: Optional[str] = No
     
     try:
         # Make the token request
-        token_response = requests.post(token_url, data=token_data)
+        # Authorization codes are single-use, so the exchange is not retried
+        token_response = http_client.post(token_url, service="google_oauth", data=token_data, retries=0)
         token_response.raise_for_status()
         
         # Get the tokens
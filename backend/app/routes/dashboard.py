@@ -1,13 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import random
 from datetime import datetime, timedelta
 
 # Updated imports to use models from app.models instead of app.models.models
-from app.database import get_db
-from app.models import VideoMetrics, ClickEvent, BookingEvent, SaleEvent
-from app.schemas import VideoMetricsResponse, DashboardResponse
+from app.database import get_db, get_read_db
+from app.models import VideoMetrics, ClickEvent, BookingEvent, SaleEvent, AttributionCredit
+from app.schemas import (
+    VideoMetricsResponse,
+    DashboardResponse,
+    AttributionCreditResponse,
+    VideoAttributionCredit,
+    VideoHistoryResponse
+)
+from app.services.multitouch import ATTRIBUTION_MODELS, compute_attribution_credit
+from app.services.snapshots import get_history
 
 router = APIRouter(
     prefix="/dashboard",
@@ -15,7 +24,7 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=DashboardResponse)
-def get_dashboard_data(db: Session = Depends(get_db)):
+def get_dashboard_data(db: Session = Depends(get_read_db)):
     """
     Get aggregated dashboard data including:
     - Total clicks, bookings, sales, revenue
@@ -79,10 +88,12 @@ def get_dashboard_data(db: Session = Depends(get_db)):
         video_metrics.append(VideoMetricsResponse(
             slug=video.slug,
             title=video.title,
+            youtube_id=video.youtube_id,
             views=video.views,
             likes=video.likes,
             comments=video.comments,
             avg_watch_time=video.avg_watch_time,
+            avg_view_percentage=video.avg_view_percentage,
             clicks=clicks,
             bookings=bookings,
             sales=sales_count,
@@ -100,6 +111,100 @@ def get_dashboard_data(db: Session = Depends(get_db)):
         videos=video_metrics
     )
 
+@router.get("/attribution", response_model=AttributionCreditResponse)
+def get_attribution_credit(
+    model: str = "linear",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get per-video credit under a multi-touch attribution model
+    
+    Reads the precomputed attribution_credit table; see
+    POST /dashboard/attribution/recompute.
+    """
+    if model not in ATTRIBUTION_MODELS:
+        raise HTTPException(status_code=400, detail=f"Unknown model, use one of: {', '.join(ATTRIBUTION_MODELS)}")
+    
+    query = db.query(
+        VideoMetrics.id,
+        VideoMetrics.slug,
+        VideoMetrics.title,
+        func.sum(AttributionCredit.credit),
+        func.sum(AttributionCredit.revenue)
+    ).select_from(AttributionCredit).join(
+        VideoMetrics, AttributionCredit.video_id == VideoMetrics.id
+    ).filter(AttributionCredit.model == model)
+    
+    if start:
+        query = query.filter(AttributionCredit.sale_timestamp >= start)
+    if end:
+        query = query.filter(AttributionCredit.sale_timestamp < end)
+    
+    rows = query.group_by(VideoMetrics.id, VideoMetrics.slug, VideoMetrics.title).all()
+    videos = sorted(
+        (VideoAttributionCredit(
+            video_id=video_id,
+            slug=slug,
+            title=title,
+            conversions=conversions or 0.0,
+            revenue=revenue or 0.0
+        ) for video_id, slug, title, conversions, revenue in rows),
+        key=lambda video: video.revenue,
+        reverse=True
+    )
+    
+    return AttributionCreditResponse(
+        model=model,
+        start=start,
+        end=end,
+        total_revenue=sum(video.revenue for video in videos),
+        videos=videos
+    )
+
+@router.post("/attribution/recompute")
+def recompute_attribution_credit(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute multi-touch credit for sales in a range (default: last 90 days)
+    """
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=90)
+    rows = compute_attribution_credit(db, start, end)
+    return {"message": "Attribution credit recomputed", "rows": rows}
+
+@router.get("/videos/{slug}/history", response_model=VideoHistoryResponse)
+def get_video_history(
+    slug: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get a video's views/likes/comments history for charting
+    
+    Points are raw refreshes for the last week, then daily, then weekly.
+    """
+    video_id = db.query(VideoMetrics.id).filter(VideoMetrics.slug == slug).scalar()
+    if video_id is None:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    series = get_history(db, video_id, start, end)
+    return VideoHistoryResponse(
+        slug=slug,
+        start=start,
+        end=end,
+        timestamps=series.timestamps,
+        resolutions=series.resolutions,
+        views=series.column("views"),
+        likes=series.column("likes"),
+        comments=series.column("comments")
+    )
+
 @router.post("/mock-data/", status_code=201)
 def create_mock_data(db: Session = Depends(get_db)):
     """
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import re
-from datetime import datetime
+import requests
 
-from app.database import get_db
-from app.models import Link, ClickEvent, VideoMetrics
+from app.database import get_db, get_read_db
+from app.models import Link, VideoMetrics
 from app.schemas import LinkCreate, Link as LinkSchema, LinkBase
+from app.services.channel_discovery import ChannelDiscoveryError, discover_channel
+from app.services.utm import UTMTracker
 
 router = APIRouter(
     prefix="/links",
@@ -41,7 +43,8 @@ def create_link(link: LinkCreate, db: Session = Depends(get_db)):
     # Also create video metrics entry
     db_video = VideoMetrics(
         slug=link.slug,
-        title=link.title
+        title=link.title,
+        youtube_id=link.youtube_id
     )
     
     db.add(db_link)
@@ -51,8 +54,23 @@ def create_link(link: LinkCreate, db: Session = Depends(get_db)):
     
     return db_link
 
+@router.post("/channels/{channel_id}", status_code=201)
+def track_channel(channel_id: str, db: Session = Depends(get_db)):
+    """
+    Create tracking links for every upload of a YouTube channel
+    
+    Each video's slug is its YouTube ID. Videos already tracked keep
+    their slug and get their title updated.
+    """
+    try:
+        return discover_channel(db, channel_id)
+    except ChannelDiscoveryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except requests.RequestException as e:
+        raise HTTPException(status_code=502, detail=f"YouTube API request failed: {e}")
+
 @router.get("/", response_model=List[LinkSchema])
-def get_links(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_links(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """
     Get all tracking links
     """
@@ -81,32 +99,11 @@ async def redirect_link(slug: str, request: Request, db: Session = Depends(get_d
     if db_link is None:
         raise HTTPException(status_code=404, detail="Link not found")
     
-    # Get the associated video metrics
-    video = db.query(VideoMetrics).filter(VideoMetrics.slug == slug).first()
-    if not video:
-        # If video metrics don't exist, create them
-        video = VideoMetrics(
-            slug=slug,
-            title=db_link.title
-        )
-        db.add(video)
-        db.commit()
-        db.refresh(video)
-    
     # Log the click
     client_host = request.client.host if request.client else "unknown"
     user_agent = request.headers.get("user-agent", "unknown")
     referrer = request.headers.get("referer")
-    
-    click = ClickEvent(
-        video_id=video.id,
-        ip_address=client_host,
-        user_agent=user_agent,
-        referrer=referrer,
-        timestamp=datetime.utcnow()
-    )
-    db.add(click)
-    db.commit()
+    UTMTracker.track_click(db, slug, client_host, user_agent, referrer)
     
     # Build the destination URL with UTM parameters
     destination = db_link.destination_url
@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.database import engine
+from app.services.click_matcher import click_matcher
+from app.services.metrics import CONTENT_TYPE, registry
+from app.services.runtime import pool_stats, runtime_monitor
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+# Point-in-time values read at scrape time
+registry.gauge("http_requests_in_flight", "Requests being served", lambda: runtime_monitor.in_flight)
+registry.gauge("click_buffer_size", "Recent clicks held for booking matching", lambda: len(click_matcher.buffer))
+registry.gauge("db_pool_checked_out", "Database connections in use", lambda: pool_stats(engine).get("checkedout", 0))
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint: request counts and latency per route,
+    funnel ingest counters, outbound API latency and worker jobs run in
+    this process
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from typing import List, Dict, Any
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.services.api_health import check_all_apis
+from app.database import get_db, replica_router
+from app.services.api_health import api_health_cache
+from app.services.click_matcher import click_matcher
+from app.services.http_client import http_client
+from app.services.query_stats import query_monitor
+from app.services.response_cache import youtube_cache
+from app.services.runtime import runtime_monitor
 
 router = APIRouter(
     prefix="/status",
@@ -20,9 +26,10 @@ def health_check():
 @router.get("/api-status")
 def api_status() -> Dict[str, Any]:
     """
-    Check the status of all integrated APIs
+    Status of all integrated APIs, from the background health checks
     """
-    api_statuses = check_all_apis()
+    cached = api_health_cache.get()
+    api_statuses = cached["apis"]
     
     # Count statuses
     status_counts = {"ok": 0, "error": 0, "not_configured": 0}
@@ -34,9 +41,54 @@ def api_status() -> Dict[str, Any]:
     return {
         "overall_status": "ok" if status_counts["error"] == 0 else "error",
         "apis": api_statuses,
-        "summary": status_counts
+        "summary": status_counts,
+        "checked_at": cached["checked_at"],
+        "age_seconds": cached["age_seconds"],
+        "stale": cached["stale"]
     }
 
+@router.get("/outbound")
+def outbound_status() -> Dict[str, Any]:
+    """
+    Latency and error metrics per third-party host, and circuit breaker states
+    """
+    return http_client.stats()
+
+@router.get("/queries")
+def query_status() -> Dict[str, Any]:
+    """
+    Statement counts and database time per route since startup, most
+    database time first, with the worst repeated statement (possible N+1)
+    """
+    return query_monitor.stats()
+
+@router.get("/runtime")
+def runtime_status(response: Response) -> Dict[str, Any]:
+    """
+    Process health for load balancers: DB pool and ping, event-loop lag,
+    in-flight requests and in-memory buffer/cache sizes
+    
+    Served from background probes, so it never waits on the database.
+    Answers 503 when the last database ping failed.
+    """
+    runtime = runtime_monitor.snapshot()
+    runtime["read_replica"] = replica_router.stats()
+    if not runtime["database"]["ok"]:
+        response.status_code = 503
+    
+    api_health_age = api_health_cache.age
+    outbound = http_client.stats()
+    runtime["caches"] = {
+        "recent_click_buffer": len(click_matcher.buffer),
+        "youtube_response_cache": youtube_cache.stats(),
+        "api_health_age_seconds": round(api_health_age, 1) if api_health_age is not None else None,
+        "outbound_hosts": len(outbound["hosts"]),
+        "open_circuit_breakers": [
+            name for name, breaker in outbound["breakers"].items() if breaker["state"] != "closed"
+        ]
+    }
+    return runtime
+
 @router.get("/database")
 def database_status(db: Session = Depends(get_db)):
     """
@@ -44,7 +96,7 @@ def database_status(db: Session = Depends(get_db)):
     """
     try:
         # Execute a simple query to check the database connection
-        db.execute("SELECT 1").fetchall()
+        db.execute(text("SELECT 1")).fetchall()
         return {"status": "ok", "message": "Database connection is working"}
     except Exception as e:
         return {"status": "error", "message": f"Database error: {str(e)}"} 
\ No newline at end of file
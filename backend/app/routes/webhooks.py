@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 import json
 import logging
 
-from app.database import get_db
-from app.models import Link, VideoMetrics, ClickEvent, BookingEvent, SaleEvent
+from app.database import get_db, get_read_db, read_session
+from app.schemas import CalendlyEvent, StripeEvent, AttributionBatchRequest
 from app.services.utm import UTMTracker
+from app.services.attribution import (
+    parse_calendly_event,
+    parse_stripe_event,
+    booking_exists,
+    sale_exists,
+    resolve_booking_click,
+    resolve_sale_booking
+)
 from app.services.calendly import verify_webhook_signature as verify_calendly_signature
 from app.services.stripe import verify_webhook_signature as verify_stripe_signature
+from app.services.webhook_pipeline import (
+    WebhookPipeline,
+    WebhookRegistry,
+    WebhookSignatureError,
+    WebhookPayloadError
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -18,9 +34,95 @@ router = APIRouter(
     tags=["webhooks"],
 )
 
+# Handler registries, one per webhook source
+calendly_handlers = WebhookRegistry("calendly")
+stripe_handlers = WebhookRegistry("stripe")
+
+@calendly_handlers.on("invitee.created")
+def handle_calendly_booking(event: CalendlyEvent, db: Session) -> Dict[str, Any]:
+    """
+    Record a new Calendly booking, attributed to the click that produced it
+    """
+    booking = parse_calendly_event(event)
+    
+    # Calendly retries deliveries, so skip bookings we already have
+    if booking_exists(db, booking.external_id):
+        return {"status": "success", "message": "Booking already tracked"}
+    
+    click = resolve_booking_click(db, booking)
+    
+    if click:
+        # Record the booking and link it to this click
+        UTMTracker.track_booking(db, click.id, booking.email, booking.name, booking.external_id)
+        
+        return {"status": "success", "message": "Booking tracked successfully"}
+    
+    # If we couldn't find a click to attribute to, log it
+    logger.warning(f"Couldn't attribute booking from {booking.email} to a specific click")
+    
+    return {"status": "success", "message": "Webhook received, but couldn't attribute booking"}
+
+@stripe_handlers.on("checkout.session.completed", "payment_intent.succeeded")
+def handle_stripe_sale(event: StripeEvent, db: Session) -> Dict[str, Any]:
+    """
+    Record a completed Stripe payment, attributed to the booking it follows
+    """
+    sale = parse_stripe_event(event)
+    
+    # Checkout sessions and payment intents both report a payment,
+    # and Stripe retries deliveries, so skip payments we already have
+    if sale_exists(db, sale.external_id):
+        return {"status": "success", "message": "Sale already tracked"}
+    
+    booking = resolve_sale_booking(db, sale)
+    
+    if booking:
+        # Record the sale
+        UTMTracker.track_sale(db, booking.id, sale.amount, sale.external_id)
+        return {"status": "success", "message": "Sale tracked successfully"}
+    
+    # If we couldn't find a booking to attribute to, log it
+    logger.warning(f"Couldn't attribute sale of ${sale.amount} to a specific booking")
+    
+    return {"status": "success", "message": "Webhook received, but couldn't attribute sale"}
+
+calendly_pipeline = WebhookPipeline(
+    calendly_handlers, CalendlyEvent, lambda event: event.event, verify_calendly_signature
+)
+stripe_pipeline = WebhookPipeline(
+    stripe_handlers, StripeEvent, lambda event: event.type, verify_stripe_signature
+)
+
+def run_webhook_pipeline(
+    pipeline: WebhookPipeline,
+    body: bytes,
+    signature: Optional[str],
+    db: Session,
+    response: Response
+) -> Dict[str, Any]:
+    """
+    Run a webhook through its pipeline and map failures to HTTP errors
+    """
+    source = pipeline.registry.source
+    try:
+        result = pipeline.process(body, signature, db)
+    except WebhookSignatureError:
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    except WebhookPayloadError as e:
+        logger.error(f"Invalid {source} webhook payload: {e}")
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    except Exception as e:
+        logger.error(f"Error processing {source} webhook: {e}")
+        raise HTTPException(status_code=500, detail=f"Error processing webhook: {str(e)}")
+    
+    # Expose per-stage timings to clients and proxies
+    response.headers["Server-Timing"] = result.server_timing()
+    return result.body
+
 @router.post("/calendly")
 async def calendly_webhook(
     request: Request,
+    response: Response,
     signature: Optional[str] = Header(None, alias="Calendly-Webhook-Signature"),
     db: Session = Depends(get_db)
 ):
@@ -28,77 +130,12 @@ async def calendly_webhook(
     Handle Calendly webhook events
     """
     body = await request.body()
-    
-    # Verify signature if provided
-    if signature and not verify_calendly_signature(body, signature):
-        raise HTTPException(status_code=401, detail="Invalid webhook signature")
-    
-    try:
-        data = json.loads(body)
-        event_type = data.get("event")
-        payload = data.get("payload", {})
-        
-        if event_type == "invitee.created":
-            # This means a booking was created
-            
-            # Extract booking info
-            invitee = payload.get("invitee", {})
-            email = invitee.get("email")
-            name = invitee.get("name")
-            
-            # Try to find UTM parameters in custom questions or tracking
-            utm_source = None
-            utm_campaign = None
-            
-            # Look in tracking parameters
-            tracking = payload.get("tracking", {})
-            utm_source = tracking.get("utm_source")
-            utm_campaign = tracking.get("utm_campaign")
-            
-            # Look in questions for tracking info
-            questions_and_answers = invitee.get("questions_and_answers", [])
-            for qa in questions_and_answers:
-                question = qa.get("question", "").lower()
-                answer = qa.get("answer", "")
-                
-                if "how did you hear" in question or "referral" in question:
-                    if not utm_source:
-                        utm_source = answer
-                
-            # If we have UTM info, try to find the click event
-            if utm_campaign:
-                # Find the video by slug/campaign
-                video = db.query(VideoMetrics).filter(VideoMetrics.slug == utm_campaign).first()
-                
-                if video:
-                    # Find the most recent click from this email if possible
-                    # This is a simplified attribution - in a real system you'd use cookies/user IDs
-                    
-                    # For now, just get the most recent click for this video
-                    click = db.query(ClickEvent).filter(
-                        ClickEvent.video_id == video.id
-                    ).order_by(ClickEvent.timestamp.desc()).first()
-                    
-                    if click:
-                        # Record the booking and link it to this click
-                        UTMTracker.track_booking(db, click.id, email, name)
-                        
-                        return {"status": "success", "message": "Booking tracked successfully"}
-            
-            # If we couldn't find a click to attribute to, log it
-            logger.warning(f"Couldn't attribute booking from {email} to a specific click")
-            
-            return {"status": "success", "message": "Webhook received, but couldn't attribute booking"}
-            
-        return {"status": "success", "message": "Webhook received"}
-        
-    except Exception as e:
-        logger.error(f"Error processing Calendly webhook: {e}")
-        raise HTTPException(status_code=500, detail=f"Error processing webhook: {str(e)}")
+    return run_webhook_pipeline(calendly_pipeline, body, signature, db, response)
 
 @router.post("/stripe")
 async def stripe_webhook(
     request: Request,
+    response: Response,
     signature: Optional[str] = Header(None, alias="Stripe-Signature"),
     db: Session = Depends(get_db)
 ):
@@ -106,65 +143,42 @@ async def stripe_webhook(
     Handle Stripe webhook events
     """
     body = await request.body()
+    return run_webhook_pipeline(stripe_pipeline, body, signature, db, response)
+
+@router.get("/timings")
+async def get_webhook_timings():
+    """
+    Get per-stage webhook processing times since startup
+    """
+    return {
+        "calendly": calendly_pipeline.stats(),
+        "stripe": stripe_pipeline.stats()
+    }
+
+@router.get("/attribution")
+async def get_attribution_by_email(
+    email: str,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get the attribution chain for the latest sale of a customer email
+    """
+    sale = UTMTracker.find_latest_sale_by_email(db, email)
     
-    # Verify signature if provided
-    if signature and not verify_stripe_signature(body, signature):
-        raise HTTPException(status_code=401, detail="Invalid webhook signature")
-    
-    try:
-        data = json.loads(body)
-        event_type = data.get("type")
+    if not sale:
+        raise HTTPException(status_code=404, detail="No attributed sale found for this email")
         
-        if event_type == "checkout.session.completed" or event_type == "payment_intent.succeeded":
-            # Extract customer email
-            payload = data.get("data", {}).get("object", {})
-            customer_email = payload.get("customer_email") or payload.get("receipt_email")
-            amount = payload.get("amount_total") or payload.get("amount")
-            
-            if amount:
-                # Convert from cents to dollars for Stripe
-                amount = amount / 100
-            
-            # Get metadata to look for UTM or tracking info
-            metadata = payload.get("metadata", {})
-            booking_id = metadata.get("booking_id")
-            
-            if booking_id:
-                # If we have a booking ID in the metadata, use it directly
-                booking = db.query(BookingEvent).filter(BookingEvent.id == booking_id).first()
-                
-                if booking:
-                    # Record the sale
-                    UTMTracker.track_sale(db, booking.id, amount)
-                    return {"status": "success", "message": "Sale tracked successfully"}
-            
-            # If we don't have booking ID, try to find by email
-            if customer_email:
-                # Find the most recent booking with this email
-                booking = db.query(BookingEvent).filter(
-                    BookingEvent.email == customer_email
-                ).order_by(BookingEvent.timestamp.desc()).first()
-                
-                if booking:
-                    # Record the sale
-                    UTMTracker.track_sale(db, booking.id, amount)
-                    return {"status": "success", "message": "Sale tracked successfully"}
-            
-            # If we couldn't find a booking to attribute to, log it
-            logger.warning(f"Couldn't attribute sale of ${amount} to a specific booking")
-            
-            return {"status": "success", "message": "Webhook received, but couldn't attribute sale"}
-            
-        return {"status": "success", "message": "Webhook received"}
+    attribution = UTMTracker.get_attribution_chain(db, sale.id)
+    
+    if not attribution:
+        raise HTTPException(status_code=404, detail="Sale not found or attribution chain incomplete")
         
-    except Exception as e:
-        logger.error(f"Error processing Stripe webhook: {e}")
-        raise HTTPException(status_code=500, detail=f"Error processing webhook: {str(e)}")
+    return attribution
 
 @router.get("/attribution/{sale_id}")
 async def get_attribution(
     sale_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get the complete attribution chain for a sale
@@ -174,4 +188,27 @@ async def get_attribution(
     if not attribution:
         raise HTTPException(status_code=404, detail="Sale not found or attribution chain incomplete")
         
-    return attribution 
\ No newline at end of file
+    return attribution 
+
+@router.post("/attribution/batch")
+def get_attribution_batch(request: AttributionBatchRequest):
+    """
+    Stream attribution chains for a list of sales or a date range
+    
+    The response is newline-delimited JSON, one chain per line. Sales
+    without a complete chain are omitted.
+    """
+    def generate():
+        # The request's session is closed before a streamed body is sent,
+        # so the stream owns its own, on the read replica when it is fresh
+        db = read_session()
+        try:
+            chains = UTMTracker.iter_attribution_chains(
+                db, sale_ids=request.sale_ids, start=request.start, end=request.end
+            )
+            for chain in chains:
+                yield json.dumps(jsonable_encoder(chain)) + "\n"
+        finally:
+            db.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,101 @@
+import logging
+from typing import Iterable, List
+
+from sqlalchemy import bindparam, inspect, select, update
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models import BookingEvent, hash_email
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def add_missing_columns(engine: Engine) -> List[str]:
+    """
+    Add columns declared on the models but missing from existing tables.
+
+    create_all never alters a table that already exists, so new nullable
+    columns are added here with a plain ALTER TABLE.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        List of added columns as "table.column"
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                )
+                added.append(f"{table.name}.{column.name}")
+
+    for name in added:
+        logger.info(f"Added missing column {name}")
+    return added
+
+def create_missing_indexes(engine: Engine, exclude: Iterable[str] = ()) -> None:
+    """
+    Create indexes declared on the models that don't exist yet.
+
+    create_all skips the indexes of tables that already exist.
+
+    Args:
+        engine: SQLAlchemy engine
+        exclude: Index names left to a later migration
+    """
+    exclude = set(exclude)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in exclude:
+                index.create(bind=engine, checkfirst=True)
+
+def backfill_email_hashes(engine: Engine, batch_size: int = 1000) -> int:
+    """
+    Fill booking_events.email_hash for rows written before the column existed
+
+    Args:
+        engine: SQLAlchemy engine
+        batch_size: Rows updated per transaction
+
+    Returns:
+        Number of rows updated
+    """
+    updated = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(BookingEvent.id, BookingEvent.email).where(
+                    BookingEvent.email_hash.is_(None),
+                    BookingEvent.email.isnot(None)
+                ).limit(batch_size)
+            ).all()
+
+            if not rows:
+                break
+
+            # Rows whose email normalizes to nothing get an empty hash so
+            # they are not selected again
+            table = BookingEvent.__table__
+            conn.execute(
+                update(table).where(
+                    table.c.id == bindparam("row_id")
+                ).values(email_hash=bindparam("new_hash")),
+                [{"row_id": row.id, "new_hash": hash_email(row.email) or ""} for row in rows]
+            )
+            updated += len(rows)
+
+    if updated:
+        logger.info(f"Backfilled email_hash for {updated} bookings")
+    return updated
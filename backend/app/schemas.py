@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, HttpUrl, Field, EmailStr, model_validator
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 # Link schemas
@@ -9,7 +9,8 @@ class LinkBase(BaseModel):
     destination_url: HttpUrl
 
 class LinkCreate(LinkBase):
-    pass
+    # YouTube video ID, so the worker can refresh the video's metrics
+    youtube_id: Optional[str] = None
 
 class Link(LinkBase):
     id: int
@@ -23,10 +24,12 @@ class Link(LinkBase):
 class VideoMetricsBase(BaseModel):
     slug: str
     title: str
+    youtube_id: Optional[str] = None
     views: int = 0
     likes: int = 0
     comments: int = 0
     avg_watch_time: float = 0.0
+    avg_view_percentage: Optional[float] = None
 
 class VideoMetricsCreate(VideoMetricsBase):
     pass
@@ -107,4 +110,97 @@ class DashboardResponse(BaseModel):
     show_up_rate: float
     closing_rate: float
     average_order_value: float
-    videos: List[VideoMetricsResponse] 
\ No newline at end of file
+    videos: List[VideoMetricsResponse] 
+
+# Calendly webhook schemas
+class CalendlyQuestionAnswer(BaseModel):
+    question: str = ""
+    answer: Optional[str] = ""
+
+class CalendlyInvitee(BaseModel):
+    email: Optional[str] = None
+    name: Optional[str] = None
+    uri: Optional[str] = None
+    uuid: Optional[str] = None
+    created_at: Optional[str] = None
+    questions_and_answers: List[CalendlyQuestionAnswer] = []
+
+class CalendlyTracking(BaseModel):
+    utm_source: Optional[str] = None
+    utm_campaign: Optional[str] = None
+    # Only present when the booking page forwards them
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+
+class CalendlyPayload(BaseModel):
+    invitee: CalendlyInvitee = CalendlyInvitee()
+    tracking: Optional[CalendlyTracking] = None
+    uri: Optional[str] = None
+    created_at: Optional[str] = None
+
+class CalendlyEvent(BaseModel):
+    event: Optional[str] = None
+    payload: CalendlyPayload = CalendlyPayload()
+
+# Stripe webhook schemas
+class StripeObject(BaseModel):
+    id: Optional[str] = None
+    created: Optional[int] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+class StripeCheckoutSession(StripeObject):
+    payment_intent: Optional[str] = None
+    customer_email: Optional[str] = None
+    amount_total: Optional[int] = None
+
+class StripePaymentIntent(StripeObject):
+    receipt_email: Optional[str] = None
+    amount: Optional[int] = None
+
+class StripeEventData(BaseModel):
+    # Validated into the object schema of the event type by its handler
+    object: Dict[str, Any] = {}
+
+class StripeEvent(BaseModel):
+    id: Optional[str] = None
+    type: Optional[str] = None
+    created: Optional[int] = None
+    data: StripeEventData = StripeEventData()
+
+# Attribution schemas
+class AttributionBatchRequest(BaseModel):
+    sale_ids: Optional[List[int]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.sale_ids is None and self.start is None and self.end is None:
+            raise ValueError("Provide sale_ids or a start/end date range")
+        return self
+
+# Multi-touch attribution schemas
+class VideoAttributionCredit(BaseModel):
+    video_id: int
+    slug: str
+    title: str
+    conversions: float  # sum of fractional sale credit
+    revenue: float
+
+class AttributionCreditResponse(BaseModel):
+    model: str
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    total_revenue: float
+    videos: List[VideoAttributionCredit]
+
+# Video metrics history, as parallel arrays for charting
+class VideoHistoryResponse(BaseModel):
+    slug: str
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    timestamps: List[datetime]
+    resolutions: List[str]  # raw, daily or weekly per point
+    views: List[int]
+    likes: List[int]
+    comments: List[int]
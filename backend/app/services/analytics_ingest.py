@@ -0,0 +1,123 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import ANALYTICS_LOOKBACK_DAYS, YOUTUBE_ANALYTICS_BASE_URL
+from app.models import VideoMetrics
+from app.services.http_client import http_client
+from app.services.token_cache import token_cache
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# YouTube Analytics API reports endpoint
+YOUTUBE_ANALYTICS_REPORTS_URL = f"{YOUTUBE_ANALYTICS_BASE_URL}/reports"
+
+# Largest page the per-video report allows
+REPORT_PAGE_SIZE = 200
+
+REPORT_METRICS = "views,estimatedMinutesWatched,averageViewDuration,averageViewPercentage"
+
+
+def iter_video_report(
+    access_token: str,
+    start_date: date,
+    end_date: date,
+    page_size: int = REPORT_PAGE_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the channel-level report grouped by video, page by page
+
+    Args:
+        access_token: OAuth access token with the yt-analytics scope
+        start_date: First day of the report
+        end_date: Last day of the report
+        page_size: Rows per request
+
+    Yields:
+        One dict per video keyed by column name ("video", "views", ...)
+
+    Raises:
+        requests.RequestException: If a page request fails
+    """
+    headers = {"Authorization": f"Bearer {access_token}"}
+    start_index = 1
+
+    while True:
+        response = http_client.get(YOUTUBE_ANALYTICS_REPORTS_URL, service="youtube_analytics", headers=headers, params={
+            "ids": "channel==MINE",
+            "startDate": start_date.isoformat(),
+            "endDate": end_date.isoformat(),
+            "dimensions": "video",
+            "metrics": REPORT_METRICS,
+            "sort": "-views",
+            "maxResults": page_size,
+            "startIndex": start_index
+        })
+        response.raise_for_status()
+        data = response.json()
+
+        columns = [header["name"] for header in data.get("columnHeaders", [])]
+        rows = data.get("rows") or []
+        for row in rows:
+            yield dict(zip(columns, row))
+
+        if len(rows) < page_size:
+            return
+        start_index += len(rows)
+
+
+def ingest_video_analytics(db: Session, days: int = ANALYTICS_LOOKBACK_DAYS,
+                           today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Update watch time and retention for every tracked video from one report
+
+    The report covers the whole channel, so one paged request sequence
+    replaces a call per video. Rows for videos we don't track are skipped,
+    and all matched videos are written with a single bulk UPDATE.
+
+    Args:
+        db: Database session
+        days: Number of days, ending today, the report covers
+        today: Last day of the report (default: today, UTC)
+
+    Returns:
+        Dict with the number of report rows read and videos updated
+    """
+    access_token = token_cache.get_access_token(db)
+    if not access_token:
+        logger.error("YouTube Analytics needs an OAuth token; connect YouTube first")
+        return {"rows": 0, "updated": 0}
+
+    ids_by_youtube_id = dict(
+        db.query(VideoMetrics.youtube_id, VideoMetrics.id).filter(VideoMetrics.youtube_id.isnot(None)).all()
+    )
+
+    end_date = today or datetime.utcnow().date()
+    start_date = end_date - timedelta(days=days - 1)
+    now = datetime.utcnow()
+
+    rows = 0
+    updates = []
+    for row in iter_video_report(access_token, start_date, end_date):
+        rows += 1
+        video_id = ids_by_youtube_id.get(row.get("video"))
+        if video_id is None:
+            continue
+        updates.append({
+            "id": video_id,
+            "avg_watch_time": float(row.get("averageViewDuration") or 0),
+            "avg_view_percentage": float(row.get("averageViewPercentage") or 0),
+            "watch_time_minutes": float(row.get("estimatedMinutesWatched") or 0),
+            "analytics_updated_at": now
+        })
+
+    if updates:
+        db.execute(update(VideoMetrics), updates)
+        db.commit()
+
+    logger.info(f"Ingested analytics for {len(updates)} videos from {rows} report rows ({start_date} to {end_date})")
+    return {"rows": rows, "updated": len(updates)}
@@ -1,13 +1,23 @@
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import json
 
 from app.config import (
     YOUTUBE_API_KEY,
     STRIPE_API_KEY,
-    CALENDLY_API_KEY
+    CALENDLY_API_KEY,
+    YOUTUBE_API_BASE_URL,
+    STRIPE_API_BASE_URL,
+    CALENDLY_API_BASE_URL,
+    API_HEALTH_TTL_SECONDS,
+    API_HEALTH_TIMEOUT_SECONDS
 )
+from app.services.http_client import http_client
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -27,7 +37,7 @@ def check_youtube_api() -> Dict[str, Any]:
         }
     
     try:
-        url = "https://www.googleapis.com/youtube/v3/videos"
+        url = f"{YOUTUBE_API_BASE_URL}/videos"
         params = {
             "part": "snippet",
             "chart": "mostPopular",
@@ -35,7 +45,8 @@ def check_youtube_api() -> Dict[str, Any]:
             "key": YOUTUBE_API_KEY
         }
         
-        response = requests.get(url, params=params)
+        # No retries: a health check should report the API as it is now
+        response = http_client.get(url, service="youtube", params=params, retries=0, timeout=API_HEALTH_TIMEOUT_SECONDS)
         
         if response.status_code == 200:
             return {
@@ -78,12 +89,12 @@ def check_stripe_api() -> Dict[str, Any]:
     
     try:
         # We'll just check a simple endpoint that requires authentication
-        url = "https://api.stripe.com/v1/balance"
+        url = f"{STRIPE_API_BASE_URL}/v1/balance"
         headers = {
             "Authorization": f"Bearer {STRIPE_API_KEY}"
         }
         
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, service="stripe", headers=headers, retries=0, timeout=API_HEALTH_TIMEOUT_SECONDS)
         
         if response.status_code == 200:
             return {
@@ -125,12 +136,12 @@ def check_calendly_api() -> Dict[str, Any]:
         }
     
     try:
-        url = "https://api.calendly.com/users/me"
+        url = f"{CALENDLY_API_BASE_URL}/users/me"
         headers = {
             "Authorization": f"Bearer {CALENDLY_API_KEY}"
         }
         
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, service="calendly", headers=headers, retries=0, timeout=API_HEALTH_TIMEOUT_SECONDS)
         
         if response.status_code == 200:
             return {
@@ -157,17 +168,106 @@ def check_calendly_api() -> Dict[str, Any]:
             "message": f"Connection error: {str(e)}"
         }
 
-def check_all_apis() -> List[Dict[str, Any]]:
+# (service name, check) pairs run by check_all_apis
+API_CHECKS: List[Tuple[str, Callable[[], Dict[str, Any]]]] = [
+    ("YouTube API", check_youtube_api),
+    ("Stripe API", check_stripe_api),
+    ("Calendly API", check_calendly_api)
+]
+
+# One thread per check so a slow API doesn't delay the others
+_executor = ThreadPoolExecutor(max_workers=len(API_CHECKS), thread_name_prefix="api-health")
+
+def check_all_apis(timeout: float = API_HEALTH_TIMEOUT_SECONDS) -> List[Dict[str, Any]]:
     """
-    Check all configured APIs and return their status
+    Check all configured APIs concurrently and return their status
+    
+    Args:
+        timeout: Seconds to wait for all checks; a check still running
+            after that is reported as an error
     
     Returns:
         List of API status dictionaries
     """
+    futures = [_executor.submit(check) for _, check in API_CHECKS]
+    wait(futures, timeout=timeout)
+    
     results = []
+    for (service, _), future in zip(API_CHECKS, futures):
+        if future.done():
+            results.append(future.result())
+        else:
+            results.append({
+                "service": service,
+                "status": "error",
+                "message": f"Check timed out after {timeout:g}s"
+            })
     
-    results.append(check_youtube_api())
-    results.append(check_stripe_api())
-    results.append(check_calendly_api())
+    return results
+
+class ApiHealthCache:
+    """
+    Latest check_all_apis results, refreshed in the background.
+    
+    Readers get the cached results immediately, with each result's age,
+    so polling /status/api-status never waits on or spends quota with the
+    third-party APIs. Only the very first read, before any refresh has
+    finished, runs the checks inline.
+    """
     
-    return results 
\ No newline at end of file
+    def __init__(self, ttl: float = API_HEALTH_TTL_SECONDS):
+        self.ttl = ttl
+        self._results: List[Dict[str, Any]] = []
+        self._checked_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last refresh, or None before the first one"""
+        checked_at = self._checked_at
+        return (datetime.utcnow() - checked_at).total_seconds() if checked_at else None
+    
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Run the checks now and cache their results"""
+        started = time.monotonic()
+        results = check_all_apis()
+        checked_at = datetime.utcnow()
+        with self._lock:
+            self._results = results
+            self._checked_at = checked_at
+        logger.info(f"API health checked in {time.monotonic() - started:.2f}s")
+        return results
+    
+    def get(self) -> Dict[str, Any]:
+        """
+        Cached results, refreshing inline only if there are none yet
+        
+        Returns:
+            Dict with the results, when they were checked and their age in seconds
+        """
+        with self._lock:
+            results, checked_at = self._results, self._checked_at
+        if checked_at is None:
+            self.refresh()
+            with self._lock:
+                results, checked_at = self._results, self._checked_at
+        
+        age = (datetime.utcnow() - checked_at).total_seconds()
+        return {
+            "checked_at": checked_at.isoformat(),
+            "age_seconds": round(age, 1),
+            "stale": age > self.ttl * 2,
+            "apis": [dict(result, age_seconds=round(age, 1)) for result in results]
+        }
+    
+    async def run(self) -> None:
+        """Refresh every ttl seconds until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception as e:
+                logger.error(f"API health refresh failed: {e}")
+            await asyncio.sleep(self.ttl)
+
+# Shared cache for the process
+api_health_cache = ApiHealthCache()
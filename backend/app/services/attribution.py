@@ -0,0 +1,226 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import VideoMetrics, BookingEvent, SaleEvent
+from app.schemas import (
+    CalendlyEvent,
+    CalendlyTracking,
+    StripeEvent,
+    StripeCheckoutSession,
+    StripePaymentIntent
+)
+from app.services.click_matcher import BookingSignal, ClickCandidate, click_matcher
+from app.services.utm import UTMTracker
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Stripe events that represent a completed payment, with their object schema
+STRIPE_SALE_OBJECTS = {
+    "checkout.session.completed": StripeCheckoutSession,
+    "payment_intent.succeeded": StripePaymentIntent
+}
+
+
+@dataclass
+class CalendlyBooking:
+    """Booking details extracted from a Calendly invitee.created event"""
+    email: Optional[str]
+    name: Optional[str]
+    utm_source: Optional[str]
+    utm_campaign: Optional[str]
+    signal: BookingSignal
+    external_id: Optional[str] = None
+
+
+@dataclass
+class StripeSale:
+    """Sale details extracted from a Stripe payment event"""
+    email: Optional[str]
+    amount: Optional[float]
+    booking_id: Optional[int]
+    timestamp: datetime
+    external_id: Optional[str] = None
+
+
+def parse_calendly_timestamp(value: Optional[str]) -> datetime:
+    """
+    Parse a Calendly ISO 8601 timestamp into a naive UTC datetime
+
+    Falls back to the current time when the value is missing or invalid.
+    """
+    if value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if parsed.tzinfo:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+        except ValueError:
+            logger.warning(f"Invalid Calendly timestamp: {value}")
+    return datetime.utcnow()
+
+
+def parse_calendly_event(event: CalendlyEvent) -> Optional[CalendlyBooking]:
+    """
+    Extract booking details from a Calendly webhook event
+
+    Args:
+        event: Validated webhook event
+
+    Returns:
+        CalendlyBooking or None if the event is not a new booking
+    """
+    if event.event != "invitee.created":
+        return None
+
+    payload = event.payload
+    invitee = payload.invitee
+
+    # Look in tracking parameters
+    tracking = payload.tracking or CalendlyTracking()
+    utm_source = tracking.utm_source
+    utm_campaign = tracking.utm_campaign
+
+    # Look in questions for tracking info
+    for qa in invitee.questions_and_answers:
+        question = qa.question.lower()
+
+        if "how did you hear" in question or "referral" in question:
+            if not utm_source:
+                utm_source = qa.answer
+
+    # Visitor IP and user agent are only present when the booking page
+    # forwards them in the tracking parameters
+    signal = BookingSignal(
+        timestamp=parse_calendly_timestamp(invitee.created_at or payload.created_at),
+        ip_address=tracking.ip_address,
+        user_agent=tracking.user_agent
+    )
+
+    return CalendlyBooking(
+        email=invitee.email,
+        name=invitee.name,
+        utm_source=utm_source,
+        utm_campaign=utm_campaign,
+        signal=signal,
+        external_id=invitee.uri or invitee.uuid or payload.uri
+    )
+
+
+def parse_stripe_event(event: StripeEvent) -> Optional[StripeSale]:
+    """
+    Extract sale details from a Stripe webhook event
+
+    Args:
+        event: Validated webhook event
+
+    Returns:
+        StripeSale or None if the event is not a completed payment
+
+    Raises:
+        pydantic.ValidationError: If the event object doesn't match its type
+    """
+    object_model = STRIPE_SALE_OBJECTS.get(event.type)
+    if object_model is None:
+        return None
+
+    payload = object_model.model_validate(event.data.object)
+    if isinstance(payload, StripeCheckoutSession):
+        email = payload.customer_email
+        amount = payload.amount_total
+        # A checkout session and its payment intent describe the same
+        # payment, so both are keyed by the payment intent id
+        external_id = payload.payment_intent or payload.id
+    else:
+        email = payload.receipt_email
+        amount = payload.amount
+        external_id = payload.id
+
+    if amount:
+        # Convert from cents to dollars for Stripe
+        amount = amount / 100
+
+    # Get metadata to look for UTM or tracking info
+    metadata = payload.metadata or {}
+    try:
+        booking_id = int(metadata["booking_id"]) if metadata.get("booking_id") else None
+    except (TypeError, ValueError):
+        booking_id = None
+
+    created = event.created or payload.created
+    timestamp = datetime.utcfromtimestamp(created) if created else datetime.utcnow()
+
+    return StripeSale(
+        email=email,
+        amount=amount,
+        booking_id=booking_id,
+        timestamp=timestamp,
+        external_id=external_id
+    )
+
+
+def booking_exists(db: Session, external_id: Optional[str]) -> bool:
+    """Check whether a Calendly booking was already recorded"""
+    if not external_id:
+        return False
+    return db.query(BookingEvent.id).filter(BookingEvent.external_id == external_id).first() is not None
+
+
+def sale_exists(db: Session, external_id: Optional[str]) -> bool:
+    """Check whether a Stripe payment was already recorded"""
+    if not external_id:
+        return False
+    return db.query(SaleEvent.id).filter(SaleEvent.external_id == external_id).first() is not None
+
+
+def resolve_booking_click(db: Session, booking: CalendlyBooking) -> Optional[ClickCandidate]:
+    """
+    Find the click a booking should be attributed to
+
+    The UTM campaign identifies the video, then the click matcher scores
+    that video's clicks around the booking time.
+
+    Args:
+        db: Database session
+        booking: Parsed booking
+
+    Returns:
+        Matching click or None if the booking can't be attributed
+    """
+    if not booking.utm_campaign:
+        return None
+
+    video = db.query(VideoMetrics).filter(VideoMetrics.slug == booking.utm_campaign).first()
+    if not video:
+        return None
+
+    return click_matcher.match(db, video.id, booking.signal)
+
+
+def resolve_sale_booking(db: Session, sale: StripeSale) -> Optional[BookingEvent]:
+    """
+    Find the booking a sale should be attributed to
+
+    Uses the booking id from the payment metadata when present, otherwise
+    the customer's most recent booking.
+
+    Args:
+        db: Database session
+        sale: Parsed sale
+
+    Returns:
+        Matching BookingEvent or None if the sale can't be attributed
+    """
+    if sale.booking_id:
+        booking = db.query(BookingEvent).filter(BookingEvent.id == sale.booking_id).first()
+        if booking:
+            return booking
+
+    if sale.email:
+        return UTMTracker.find_latest_booking_by_email(db, sale.email)
+
+    return None
@@ -0,0 +1,322 @@
+import logging
+import sys
+import time
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import VideoMetrics, ClickEvent, BookingEvent, SaleEvent, hash_email
+from app.schemas import CalendlyEvent, StripeEvent
+from app.services.attribution import (
+    CalendlyBooking,
+    StripeSale,
+    parse_calendly_event,
+    parse_stripe_event
+)
+from app.services.click_matcher import CLOCK_SKEW, ClickCandidate, click_matcher
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+EventT = TypeVar("EventT", bound=BaseModel)
+
+
+@dataclass
+class BackfillStats:
+    """Counters reported while an import runs"""
+    label: str
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    unattributed: int = 0
+    ignored: int = 0
+    invalid: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        return self.read / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.label}: {self.read} events read, {self.inserted} inserted, "
+            f"{self.duplicates} duplicates, {self.unattributed} unattributed, "
+            f"{self.ignored} ignored, {self.invalid} invalid "
+            f"({self.rate:.0f} events/s, {self.elapsed:.1f}s)"
+        )
+
+
+def read_ndjson(path: str) -> Iterator[str]:
+    """Stream non-blank lines from an NDJSON export ("-" reads stdin)"""
+    handle = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield line
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def validate_event(model: Type[EventT], line: str, stats: BackfillStats) -> Optional[EventT]:
+    """Parse and validate one exported event in a single pass"""
+    try:
+        return model.model_validate_json(line)
+    except ValidationError as e:
+        stats.invalid += 1
+        logger.warning(f"{stats.label}: invalid event skipped ({e.error_count()} errors)")
+        return None
+
+
+def batched(iterable: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterator into lists of at most size items"""
+    while True:
+        batch = list(islice(iterable, size))
+        if not batch:
+            return
+        yield batch
+
+
+class BackfillImporter:
+    """
+    Bulk importer for historical Calendly and Stripe webhook events.
+
+    Events go through the same parsing and attribution rules as
+    routes/webhooks.py, but lookups are served from maps preloaded once per
+    run and results are written with one multi-row INSERT per batch.
+    Import Calendly exports before Stripe exports so sales can be
+    attributed to the bookings they follow.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+
+        # slug -> video id
+        self.videos: Dict[str, int] = {}
+        # email hash -> [(booking timestamp, booking id)] sorted by time
+        self.bookings_by_email: Dict[str, List[Tuple[datetime, int]]] = {}
+        self.booking_ids: Set[int] = set()
+        self.booking_external_ids: Set[str] = set()
+        self.sale_external_ids: Set[str] = set()
+
+        self._load_lookups()
+
+    def _load_lookups(self) -> None:
+        """Preload the lookup maps used for attribution and deduplication"""
+        self.videos = dict(self.db.query(VideoMetrics.slug, VideoMetrics.id).all())
+
+        rows = self.db.query(
+            BookingEvent.id,
+            BookingEvent.email_hash,
+            BookingEvent.timestamp,
+            BookingEvent.external_id
+        ).all()
+        for booking_id, email_hash, timestamp, external_id in rows:
+            self.booking_ids.add(booking_id)
+            if external_id:
+                self.booking_external_ids.add(external_id)
+            if email_hash:
+                self.bookings_by_email.setdefault(email_hash, []).append(
+                    (timestamp or datetime.min, booking_id)
+                )
+        for entries in self.bookings_by_email.values():
+            entries.sort()
+
+        self.sale_external_ids = {
+            external_id for (external_id,) in
+            self.db.query(SaleEvent.external_id).filter(SaleEvent.external_id.isnot(None)).all()
+        }
+
+        logger.info(
+            f"Loaded {len(self.videos)} videos, {len(self.booking_ids)} bookings "
+            f"and {len(self.sale_external_ids)} sales for backfill"
+        )
+
+    def _load_clicks(self, bookings: List[Tuple[int, CalendlyBooking]]) -> Dict[int, List[ClickCandidate]]:
+        """
+        Load the clicks that can match any booking in a batch with one query
+
+        Returns:
+            Clicks per video id, oldest first
+        """
+        video_ids = {video_id for video_id, _ in bookings}
+        start = min(b.signal.timestamp for _, b in bookings) - click_matcher.window
+        end = max(b.signal.timestamp for _, b in bookings) + CLOCK_SKEW
+
+        rows = self.db.query(
+            ClickEvent.id,
+            ClickEvent.video_id,
+            ClickEvent.ip_address,
+            ClickEvent.user_agent,
+            ClickEvent.timestamp
+        ).filter(
+            ClickEvent.video_id.in_(video_ids),
+            ClickEvent.timestamp >= start,
+            ClickEvent.timestamp <= end
+        ).order_by(ClickEvent.video_id, ClickEvent.timestamp).all()
+
+        clicks: Dict[int, List[ClickCandidate]] = {}
+        for row in rows:
+            clicks.setdefault(row.video_id, []).append(ClickCandidate(*row))
+        return clicks
+
+    def _match_click(self, clicks: List[ClickCandidate], timestamps: List[datetime],
+                     booking: CalendlyBooking) -> Optional[ClickCandidate]:
+        """Pick the best click inside the matching window, like the webhook does"""
+        lo = bisect_left(timestamps, booking.signal.timestamp - click_matcher.window)
+        hi = bisect_right(timestamps, booking.signal.timestamp + CLOCK_SKEW)
+        lo = max(lo, hi - click_matcher.max_candidates)
+        return click_matcher.best_match(booking.signal, clicks[lo:hi][::-1])
+
+    def import_calendly(self, path: str) -> BackfillStats:
+        """
+        Import Calendly invitee events from an NDJSON export
+
+        Args:
+            path: Path to the export
+
+        Returns:
+            Import statistics
+        """
+        stats = BackfillStats(label=f"Calendly {path}")
+
+        for batch in batched(read_ndjson(path), self.batch_size):
+            stats.read += len(batch)
+            attributable: List[Tuple[int, CalendlyBooking]] = []
+
+            for line in batch:
+                event = validate_event(CalendlyEvent, line, stats)
+                booking = parse_calendly_event(event) if event else None
+                if booking is None:
+                    if event:
+                        stats.ignored += 1
+                    continue
+                if booking.external_id and booking.external_id in self.booking_external_ids:
+                    stats.duplicates += 1
+                    continue
+                video_id = self.videos.get(booking.utm_campaign) if booking.utm_campaign else None
+                if video_id is None:
+                    stats.unattributed += 1
+                    continue
+                if booking.external_id:
+                    self.booking_external_ids.add(booking.external_id)
+                attributable.append((video_id, booking))
+
+            rows = []
+            if attributable:
+                clicks = self._load_clicks(attributable)
+                timestamps = {video_id: [c.timestamp for c in video_clicks]
+                              for video_id, video_clicks in clicks.items()}
+
+                for video_id, booking in attributable:
+                    click = self._match_click(clicks.get(video_id, []), timestamps.get(video_id, []), booking)
+                    if click is None:
+                        stats.unattributed += 1
+                        continue
+                    rows.append({
+                        "click_id": click.id,
+                        "email": booking.email,
+                        "email_hash": hash_email(booking.email),
+                        "name": booking.name,
+                        "timestamp": booking.signal.timestamp,
+                        "external_id": booking.external_id
+                    })
+
+            if rows:
+                inserted = self.db.execute(
+                    insert(BookingEvent).returning(BookingEvent.id, BookingEvent.email_hash, BookingEvent.timestamp),
+                    rows
+                ).all()
+                self.db.commit()
+                stats.inserted += len(inserted)
+
+                # Later Stripe events in this run can attribute to these bookings
+                for booking_id, email_hash, timestamp in inserted:
+                    self.booking_ids.add(booking_id)
+                    if email_hash:
+                        insort(self.bookings_by_email.setdefault(email_hash, []), (timestamp, booking_id))
+
+            logger.info(stats.summary())
+
+        return stats
+
+    def _find_booking(self, sale: StripeSale) -> Optional[int]:
+        """Resolve a sale to a booking id using the preloaded maps"""
+        if sale.booking_id and sale.booking_id in self.booking_ids:
+            return sale.booking_id
+
+        email_hash = hash_email(sale.email)
+        if not email_hash:
+            return None
+
+        # Latest booking made before the payment
+        entries = self.bookings_by_email.get(email_hash)
+        if not entries:
+            return None
+        index = bisect_right(entries, (sale.timestamp, sys.maxsize))
+        return entries[index - 1][1] if index else None
+
+    def import_stripe(self, path: str) -> BackfillStats:
+        """
+        Import Stripe payment events from an NDJSON export
+
+        Args:
+            path: Path to the export
+
+        Returns:
+            Import statistics
+        """
+        stats = BackfillStats(label=f"Stripe {path}")
+
+        for batch in batched(read_ndjson(path), self.batch_size):
+            stats.read += len(batch)
+            rows = []
+
+            for line in batch:
+                event = validate_event(StripeEvent, line, stats)
+                try:
+                    sale = parse_stripe_event(event) if event else None
+                except ValidationError:
+                    stats.invalid += 1
+                    continue
+                if sale is None:
+                    if event:
+                        stats.ignored += 1
+                    continue
+                if sale.external_id and sale.external_id in self.sale_external_ids:
+                    stats.duplicates += 1
+                    continue
+                booking_id = self._find_booking(sale)
+                if booking_id is None:
+                    stats.unattributed += 1
+                    continue
+                if sale.external_id:
+                    self.sale_external_ids.add(sale.external_id)
+                rows.append({
+                    "booking_id": booking_id,
+                    "amount": sale.amount,
+                    "timestamp": sale.timestamp,
+                    "external_id": sale.external_id
+                })
+
+            if rows:
+                self.db.execute(insert(SaleEvent), rows)
+                self.db.commit()
+                stats.inserted += len(rows)
+
+            logger.info(stats.summary())
+
+        return stats
@@ -4,14 +4,12 @@ import hmac
 import hashlib
 from typing import Dict, Any, List, Optional
 
-from app.config import CALENDLY_API_KEY, CALENDLY_WEBHOOK_SECRET
+from app.config import CALENDLY_API_KEY, CALENDLY_WEBHOOK_SECRET, CALENDLY_API_BASE_URL
+from app.services.http_client import http_client
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Calendly API base URL
-CALENDLY_API_BASE_URL = "https://api.calendly.com"
-
 def get_user_events(user_uri: str, count: int = 10) -> List[Dict[str, Any]]:
     """
     Get scheduled events for a Calendly user
@@ -39,7 +37,7 @@ def get_user_events(user_uri: str, count: int = 10) -> List[Dict[str, Any]]:
             "status": "active"
         }
         
-        response = requests.get(url, headers=headers, params=params)
+        response = http_client.get(url, service="calendly", headers=headers, params=params)
         response.raise_for_status()
         
         data = response.json()
@@ -72,7 +70,7 @@ def get_event_details(event_uuid: str) -> Optional[Dict[str, Any]]:
             "Content-Type": "application/json"
         }
         
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, service="calendly", headers=headers)
         response.raise_for_status()
         
         return response.json().get("resource")
@@ -104,7 +102,7 @@ def get_event_invitees(event_uuid: str) -> List[Dict[str, Any]]:
             "Content-Type": "application/json"
         }
         
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, service="calendly", headers=headers)
         response.raise_for_status()
         
         return response.json().get("collection", [])
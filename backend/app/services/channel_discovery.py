@@ -0,0 +1,147 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Link, VideoMetrics
+from app.services.youtube import get_channel_statistics, get_request_auth, iter_playlist_items
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement; keeps bound parameters under SQLite's limit
+UPSERT_CHUNK_SIZE = 1000
+
+YOUTUBE_WATCH_URL = "https://www.youtube.com/watch?v={}"
+
+
+class ChannelDiscoveryError(Exception):
+    """The channel or its uploads playlist could not be resolved"""
+
+
+def parse_published_at(value: str) -> Optional[datetime]:
+    """Parse a Data API RFC 3339 timestamp into a naive UTC datetime"""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        logger.warning(f"Invalid publish date: {value}")
+        return None
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def dialect_insert(db: Session):
+    """INSERT construct with ON CONFLICT support for the session's database"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+def list_channel_uploads(db: Session, channel_id: str) -> List[Tuple[str, str, Optional[datetime]]]:
+    """
+    List every public upload of a channel
+
+    Args:
+        db: Database session for OAuth token
+        channel_id: YouTube channel ID
+
+    Returns:
+        (video ID, title, publish date) tuples, newest first
+
+    Raises:
+        ChannelDiscoveryError: If the channel or its uploads playlist can't be resolved
+        requests.RequestException: If a page request fails
+    """
+    channel = get_channel_statistics(channel_id, db)
+    if not channel or not channel.get("uploads_playlist_id"):
+        raise ChannelDiscoveryError(f"Could not resolve uploads playlist for channel {channel_id}")
+
+    auth = get_request_auth(db)
+    if auth is None:
+        raise ChannelDiscoveryError("No YouTube authentication method available")
+
+    videos: Dict[str, Tuple[str, str, Optional[datetime]]] = {}
+    for item in iter_playlist_items(channel["uploads_playlist_id"], auth):
+        details = item.get("contentDetails", {})
+        # Private and deleted videos have no publish date
+        if not details.get("videoId") or not details.get("videoPublishedAt"):
+            continue
+        video_id = details["videoId"]
+        title = item.get("snippet", {}).get("title") or video_id
+        videos[video_id] = (video_id, title, parse_published_at(details["videoPublishedAt"]))
+    return list(videos.values())
+
+
+def upsert_channel_videos(db: Session, videos: List[Tuple[str, str, Optional[datetime]]]) -> Dict[str, int]:
+    """
+    Create a VideoMetrics row and tracking link per video, keyed by YouTube ID
+
+    Uses multi-row INSERT ... ON CONFLICT statements in one transaction.
+    Existing videos get their title and publish date updated; new ones get
+    the YouTube ID as their slug. The publish date, not the discovery time,
+    is what the refresh scheduler ages a video by.
+
+    Args:
+        db: Database session
+        videos: (video ID, title, publish date) tuples
+
+    Returns:
+        Dict with the number of videos seen and created
+    """
+    insert = dialect_insert(db)
+    existing = 0
+    now = datetime.utcnow()
+
+    for i in range(0, len(videos), UPSERT_CHUNK_SIZE):
+        chunk = videos[i:i + UPSERT_CHUNK_SIZE]
+        tracked = {youtube_id for (youtube_id,) in db.query(VideoMetrics.youtube_id).filter(
+            VideoMetrics.youtube_id.in_([youtube_id for youtube_id, _, _ in chunk])
+        ).all()}
+        existing += len(tracked)
+
+        statement = insert(VideoMetrics).values([
+            {
+                "slug": youtube_id, "title": title, "youtube_id": youtube_id,
+                "published_at": published_at, "created_at": now, "updated_at": now
+            }
+            for youtube_id, title, published_at in chunk
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[VideoMetrics.youtube_id],
+            set_={
+                "title": statement.excluded.title,
+                "published_at": statement.excluded.published_at,
+                "updated_at": now
+            }
+        ))
+
+        # Videos tracked before keep their own link and slug
+        new_links = [
+            {"slug": youtube_id, "title": title, "destination_url": YOUTUBE_WATCH_URL.format(youtube_id), "created_at": now}
+            for youtube_id, title, _ in chunk if youtube_id not in tracked
+        ]
+        if new_links:
+            db.execute(insert(Link).values(new_links).on_conflict_do_nothing(index_elements=[Link.slug]))
+
+    db.commit()
+    return {"videos": len(videos), "created": len(videos) - existing}
+
+
+def discover_channel(db: Session, channel_id: str) -> Dict[str, int]:
+    """
+    Start tracking every upload of a channel
+
+    Args:
+        db: Database session
+        channel_id: YouTube channel ID
+
+    Returns:
+        Dict with the number of videos seen and created
+    """
+    videos = list_channel_uploads(db, channel_id)
+    result = upsert_channel_videos(db, videos)
+    logger.info(f"Discovered {result['videos']} uploads for channel {channel_id} ({result['created']} new)")
+    return result
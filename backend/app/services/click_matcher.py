@@ -0,0 +1,267 @@
+import ipaddress
+import logging
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import (
+    CLICK_MATCH_WINDOW_HOURS,
+    CLICK_MATCH_HALF_LIFE_HOURS,
+    CLICK_MATCH_MAX_CANDIDATES,
+    CLICK_MATCH_MIN_SCORE,
+    CLICK_MATCH_BUFFER_SIZE
+)
+from app.models import ClickEvent
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Relative weight of each signal in the final score
+IP_WEIGHT = 0.5
+USER_AGENT_WEIGHT = 0.3
+TIME_WEIGHT = 0.2
+
+# Clicks recorded slightly after the booking are still accepted to absorb
+# clock differences between us and the booking provider
+CLOCK_SKEW = timedelta(minutes=5)
+
+_UA_TOKEN_RE = re.compile(r"[\s/;(),]+")
+
+
+@dataclass(frozen=True)
+class ClickCandidate:
+    """Lightweight copy of the ClickEvent columns used for matching"""
+    id: int
+    video_id: int
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    timestamp: datetime
+
+    @classmethod
+    def from_click(cls, click: ClickEvent) -> "ClickCandidate":
+        return cls(
+            id=click.id,
+            video_id=click.video_id,
+            ip_address=click.ip_address,
+            user_agent=click.user_agent,
+            timestamp=click.timestamp
+        )
+
+
+@dataclass(frozen=True)
+class BookingSignal:
+    """What we know about the visitor at booking time"""
+    timestamp: datetime
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+
+
+def ip_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """
+    Compare two IP addresses
+
+    Returns:
+        1.0 for the same address, 0.5 for the same /24 (IPv4) or /64 (IPv6)
+        network, 0.0 otherwise
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    try:
+        ip_a = ipaddress.ip_address(a)
+        ip_b = ipaddress.ip_address(b)
+    except ValueError:
+        return 0.0
+    if ip_a.version != ip_b.version:
+        return 0.0
+    prefix = 24 if ip_a.version == 4 else 64
+    network = ipaddress.ip_network(f"{ip_a}/{prefix}", strict=False)
+    return 0.5 if ip_b in network else 0.0
+
+
+def user_agent_similarity(a: Optional[str], b: Optional[str]) -> float:
+    """
+    Jaccard similarity between the token sets of two user agent strings
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    tokens_a = set(t for t in _UA_TOKEN_RE.split(a.lower()) if t)
+    tokens_b = set(t for t in _UA_TOKEN_RE.split(b.lower()) if t)
+    if not tokens_a or not tokens_b:
+        return 0.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+class RecentClickBuffer:
+    """
+    Per-video ring buffer of the most recent clicks recorded by this process.
+
+    The buffer can answer a window query on its own only when it has seen
+    every click since the window start: either nothing was evicted and the
+    process was already running, or the oldest retained click is older than
+    the window start.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._started_at = datetime.utcnow()
+        self._buffers: Dict[int, Deque[ClickCandidate]] = {}
+        self._evicted: Dict[int, bool] = {}
+        self._lock = threading.Lock()
+
+    def record(self, click: ClickCandidate) -> None:
+        if self.size <= 0:
+            return
+        with self._lock:
+            buffer = self._buffers.get(click.video_id)
+            if buffer is None:
+                buffer = deque(maxlen=self.size)
+                self._buffers[click.video_id] = buffer
+            if len(buffer) == self.size:
+                self._evicted[click.video_id] = True
+            buffer.append(click)
+
+    def window(self, video_id: int, start: datetime, end: datetime) -> Optional[List[ClickCandidate]]:
+        """
+        Get buffered clicks for a video between start and end, newest first
+
+        Returns:
+            List of clicks, or None if the buffer does not cover the window
+        """
+        if self.size <= 0:
+            return None
+        with self._lock:
+            buffer = self._buffers.get(video_id)
+            if not buffer:
+                return [] if start >= self._started_at else None
+            if self._evicted.get(video_id):
+                covered_since = buffer[0].timestamp
+            else:
+                covered_since = self._started_at
+            if start < covered_since:
+                return None
+            snapshot = list(buffer)
+        return [c for c in reversed(snapshot) if start <= c.timestamp <= end]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(b) for b in self._buffers.values())
+
+
+class ClickMatcher:
+    """
+    Probabilistic click-to-booking matcher used when a booking carries no
+    direct reference to the click that produced it.
+    """
+
+    def __init__(
+        self,
+        window: timedelta = timedelta(hours=CLICK_MATCH_WINDOW_HOURS),
+        half_life: timedelta = timedelta(hours=CLICK_MATCH_HALF_LIFE_HOURS),
+        max_candidates: int = CLICK_MATCH_MAX_CANDIDATES,
+        min_score: float = CLICK_MATCH_MIN_SCORE,
+        buffer_size: int = CLICK_MATCH_BUFFER_SIZE
+    ):
+        self.window = window
+        self.half_life = half_life
+        self.max_candidates = max_candidates
+        self.min_score = min_score
+        self.buffer = RecentClickBuffer(buffer_size)
+
+    def record_click(self, click: ClickEvent) -> None:
+        """Add a freshly committed click to the recent-clicks buffer"""
+        self.buffer.record(ClickCandidate.from_click(click))
+
+    def candidates(self, db: Session, video_id: int, booking_time: datetime) -> List[ClickCandidate]:
+        """
+        Get candidate clicks for a booking, newest first
+
+        Served from the in-memory buffer when it covers the window, otherwise
+        from a range scan on the (video_id, timestamp) index.
+        """
+        start = booking_time - self.window
+        end = booking_time + CLOCK_SKEW
+
+        buffered = self.buffer.window(video_id, start, end)
+        if buffered is not None:
+            return buffered[:self.max_candidates]
+
+        rows = db.query(
+            ClickEvent.id,
+            ClickEvent.video_id,
+            ClickEvent.ip_address,
+            ClickEvent.user_agent,
+            ClickEvent.timestamp
+        ).filter(
+            ClickEvent.video_id == video_id,
+            ClickEvent.timestamp >= start,
+            ClickEvent.timestamp <= end
+        ).order_by(ClickEvent.timestamp.desc()).limit(self.max_candidates).all()
+
+        return [ClickCandidate(*row) for row in rows]
+
+    def score(self, signal: BookingSignal, candidate: ClickCandidate) -> float:
+        """
+        Score a candidate click between 0 and 1.
+
+        Only the signals present on the booking contribute, so a booking
+        without IP or user agent is matched on time proximity alone.
+        """
+        age = (signal.timestamp - candidate.timestamp).total_seconds()
+        time_score = 0.5 ** (max(age, 0.0) / self.half_life.total_seconds())
+
+        total = TIME_WEIGHT * time_score
+        weights = TIME_WEIGHT
+        if signal.ip_address:
+            total += IP_WEIGHT * ip_similarity(signal.ip_address, candidate.ip_address)
+            weights += IP_WEIGHT
+        if signal.user_agent:
+            total += USER_AGENT_WEIGHT * user_agent_similarity(signal.user_agent, candidate.user_agent)
+            weights += USER_AGENT_WEIGHT
+
+        return total / weights
+
+    def rank(self, signal: BookingSignal, candidates: List[ClickCandidate]) -> List[Tuple[float, ClickCandidate]]:
+        """
+        Score candidates and sort them best first (ties go to the newest click)
+        """
+        scored = [(self.score(signal, c), c) for c in candidates]
+        scored.sort(key=lambda item: (item[0], item[1].timestamp), reverse=True)
+        return scored
+
+    def best_match(self, signal: BookingSignal, candidates: List[ClickCandidate]) -> Optional[ClickCandidate]:
+        """Pick the best scoring candidate above the minimum score"""
+        ranked = self.rank(signal, candidates)
+        if not ranked or ranked[0][0] < self.min_score:
+            return None
+        return ranked[0][1]
+
+    def match(self, db: Session, video_id: int, signal: BookingSignal) -> Optional[ClickCandidate]:
+        """
+        Find the click most likely to have produced a booking
+
+        Args:
+            db: Database session
+            video_id: Video the booking was attributed to (via UTM campaign)
+            signal: Booking time and visitor details
+
+        Returns:
+            Best matching click or None if no candidate scores high enough
+        """
+        candidates = self.candidates(db, video_id, signal.timestamp)
+        match = self.best_match(signal, candidates)
+        if match is None:
+            logger.info(f"No click matched booking for video {video_id} out of {len(candidates)} candidates")
+        return match
+
+
+# Shared matcher so the ring buffer is fed by every click this process records
+click_matcher = ClickMatcher()
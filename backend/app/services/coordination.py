@@ -0,0 +1,190 @@
+import logging
+import os
+import socket
+import threading
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, Set, Tuple
+
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from app.config import WORKER_ID, WORKER_HEARTBEAT_SECONDS
+from app.models import WorkerHeartbeat, WorkerLease
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# A worker or lease not renewed for this long is considered gone
+LEASE_TTL = timedelta(seconds=WORKER_HEARTBEAT_SECONDS * 3)
+
+
+def default_worker_id() -> str:
+    return WORKER_ID or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def advisory_lock_key(name: str) -> int:
+    """Stable bigint key for pg_try_advisory_lock"""
+    return zlib.crc32(f"insyte:{name}".encode())
+
+
+class WorkerCoordinator:
+    """
+    Coordinates several worker instances sharing one database.
+
+    Singleton jobs are guarded by a lock per job name. On Postgres this is
+    a session-level advisory lock held on a dedicated connection, released
+    by the server if the worker dies. On other databases (SQLite) it is a
+    row in worker_leases that the holder renews on every heartbeat and
+    others may take over once it expires.
+
+    Every worker also upserts a row in worker_heartbeats; the live workers,
+    sorted by id, define the shards that partitionable work is split into.
+    """
+
+    def __init__(self, engine: Engine, worker_id: Optional[str] = None, lease_ttl: timedelta = LEASE_TTL):
+        self.engine = engine
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_ttl = lease_ttl
+        self.use_advisory_locks = engine.dialect.name == "postgresql"
+        self._held: Set[str] = set()
+        self._lock_conn: Optional[Connection] = None
+        self._lock = threading.Lock()
+
+    # Singleton jobs
+
+    def try_acquire(self, name: str) -> bool:
+        """
+        Try to become (or stay) the one worker that runs a singleton job
+
+        Returns:
+            True if this worker holds the lock for name
+        """
+        with self._lock:
+            try:
+                acquired = self._try_advisory_lock(name) if self.use_advisory_locks else self._try_lease(name)
+            except DBAPIError as e:
+                logger.error(f"Could not acquire lock {name}: {e}")
+                self._reset_lock_connection()
+                acquired = False
+            if acquired:
+                self._held.add(name)
+            else:
+                self._held.discard(name)
+            return acquired
+
+    def _try_advisory_lock(self, name: str) -> bool:
+        if name in self._held:
+            return True
+        if self._lock_conn is None:
+            self._lock_conn = self.engine.connect()
+        acquired = self._lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": advisory_lock_key(name)}
+        ).scalar()
+        self._lock_conn.commit()
+        return bool(acquired)
+
+    def _try_lease(self, name: str) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + self.lease_ttl
+        with self.engine.begin() as conn:
+            renewed = conn.execute(
+                update(WorkerLease).where(
+                    WorkerLease.name == name,
+                    (WorkerLease.holder == self.worker_id) | (WorkerLease.expires_at < now)
+                ).values(holder=self.worker_id, expires_at=expires_at)
+            ).rowcount
+            if renewed:
+                return True
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(WorkerLease).values(name=name, holder=self.worker_id, expires_at=expires_at))
+            return True
+        except IntegrityError:
+            # Another worker holds an unexpired lease
+            return False
+
+    def _reset_lock_connection(self) -> None:
+        # Advisory locks belong to the session, and close() only returns the
+        # connection to the pool, so release them explicitly
+        if self._lock_conn is not None:
+            try:
+                self._lock_conn.execute(text("SELECT pg_advisory_unlock_all()"))
+                self._lock_conn.commit()
+            except DBAPIError:
+                # Discard the connection (and the locks with its session)
+                self._lock_conn.invalidate()
+            self._lock_conn.close()
+        self._lock_conn = None
+        self._held.clear()
+
+    def release_all(self) -> None:
+        """Give up every lock this worker holds"""
+        with self._lock:
+            if self.use_advisory_locks:
+                self._reset_lock_connection()
+            elif self._held:
+                with self.engine.begin() as conn:
+                    conn.execute(delete(WorkerLease).where(
+                        WorkerLease.name.in_(self._held),
+                        WorkerLease.holder == self.worker_id
+                    ))
+                self._held.clear()
+
+    # Liveness and sharding
+
+    def heartbeat(self) -> None:
+        """Report this worker alive and renew the locks it holds"""
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            updated = conn.execute(
+                update(WorkerHeartbeat).where(WorkerHeartbeat.worker_id == self.worker_id).values(last_seen=now)
+            ).rowcount
+            if not updated:
+                conn.execute(insert(WorkerHeartbeat).values(worker_id=self.worker_id, started_at=now, last_seen=now))
+            # Forget workers that stopped long ago
+            conn.execute(delete(WorkerHeartbeat).where(WorkerHeartbeat.last_seen < now - self.lease_ttl * 10))
+
+        if self.use_advisory_locks:
+            self._check_lock_connection()
+            return
+        with self._lock:
+            held = set(self._held)
+        for name in held:
+            self.try_acquire(name)
+
+    def _check_lock_connection(self) -> None:
+        with self._lock:
+            if self._lock_conn is None:
+                return
+            try:
+                self._lock_conn.execute(text("SELECT 1"))
+                self._lock_conn.commit()
+            except DBAPIError as e:
+                logger.error(f"Lost advisory lock connection: {e}")
+                self._reset_lock_connection()
+
+    def shard(self) -> Tuple[int, int]:
+        """
+        This worker's shard among the live workers
+
+        Returns:
+            (index, count); (0, 1) when this worker is the only one alive
+        """
+        cutoff = datetime.utcnow() - self.lease_ttl
+        with self.engine.connect() as conn:
+            live = list(conn.execute(
+                select(WorkerHeartbeat.worker_id).where(
+                    WorkerHeartbeat.last_seen >= cutoff
+                ).order_by(WorkerHeartbeat.worker_id)
+            ).scalars())
+        if self.worker_id not in live:
+            live = sorted(live + [self.worker_id])
+        return live.index(self.worker_id), len(live)
+
+    def stop(self) -> None:
+        """Release locks and remove this worker's heartbeat so others reshard at once"""
+        self.release_all()
+        with self.engine.begin() as conn:
+            conn.execute(delete(WorkerHeartbeat).where(WorkerHeartbeat.worker_id == self.worker_id))
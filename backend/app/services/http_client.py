@@ -0,0 +1,301 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_SECONDS,
+    HTTP_POOL_SIZE,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS
+)
+from app.services.metrics import outbound_request_duration, outbound_requests
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying; anything else is returned to the caller as is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Longest Retry-After we are willing to wait inside a request
+MAX_RETRY_AFTER = 10.0
+
+# Latency samples kept per host for percentiles
+LATENCY_WINDOW = 500
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """The service's circuit breaker is open; the request was not sent"""
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a service is down.
+
+    Closed: requests flow and consecutive failures are counted. After
+    failure_threshold of them the breaker opens and rejects requests for
+    reset_timeout seconds. Then it is half-open: one trial request goes
+    through, closing the breaker on success or reopening it on failure.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_request(self) -> bool:
+        """
+        Returns:
+            True if this request is the half-open trial; the caller must
+            then report its outcome or call release_trial()
+
+        Raises:
+            CircuitOpenError: If the request must not be sent
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+
+    def release_trial(self) -> None:
+        """Give up a trial that ended without an outcome (e.g. cancelled) so another can run"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit breaker for {self.name} closed")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            trial_failed = self._trial_in_flight
+            self._trial_in_flight = False
+            if trial_failed or self.failures >= self.failure_threshold:
+                if self.opened_at is None or trial_failed:
+                    logger.warning(f"Circuit breaker for {self.name} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+
+class HostStats:
+    """Request counters and recent latencies for one host"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.statuses: Dict[int, int] = {}
+        self.latency_total = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+
+        def percentile(q: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "statuses": dict(self.statuses),
+            "avg_ms": round(self.latency_total / self.requests * 1000, 1) if self.requests else None,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else None
+        }
+
+
+class HTTPClient:
+    """
+    Process-wide client for third-party APIs.
+
+    One requests.Session keeps a keep-alive pool per host. Every request
+    gets connect/read timeouts, is retried with jittered exponential
+    backoff on 429/5xx and connection errors, and goes through the circuit
+    breaker of its service. Latency and errors are recorded per host.
+
+    Thread-safe; shared by the API process and the worker's threads.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff: float = HTTP_BACKOFF_SECONDS,
+        pool_size: int = HTTP_POOL_SIZE
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._hosts: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, service: str) -> CircuitBreaker:
+        with self._lock:
+            if service not in self._breakers:
+                self._breakers[service] = CircuitBreaker(service)
+            return self._breakers[service]
+
+    def record(self, host: str, elapsed: float, status: Optional[int], failed: bool,
+               retried: bool = False, rejected: bool = False) -> None:
+        """Add one request outcome to the host's stats"""
+        if rejected:
+            outbound_requests.inc(host, "rejected")
+        else:
+            outbound_requests.inc(host, str(status) if status is not None else "error")
+            outbound_request_duration.observe(elapsed, host)
+        with self._lock:
+            stats = self._hosts.setdefault(host, HostStats())
+            if rejected:
+                stats.rejected += 1
+                return
+            stats.requests += 1
+            stats.latency_total += elapsed
+            stats.latencies.append(elapsed)
+            if status is not None:
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if failed:
+                stats.errors += 1
+            if retried:
+                stats.retries += 1
+
+    def backoff_delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based)"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), MAX_RETRY_AFTER)
+            except ValueError:
+                pass
+        # Full jitter keeps callers that failed together from retrying together
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        service: Optional[str] = None,
+        retries: Optional[int] = None,
+        **kwargs: Any
+    ) -> requests.Response:
+        """
+        Send a request with timeouts, retries and the service's circuit breaker
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            service: Circuit breaker name (default: the URL's host)
+            retries: Retries after the first attempt (default: max_retries)
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            The final response, which may still carry an error status
+
+        Raises:
+            CircuitOpenError: If the service's breaker is open
+            requests.RequestException: If the last attempt failed to connect or timed out
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker(service or host)
+        retries = self.max_retries if retries is None else retries
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(retries + 1):
+            try:
+                trial = breaker.before_request()
+            except CircuitOpenError:
+                self.record(host, 0.0, None, True, rejected=True)
+                raise
+
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                self.record(host, time.monotonic() - start, None, True, retried=attempt > 0)
+                breaker.record_failure()
+                if attempt == retries or not isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                    raise
+                delay = self.backoff_delay(attempt)
+                logger.warning(f"{method} {host} failed ({e}); retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # No outcome to report; don't leave the breaker waiting on this trial
+                if trial:
+                    breaker.release_trial()
+                raise
+
+            failed = response.status_code in RETRY_STATUSES
+            self.record(host, time.monotonic() - start, response.status_code, failed, retried=attempt > 0)
+            if not failed:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if attempt == retries:
+                return response
+            delay = self.backoff_delay(attempt, response)
+            logger.warning(f"{method} {host} returned {response.status_code}; retrying in {delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+        return response
+
+    def get(self, url: str, service: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, service=service, **kwargs)
+
+    def post(self, url: str, service: Optional[str] = None, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, service=service, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-host request metrics and per-service breaker states"""
+        with self._lock:
+            hosts = {host: stats.snapshot() for host, stats in self._hosts.items()}
+            breakers = {
+                name: {"state": breaker.state, "failures": breaker.failures}
+                for name, breaker in self._breakers.items()
+            }
+        return {"hosts": hosts, "breakers": breakers}
+
+
+# Shared client for the process
+http_client = HTTPClient()
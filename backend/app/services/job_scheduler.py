@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app.services.metrics import job_duration, job_skipped
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+# Threads started by the job run in the current context
+_job_threads: ContextVar[Optional[Set[Future]]] = ContextVar("job_threads", default=None)
+
+
+class JobThreadExecutor(ThreadPoolExecutor):
+    """
+    Default executor for the scheduler's loop (used by asyncio.to_thread)
+    that remembers which job run started each thread
+    """
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = super().submit(fn, *args, **kwargs)
+        threads = _job_threads.get()
+        if threads is not None:
+            threads.add(future)
+        return future
+
+
+@dataclass
+class JobStats:
+    """Run counters and durations for one job"""
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped: int = 0  # due while the previous run was still going
+    last_started_at: Optional[datetime] = None
+    last_duration: float = 0.0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+
+    def record(self, duration: float) -> None:
+        self.runs += 1
+        self.last_duration = duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_s": round(self.last_duration, 3),
+            "avg_duration_s": round(self.total_duration / self.runs, 3) if self.runs else 0.0,
+            "max_duration_s": round(self.max_duration, 3)
+        }
+
+
+@dataclass
+class Job:
+    """A coroutine function run every interval seconds"""
+    name: str
+    func: JobFunc
+    interval: float
+    timeout: Optional[float] = None
+    jitter: float = 0.1  # +/- fraction of the interval
+    run_at_startup: bool = True
+    stats: JobStats = field(default_factory=JobStats)
+    running: bool = False
+
+    def next_delay(self) -> float:
+        return max(self.interval * (1 + random.uniform(-self.jitter, self.jitter)), 0.0)
+
+
+class AsyncScheduler:
+    """
+    Runs periodic jobs on one long-lived event loop.
+
+    Each job has its own timer so a slow job never delays the others. A
+    job that is still running when it comes due again is skipped rather
+    than started twice, runs longer than the job's timeout are cancelled,
+    and every run is timed.
+
+    Blocking work should be wrapped in asyncio.to_thread by the job. A
+    timeout cancels the job's coroutine but cannot interrupt a thread, so
+    the run stays "running" (and later ticks are skipped) until every
+    thread it started has returned.
+
+    Usage:
+        scheduler = AsyncScheduler()
+        scheduler.add_job("refresh", refresh, interval=900, timeout=600)
+        await scheduler.run()
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._stopping: Optional[asyncio.Event] = None
+        # Every started run until it finishes, including overlapping ticks
+        self._tasks: Set[asyncio.Task] = set()
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        interval: float,
+        timeout: Optional[float] = None,
+        jitter: float = 0.1,
+        run_at_startup: bool = True
+    ) -> Job:
+        """
+        Register a job
+
+        Args:
+            name: Unique job name, used in logs and stats
+            func: Coroutine function taking no arguments
+            interval: Seconds between run starts
+            timeout: Seconds after which a run is cancelled (default: none)
+            jitter: Random +/- fraction applied to each interval
+            run_at_startup: Run as soon as the scheduler starts
+
+        Returns:
+            The registered Job
+        """
+        if name in self.jobs:
+            raise ValueError(f"Job already registered: {name}")
+        job = Job(name, func, interval, timeout, jitter, run_at_startup)
+        self.jobs[name] = job
+        return job
+
+    async def run_job(self, job: Job) -> None:
+        """Run a job once unless it is already running"""
+        if job.running:
+            job.stats.skipped += 1
+            job_skipped.inc(job.name)
+            logger.warning(f"Job {job.name} is still running, skipping this run")
+            return
+
+        job.running = True
+        job.stats.last_started_at = datetime.utcnow()
+        started = time.perf_counter()
+        outcome = "error"
+        threads: Set[Future] = set()
+        _job_threads.set(threads)
+        try:
+            await asyncio.wait_for(job.func(), timeout=job.timeout)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            job.stats.timeouts += 1
+            logger.error(f"Job {job.name} timed out after {job.timeout}s")
+        except Exception as e:
+            job.stats.failures += 1
+            logger.exception(f"Job {job.name} failed: {e}")
+        finally:
+            # Threads outlive a timeout or failure; the run isn't over until they return
+            pending = [future for future in threads if not future.done()]
+            if pending:
+                logger.warning(f"Job {job.name} is waiting for {len(pending)} thread(s) to finish")
+                await asyncio.wait([asyncio.wrap_future(future) for future in pending])
+            duration = time.perf_counter() - started
+            job.stats.record(duration)
+            job_duration.observe(duration, job.name, outcome)
+            job.running = False
+            logger.info(f"Job {job.name} finished in {duration:.2f}s")
+
+    async def _job_loop(self, job: Job) -> None:
+        delay = 0.0 if job.run_at_startup else job.next_delay()
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            # Runs are started as separate tasks so the timer keeps its
+            # cadence and can see (and skip) an overlapping run
+            task = asyncio.create_task(self.run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            delay = job.next_delay()
+
+    async def run(self) -> None:
+        """Run every registered job until stop() is called"""
+        self._stopping = asyncio.Event()
+        asyncio.get_running_loop().set_default_executor(JobThreadExecutor())
+        for job in self.jobs.values():
+            logger.info(f"Scheduling job {job.name} every {job.interval:.0f}s (timeout {job.timeout}s)")
+
+        await asyncio.gather(*(self._job_loop(job) for job in self.jobs.values()))
+
+        # Let in-flight runs finish or time out
+        running = [task for task in self._tasks if not task.done()]
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Stop scheduling new runs"""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-job run counters and durations"""
+        return {name: dict(job.stats.as_dict(), running=job.running) for name, job in self.jobs.items()}
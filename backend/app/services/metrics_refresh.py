@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models import VideoMetrics
+from app.services.refresh_scheduler import (
+    QuotaBudget,
+    click_rates,
+    plan_refresh,
+    refresh_heat,
+    refresh_interval,
+    video_age
+)
+from app.services.snapshots import SnapshotPoint, append_snapshots
+from app.services.youtube import MAX_IDS_PER_REQUEST, AsyncYouTubeClient, get_request_auth
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def _load_videos(db: Session, video_ids: Optional[List[int]]) -> List:
+    query = db.query(
+        VideoMetrics.id,
+        VideoMetrics.youtube_id,
+        VideoMetrics.views,
+        VideoMetrics.likes,
+        VideoMetrics.comments,
+        VideoMetrics.published_at,
+        VideoMetrics.created_at,
+        VideoMetrics.last_refreshed_at
+    ).filter(VideoMetrics.youtube_id.isnot(None))
+    if video_ids is not None:
+        query = query.filter(VideoMetrics.id.in_(video_ids))
+    return query.all()
+
+def _store_statistics(db: Session, videos: List, statistics: Dict[str, Dict[str, int]]) -> int:
+    """Write fetched counts, growth rates and next refresh times; returns rows updated"""
+    ids_by_youtube_id = {video.youtube_id: video.id for video in videos}
+    videos_by_id = {video.id: video for video in videos}
+
+    now = datetime.utcnow()
+    rates = click_rates(db, videos_by_id, now)
+    updates = []
+    points = []
+    for youtube_id, stats in statistics.items():
+        if youtube_id not in ids_by_youtube_id:
+            continue
+        video = videos_by_id[ids_by_youtube_id[youtube_id]]
+
+        views_per_hour = None
+        if video.last_refreshed_at is not None:
+            hours = (now - video.last_refreshed_at).total_seconds() / 3600
+            if hours > 0:
+                views_per_hour = (stats["views"] - (video.views or 0)) / hours
+        heat = refresh_heat(video_age(video, now), rates.get(video.id, 0.0), views_per_hour)
+
+        updates.append({
+            "id": video.id,
+            "views": stats["views"],
+            "likes": stats["likes"],
+            "comments": stats["comments"],
+            "views_per_hour": views_per_hour,
+            "last_refreshed_at": now,
+            "next_refresh_at": now + refresh_interval(heat),
+            "updated_at": now
+        })
+        points.append(SnapshotPoint(
+            video_id=video.id,
+            timestamp=now,
+            views=stats["views"],
+            likes=stats["likes"],
+            comments=stats["comments"]
+        ))
+
+    if updates:
+        # Deltas are relative to the counts stored by the previous refresh
+        previous = {
+            video.id: (video.views, video.likes, video.comments)
+            for video in videos if video.last_refreshed_at is not None
+        }
+        append_snapshots(db, points, previous)
+        db.execute(update(VideoMetrics), updates)
+        db.commit()
+    return len(updates)
+
+async def refresh_video_metrics(db: Session, video_ids: Optional[List[int]] = None) -> Dict[str, int]:
+    """
+    Refresh views, likes and comments for tracked YouTube videos
+
+    Statistics are fetched 50 IDs per videos.list call, with batches
+    requested concurrently, and written back with a single bulk UPDATE
+    keyed by primary key. Each row also gets its view growth rate and the
+    time the refresh scheduler should pick it up again, and the new counts
+    are appended to the video's snapshot history.
+
+    Database work and the OAuth token refresh run in a thread so they
+    don't block the event loop the worker's other jobs share; only the
+    API requests run on the loop.
+
+    Args:
+        db: Database session
+        video_ids: Only refresh these videos (default: every tracked video)
+
+    Returns:
+        Dict with the number of tracked videos, API requests made and rows updated
+    """
+    videos = await asyncio.to_thread(_load_videos, db, video_ids)
+    if not videos:
+        logger.info("No videos with a YouTube ID to refresh")
+        return {"videos": 0, "requests": 0, "updated": 0}
+
+    youtube_ids = list(dict.fromkeys(video.youtube_id for video in videos))
+
+    auth = await asyncio.to_thread(get_request_auth, db)
+    if auth is None:
+        return {"videos": len(youtube_ids), "requests": 0, "updated": 0}
+
+    # Building the client loads the TLS trust store, which blocks too
+    client = await asyncio.to_thread(AsyncYouTubeClient)
+    async with client:
+        statistics = await client.get_videos_statistics(youtube_ids, auth)
+
+    updated = await asyncio.to_thread(_store_statistics, db, videos, statistics)
+
+    result = {
+        "videos": len(youtube_ids),
+        "requests": math.ceil(len(youtube_ids) / MAX_IDS_PER_REQUEST),
+        "updated": updated
+    }
+    logger.info(
+        f"Refreshed {result['updated']} of {result['videos']} videos "
+        f"in {result['requests']} videos.list requests"
+    )
+    return result
+
+async def refresh_due_videos(
+    db: Session,
+    budget: QuotaBudget,
+    shard: Tuple[int, int] = (0, 1)
+) -> Dict[str, int]:
+    """
+    Refresh the videos the adaptive scheduler says are due, within budget
+
+    Args:
+        db: Database session
+        budget: Daily quota allowance shared across scheduler ticks
+        shard: (index, count) of this worker among the live workers
+
+    Returns:
+        Dict with the number of videos refreshed, API requests made and rows updated
+    """
+    due = await asyncio.to_thread(plan_refresh, db, budget, shard=shard)
+    if not due:
+        logger.info("No videos due for a refresh")
+        return {"videos": 0, "requests": 0, "updated": 0}
+
+    result = await refresh_video_metrics(db, due)
+    budget.spend(result["requests"], datetime.utcnow())
+    return result
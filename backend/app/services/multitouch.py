@@ -0,0 +1,302 @@
+import logging
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.config import (
+    MULTITOUCH_LOOKBACK_DAYS,
+    MULTITOUCH_HALF_LIFE_DAYS,
+    MULTITOUCH_MAX_TOUCHES
+)
+from app.models import ClickEvent, BookingEvent, SaleEvent, AttributionCredit
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Supported attribution models
+ATTRIBUTION_MODELS = ("first_touch", "last_touch", "linear", "position_based", "time_decay")
+
+# Position-based (U-shaped) model: share of credit for the first and last
+# touches; the rest is split across the middle
+POSITION_ENDS_SHARE = 0.4
+
+# Bound on the size of IN lists
+QUERY_CHUNK_SIZE = 500
+
+
+@dataclass
+class TouchArrays:
+    """
+    Flattened click paths of all converting visitors in a range.
+
+    Touches are grouped by sale and ordered by time within each sale, so
+    each sale's path is a contiguous slice.
+    """
+    sale_ids: np.ndarray  # sale id per sale index
+    amounts: np.ndarray  # sale amount per sale index
+    sale_timestamps: List[datetime]  # sale time per sale index
+    sale_index: np.ndarray  # sale index per touch
+    video_ids: np.ndarray  # video per touch
+    ages: np.ndarray  # seconds between touch and sale
+
+
+def _chunks(values: Sequence, size: int = QUERY_CHUNK_SIZE) -> Iterable[Sequence]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def load_touch_paths(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    lookback: timedelta = timedelta(days=MULTITOUCH_LOOKBACK_DAYS),
+    max_touches: int = MULTITOUCH_MAX_TOUCHES
+) -> Tuple[List[int], TouchArrays]:
+    """
+    Build each converting visitor's click path for the sales in a range
+
+    A visitor is identified by the click attributed to the sale (the
+    token), the IPs of every click behind bookings with the same email,
+    and that token click's IP. Their path is every click from those IPs
+    in the lookback window before the sale, plus the token click.
+
+    Args:
+        db: Database session
+        start: Sales at or after this time
+        end: Sales before this time
+        lookback: How far back before a sale touches count
+        max_touches: Keep only the most recent touches per path
+
+    Returns:
+        All sale ids in the range, and the touch arrays for sales with a path
+    """
+    sales = db.query(
+        SaleEvent.id,
+        SaleEvent.amount,
+        SaleEvent.timestamp,
+        BookingEvent.email_hash,
+        ClickEvent.id,
+        ClickEvent.ip_address,
+        ClickEvent.video_id,
+        ClickEvent.timestamp
+    ).join(
+        BookingEvent, SaleEvent.booking_id == BookingEvent.id
+    ).outerjoin(
+        ClickEvent, BookingEvent.click_id == ClickEvent.id
+    ).filter(
+        SaleEvent.timestamp >= start,
+        SaleEvent.timestamp < end
+    ).order_by(SaleEvent.id).all()
+
+    all_sale_ids = [row[0] for row in sales]
+    empty = TouchArrays(
+        sale_ids=np.empty(0, dtype=np.int64),
+        amounts=np.empty(0),
+        sale_timestamps=[],
+        sale_index=np.empty(0, dtype=np.int64),
+        video_ids=np.empty(0, dtype=np.int64),
+        ages=np.empty(0)
+    )
+    if not sales:
+        return all_sale_ids, empty
+
+    # IPs behind every booking made with each email
+    email_hashes = sorted({row[3] for row in sales if row[3]})
+    ips_by_email: Dict[str, Set[str]] = {}
+    for chunk in _chunks(email_hashes):
+        rows = db.query(BookingEvent.email_hash, ClickEvent.ip_address).join(
+            ClickEvent, BookingEvent.click_id == ClickEvent.id
+        ).filter(BookingEvent.email_hash.in_(chunk)).distinct().all()
+        for email_hash, ip in rows:
+            if ip:
+                ips_by_email.setdefault(email_hash, set()).add(ip)
+
+    visitor_ips: List[Set[str]] = []
+    for row in sales:
+        ips = set(ips_by_email.get(row[3], ()))
+        if row[5]:
+            ips.add(row[5])
+        visitor_ips.append(ips)
+
+    # Clicks from any of those IPs inside the overall window, per IP by time
+    all_ips = sorted(set().union(*visitor_ips))
+    window_start = min(row[2] for row in sales) - lookback
+    window_end = max(row[2] for row in sales)
+    clicks_by_ip: Dict[str, List[Tuple[datetime, int, int]]] = {}
+    for chunk in _chunks(all_ips):
+        rows = db.query(
+            ClickEvent.ip_address, ClickEvent.timestamp, ClickEvent.id, ClickEvent.video_id
+        ).filter(
+            ClickEvent.ip_address.in_(chunk),
+            ClickEvent.timestamp >= window_start,
+            ClickEvent.timestamp <= window_end
+        ).all()
+        for ip, timestamp, click_id, video_id in rows:
+            clicks_by_ip.setdefault(ip, []).append((timestamp, click_id, video_id))
+    for clicks in clicks_by_ip.values():
+        clicks.sort()
+
+    sale_ids, amounts, sale_timestamps = [], [], []
+    sale_index, video_ids, ages = [], [], []
+    for row, ips in zip(sales, visitor_ips):
+        sale_id, amount, sale_ts, _, token_id, _, token_video, token_ts = row
+
+        touches: Dict[int, Tuple[datetime, int]] = {}
+        for ip in ips:
+            clicks = clicks_by_ip.get(ip, [])
+            lo = bisect_left(clicks, (sale_ts - lookback,))
+            hi = bisect_right(clicks, (sale_ts, float("inf")))
+            for timestamp, click_id, video_id in clicks[lo:hi]:
+                if video_id is not None:
+                    touches[click_id] = (timestamp, video_id)
+        if token_id is not None and token_ts is not None and token_video is not None:
+            touches[token_id] = (token_ts, token_video)
+
+        path = sorted(touches.values())[-max_touches:]
+        if not path:
+            continue
+
+        index = len(sale_ids)
+        sale_ids.append(sale_id)
+        amounts.append(amount or 0.0)
+        sale_timestamps.append(sale_ts)
+        for timestamp, video_id in path:
+            sale_index.append(index)
+            video_ids.append(video_id)
+            ages.append(max((sale_ts - timestamp).total_seconds(), 0.0))
+
+    return all_sale_ids, TouchArrays(
+        sale_ids=np.asarray(sale_ids, dtype=np.int64),
+        amounts=np.asarray(amounts, dtype=np.float64),
+        sale_timestamps=sale_timestamps,
+        sale_index=np.asarray(sale_index, dtype=np.int64),
+        video_ids=np.asarray(video_ids, dtype=np.int64),
+        ages=np.asarray(ages, dtype=np.float64)
+    )
+
+
+def touch_weights(
+    model: str,
+    sale_index: np.ndarray,
+    ages: np.ndarray,
+    half_life: timedelta = timedelta(days=MULTITOUCH_HALF_LIFE_DAYS)
+) -> np.ndarray:
+    """
+    Credit per touch under an attribution model; each sale's credits sum to 1
+
+    Args:
+        model: One of ATTRIBUTION_MODELS
+        sale_index: Sale index per touch, grouped and time-ordered per sale
+        ages: Seconds between each touch and its sale
+        half_life: Half-life for the time_decay model
+
+    Returns:
+        Array of credits aligned with the touches
+    """
+    n_sales = int(sale_index.max()) + 1 if sale_index.size else 0
+    counts = np.bincount(sale_index, minlength=n_sales)
+    starts = np.cumsum(counts) - counts
+    position = np.arange(sale_index.size) - starts[sale_index]
+    path_length = counts[sale_index]
+    is_first = position == 0
+    is_last = position == path_length - 1
+
+    if model == "first_touch":
+        return is_first.astype(np.float64)
+    if model == "last_touch":
+        return is_last.astype(np.float64)
+    if model == "linear":
+        return 1.0 / path_length
+    if model == "position_based":
+        middle = np.maximum(path_length - 2, 1)
+        weights = np.where(is_first | is_last, POSITION_ENDS_SHARE, (1.0 - 2 * POSITION_ENDS_SHARE) / middle)
+        # Paths of one or two touches split the credit evenly
+        return np.where(path_length <= 2, 1.0 / path_length, weights)
+    if model == "time_decay":
+        raw = np.power(0.5, ages / half_life.total_seconds())
+        totals = np.bincount(sale_index, weights=raw, minlength=n_sales)
+        return raw / totals[sale_index]
+    raise ValueError(f"Unknown attribution model: {model}")
+
+
+def credit_by_video(touches: TouchArrays, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum touch credits per (sale, video)
+
+    Returns:
+        Sale indexes, video ids and summed credits, one entry per pair
+    """
+    width = int(touches.video_ids.max()) + 1
+    keys = touches.sale_index * width + touches.video_ids
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    credits = np.bincount(inverse, weights=weights)
+    return unique_keys // width, unique_keys % width, credits
+
+
+def compute_attribution_credit(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    models: Optional[Sequence[str]] = None
+) -> int:
+    """
+    Recompute and store per-video credit for every sale in a range
+
+    Existing credit rows for those sales are replaced in one transaction.
+
+    Args:
+        db: Database session
+        start: Sales at or after this time
+        end: Sales before this time
+        models: Attribution models to compute (default: all)
+
+    Returns:
+        Number of credit rows written
+    """
+    models = list(models or ATTRIBUTION_MODELS)
+    for model in models:
+        if model not in ATTRIBUTION_MODELS:
+            raise ValueError(f"Unknown attribution model: {model}")
+
+    all_sale_ids, touches = load_touch_paths(db, start, end)
+    computed_at = datetime.utcnow()
+
+    rows = []
+    if touches.sale_index.size:
+        for model in models:
+            weights = touch_weights(model, touches.sale_index, touches.ages)
+            sale_idx, video_ids, credits = credit_by_video(touches, weights)
+            keep = credits > 0
+            sale_idx, video_ids, credits = sale_idx[keep], video_ids[keep], credits[keep]
+            revenue = credits * touches.amounts[sale_idx]
+            sale_ids = touches.sale_ids[sale_idx]
+            for i in range(credits.size):
+                rows.append({
+                    "sale_id": int(sale_ids[i]),
+                    "video_id": int(video_ids[i]),
+                    "model": model,
+                    "credit": float(credits[i]),
+                    "revenue": float(revenue[i]),
+                    "sale_timestamp": touches.sale_timestamps[sale_idx[i]],
+                    "computed_at": computed_at
+                })
+
+    for chunk in _chunks(all_sale_ids):
+        db.execute(delete(AttributionCredit).where(
+            AttributionCredit.sale_id.in_(chunk),
+            AttributionCredit.model.in_(models)
+        ))
+    if rows:
+        db.execute(insert(AttributionCredit), rows)
+    db.commit()
+
+    logger.info(
+        f"Computed {', '.join(models)} credit for {touches.sale_ids.size} of "
+        f"{len(all_sale_ids)} sales ({touches.sale_index.size} touches, {len(rows)} rows)"
+    )
+    return len(rows)
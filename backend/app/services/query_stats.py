@@ -0,0 +1,196 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import SLOW_QUERY_MS, SLOW_QUERY_EXPLAIN, QUERY_REPEAT_WARN_THRESHOLD
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Slow statements get their own logger so they can be routed to a separate file
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+# A statement shape is EXPLAINed at most once per this many seconds
+EXPLAIN_INTERVAL_SECONDS = 600
+
+# Characters of SQL kept in warnings and per-route summaries
+STATEMENT_PREVIEW = 300
+
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM_LIST = re.compile(r"\((\s*(\?|%s|%\(\w+\)s|:\w+)\s*,)+\s*(\?|%s|%\(\w+\)s|:\w+)\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    SQL with literals and parameter lists collapsed, so the same query with
+    different values (e.g. once per video in a loop) maps to one shape
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    return _PARAM_LIST.sub("(?)", shape)
+
+
+class RequestQueries:
+    """Statements run while serving one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """(shape, count) for shapes run more than threshold times"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value"""
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+# Set by the request middleware; None outside a request (worker jobs,
+# background tasks), where only the slow-query log applies
+current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request", default=None)
+
+
+class RouteQueryStats:
+    """Aggregate statement counts and database time for one route"""
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.duration = 0.0
+        self.repeat_warnings = 0
+        self.worst_repeat: Optional[Dict[str, Any]] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "avg_statements": round(self.statements / self.requests, 1) if self.requests else None,
+            "max_statements": self.max_statements,
+            "db_ms": round(self.duration * 1000, 1),
+            "avg_db_ms": round(self.duration / self.requests * 1000, 2) if self.requests else None,
+            "repeat_warnings": self.repeat_warnings,
+            "worst_repeat": self.worst_repeat
+        }
+
+
+class QueryMonitor:
+    """
+    Statement counting and timing through SQLAlchemy cursor events.
+
+    Inside a request the statements are added to the RequestQueries in
+    current_request; the middleware folds it into per-route totals, sets
+    Server-Timing and warns when one statement shape repeats more than
+    repeat_threshold times (an N+1 loop). Statements slower than slow_ms
+    are logged anywhere, with the EXPLAIN plan of SELECTs fetched on a
+    separate connection off the request path.
+    """
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, explain: bool = SLOW_QUERY_EXPLAIN,
+                 repeat_threshold: int = QUERY_REPEAT_WARN_THRESHOLD):
+        self.slow_seconds = slow_ms / 1000
+        self.explain = explain
+        self.repeat_threshold = repeat_threshold
+        self._routes: Dict[str, RouteQueryStats] = {}
+        self._lock = threading.Lock()
+        self._explained: Dict[str, float] = {}
+        self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+    def instrument(self, engine: Engine) -> None:
+        """Attach the timing hooks to an engine"""
+        @event.listens_for(engine, "before_cursor_execute")
+        def start_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def stop_timer(conn, cursor, statement, parameters, context, executemany):
+            duration = time.perf_counter() - conn.info["query_start"].pop()
+            if context is not None and context.execution_options.get("explain_plan"):
+                return
+            request = current_request.get()
+            if request is not None:
+                request.record(statement, duration)
+            if duration >= self.slow_seconds:
+                self.log_slow(engine, statement, parameters, duration, executemany)
+
+    # Slow-query log
+
+    def log_slow(self, engine: Engine, statement: str, parameters: Any, duration: float,
+                 executemany: bool) -> None:
+        slow_query_logger.warning(
+            f"Slow query ({duration * 1000:.0f} ms): {_WHITESPACE.sub(' ', statement).strip()[:1000]}"
+        )
+        if not self.explain or executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        shape = statement_shape(statement)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(shape, -EXPLAIN_INTERVAL_SECONDS) < EXPLAIN_INTERVAL_SECONDS:
+                return
+            self._explained[shape] = now
+        self._explain_executor.submit(self.explain_plan, engine, statement, parameters)
+
+    def explain_plan(self, engine: Engine, statement: str, parameters: Any) -> None:
+        """Log the query plan; EXPLAIN without ANALYZE doesn't run the query"""
+        prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            with engine.connect().execution_options(explain_plan=True) as conn:
+                rows = conn.exec_driver_sql(prefix + statement, parameters or ()).fetchall()
+            plan = "\n".join("    " + " | ".join(str(value) for value in row) for row in rows)
+            slow_query_logger.warning(f"Plan for slow query {statement_shape(statement)[:200]}:\n{plan}")
+        except Exception as e:
+            logger.error(f"EXPLAIN failed for slow query: {e}")
+
+    # Per-request accounting
+
+    def finish_request(self, route: str, request: RequestQueries) -> None:
+        """Fold one request's statements into the route totals and warn on repeats"""
+        repeated = request.repeated(self.repeat_threshold)
+        for shape, count in repeated:
+            logger.warning(f"{route} ran the same statement {count} times (possible N+1): {shape[:STATEMENT_PREVIEW]}")
+
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteQueryStats()
+            stats.requests += 1
+            stats.statements += request.count
+            stats.max_statements = max(stats.max_statements, request.count)
+            stats.duration += request.duration
+            if repeated:
+                stats.repeat_warnings += 1
+                shape, count = repeated[0]
+                if stats.worst_repeat is None or count > stats.worst_repeat["count"]:
+                    stats.worst_repeat = {"count": count, "statement": shape[:STATEMENT_PREVIEW]}
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-route totals, most database time first"""
+        with self._lock:
+            routes = sorted(self._routes.items(), key=lambda item: item[1].duration, reverse=True)
+            return {
+                "slow_query_ms": self.slow_seconds * 1000,
+                "repeat_threshold": self.repeat_threshold,
+                "routes": {route: stats.snapshot() for route, stats in routes}
+            }
+
+
+# Shared monitor for the process
+query_monitor = QueryMonitor()
@@ -0,0 +1,66 @@
+import logging
+from typing import Dict, List
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.models import SaleEvent
+from app.schemas import StripeEvent, StripeEventData
+from app.services.attribution import parse_stripe_event, resolve_sale_booking
+from app.services.stripe import list_recent_payments
+from app.services.utm import UTMTracker
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def reconcile_stripe_payments(db: Session, limit: int = 100) -> Dict[str, int]:
+    """
+    Record recent Stripe payments whose webhook never reached us
+
+    Lists the most recent payment intents and, for each succeeded one
+    without a sale carrying its id, attributes and records it the same
+    way the payment_intent.succeeded webhook would.
+
+    Args:
+        db: Database session
+        limit: Number of recent payment intents to check
+
+    Returns:
+        Dict with the number of payments checked, recovered and left unattributed
+    """
+    # StripeObjects aren't dicts in current SDKs: index them, or to_dict() for a plain copy
+    payments = [payment for payment in list_recent_payments(limit) if payment["status"] == "succeeded"]
+    ids: List[str] = [payment["id"] for payment in payments]
+    known = {
+        external_id for (external_id,) in
+        db.query(SaleEvent.external_id).filter(SaleEvent.external_id.in_(ids)).all()
+    } if ids else set()
+
+    result = {"checked": len(payments), "recovered": 0, "unattributed": 0}
+    for payment in payments:
+        if payment["id"] in known:
+            continue
+        event = StripeEvent(
+            type="payment_intent.succeeded",
+            created=payment["created"],
+            data=StripeEventData(object=payment.to_dict())
+        )
+        try:
+            sale = parse_stripe_event(event)
+        except ValidationError as e:
+            logger.warning(f"Skipping Stripe payment {payment['id']}: {e}")
+            continue
+
+        booking = resolve_sale_booking(db, sale)
+        if booking is None:
+            result["unattributed"] += 1
+            continue
+        UTMTracker.track_sale(db, booking.id, sale.amount, sale.external_id, sale.timestamp)
+        result["recovered"] += 1
+
+    logger.info(
+        f"Reconciled {result['checked']} Stripe payments: {result['recovered']} recovered, "
+        f"{result['unattributed']} unattributed"
+    )
+    return result
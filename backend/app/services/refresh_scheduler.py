@@ -0,0 +1,211 @@
+import heapq
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.config import (
+    YOUTUBE_DAILY_QUOTA_BUDGET,
+    YOUTUBE_SCHEDULER_TICK_MINUTES,
+    YOUTUBE_MIN_REFRESH_MINUTES,
+    YOUTUBE_REFRESH_INTERVAL
+)
+from app.models import VideoMetrics, ClickEvent
+from app.services.youtube import MAX_IDS_PER_REQUEST
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MIN_INTERVAL = timedelta(minutes=YOUTUBE_MIN_REFRESH_MINUTES)
+MAX_INTERVAL = timedelta(hours=YOUTUBE_REFRESH_INTERVAL)
+
+# Window over which the recent click rate is measured
+CLICK_RATE_WINDOW = timedelta(hours=24)
+
+# Heat contributed by a brand-new video; halves by the time it is a day old
+NEW_VIDEO_HEAT = 4.0
+# Views per hour that count as much as one click per hour
+VIEWS_PER_CLICK = 100.0
+
+
+def refresh_heat(age: timedelta, clicks_per_hour: float, views_per_hour: Optional[float]) -> float:
+    """
+    How much a video's numbers are moving; 0 for an old, quiet video
+
+    Args:
+        age: Time since the video was published (or started being tracked)
+        clicks_per_hour: Tracked link clicks per hour over CLICK_RATE_WINDOW
+        views_per_hour: View growth rate measured at the last refresh
+    """
+    age_days = max(age.total_seconds(), 0.0) / 86400
+    return (
+        NEW_VIDEO_HEAT / (1.0 + age_days)
+        + clicks_per_hour
+        + max(views_per_hour or 0.0, 0.0) / VIEWS_PER_CLICK
+    )
+
+
+def video_age(video, now: datetime) -> timedelta:
+    """Age of a video row, from its publish date when known"""
+    return now - (video.published_at or video.created_at or now)
+
+
+def refresh_interval(heat: float) -> timedelta:
+    """Refresh interval for a video, from MAX_INTERVAL when cold down to MIN_INTERVAL"""
+    return min(max(MAX_INTERVAL / (1.0 + heat), MIN_INTERVAL), MAX_INTERVAL)
+
+
+def click_rates(db: Session, video_ids: Optional[Iterable[int]], now: datetime) -> Dict[int, float]:
+    """
+    Clicks per hour over the last CLICK_RATE_WINDOW for each video
+
+    Uses one grouped query over the (video_id, timestamp) index. With
+    video_ids None, returns every video clicked within the window.
+    """
+    query = db.query(ClickEvent.video_id, func.count(ClickEvent.id)).filter(
+        ClickEvent.timestamp >= now - CLICK_RATE_WINDOW
+    )
+    if video_ids is not None:
+        video_ids = list(video_ids)
+        if not video_ids:
+            return {}
+        query = query.filter(ClickEvent.video_id.in_(video_ids))
+    rows = query.group_by(ClickEvent.video_id).all()
+    hours = CLICK_RATE_WINDOW.total_seconds() / 3600
+    return {video_id: count / hours for video_id, count in rows}
+
+
+class QuotaBudget:
+    """
+    Daily Data API quota allowance, spread evenly over the day.
+
+    The allowance accrues linearly from UTC midnight so a backlog can't
+    burn the whole day's budget in one tick, and resets at midnight. Spent
+    units are tracked in memory, so a worker restart forgets what the
+    previous process used that day.
+    """
+
+    def __init__(self, daily_units: int = YOUTUBE_DAILY_QUOTA_BUDGET,
+                 tick: timedelta = timedelta(minutes=YOUTUBE_SCHEDULER_TICK_MINUTES)):
+        self.daily_units = daily_units
+        self.tick = tick
+        self.spent = 0
+        self._day = None
+
+    def _roll(self, now: datetime) -> None:
+        if self._day != now.date():
+            self._day = now.date()
+            self.spent = 0
+
+    def available(self, now: datetime, share: float = 1.0) -> int:
+        """
+        Units that may be spent right now
+
+        Args:
+            now: Current time
+            share: Fraction of the daily budget this process may use, e.g.
+                1/N when N workers split the videos
+        """
+        self._roll(now)
+        midnight = datetime.combine(now.date(), datetime.min.time())
+        elapsed = (now - midnight) / timedelta(days=1)
+        per_tick = self.tick / timedelta(days=1)
+        accrued = math.ceil(self.daily_units * share * min(elapsed + per_tick, 1.0))
+        return max(accrued - self.spent, 0)
+
+    def spend(self, units: int, now: datetime) -> None:
+        self._roll(now)
+        self.spent += units
+
+
+@dataclass(order=True)
+class ScheduledRefresh:
+    """Priority queue entry: earliest due first, hotter first on ties"""
+    due_at: datetime
+    neg_heat: float
+    video_id: int = field(compare=False)
+
+
+def plan_refresh(
+    db: Session,
+    budget: QuotaBudget,
+    now: Optional[datetime] = None,
+    shard: Tuple[int, int] = (0, 1)
+) -> List[int]:
+    """
+    Pick the videos to refresh this tick
+
+    Each refresh stores the video's next_refresh_at (the refresh time plus
+    an interval that shrinks with its heat), so the due videos are read
+    through that column's index instead of scanning every tracked video;
+    videos never refreshed are due immediately. Videos clicked within
+    CLICK_RATE_WINDOW are also re-checked with their current click rate,
+    so a video that starts getting traffic is pulled forward without
+    waiting out the interval set while it was quiet.
+
+    Due videos are popped from a priority queue until the quota allowance
+    (50 videos per unit) is used up; the rest stay overdue and come first
+    next tick.
+
+    With several workers, each one only plans the videos whose id falls in
+    its shard, within its share of the budget.
+
+    Args:
+        db: Database session
+        budget: Quota allowance shared across ticks
+        now: Current time (default: utcnow)
+        shard: (index, count) of this worker among the live workers
+
+    Returns:
+        Video ids to refresh, most urgent first
+    """
+    now = now or datetime.utcnow()
+    index, count = shard
+    rates = click_rates(db, None, now)
+
+    query = db.query(
+        VideoMetrics.id,
+        VideoMetrics.published_at,
+        VideoMetrics.created_at,
+        VideoMetrics.last_refreshed_at,
+        VideoMetrics.next_refresh_at,
+        VideoMetrics.views_per_hour
+    ).filter(
+        VideoMetrics.youtube_id.isnot(None),
+        or_(
+            VideoMetrics.next_refresh_at.is_(None),
+            VideoMetrics.next_refresh_at <= now,
+            VideoMetrics.id.in_(list(rates))
+        )
+    )
+    if count > 1:
+        query = query.filter(VideoMetrics.id % count == index)
+    videos = query.all()
+    if not videos:
+        return []
+
+    queue: List[ScheduledRefresh] = []
+    for video in videos:
+        heat = refresh_heat(video_age(video, now), rates.get(video.id, 0.0), video.views_per_hour)
+        if video.last_refreshed_at is None:
+            due_at = datetime.min
+        else:
+            due_at = video.last_refreshed_at + refresh_interval(heat)
+            if video.next_refresh_at is not None:
+                due_at = min(due_at, video.next_refresh_at)
+        if due_at <= now:
+            queue.append(ScheduledRefresh(due_at, -heat, video.id))
+    heapq.heapify(queue)
+
+    capacity = budget.available(now, share=1.0 / count) * MAX_IDS_PER_REQUEST
+    due: List[int] = []
+    while queue and len(due) < capacity:
+        due.append(heapq.heappop(queue).video_id)
+
+    if queue:
+        logger.warning(f"Quota budget exhausted: {len(queue)} due videos deferred to the next tick")
+    return due
@@ -0,0 +1,121 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+from app.config import YOUTUBE_CACHE_PATH, YOUTUBE_CACHE_MAX_ENTRIES
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached API response"""
+    etag: Optional[str]
+    body: Dict[str, Any]
+    fetched_at: float  # time.time() of the last 200 or 304
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def cache_key(endpoint: str, ids: Iterable[str], parts: str) -> str:
+    """Build a cache key from the endpoint, requested IDs and parts"""
+    return f"{endpoint}|{','.join(sorted(ids))}|{parts}"
+
+
+class ResponseCache:
+    """
+    Size-bounded on-disk cache of API responses and their ETags.
+
+    Backed by a SQLite file so it survives worker restarts. When the number
+    of entries exceeds max_entries, the least recently used ones are
+    evicted.
+    """
+
+    def __init__(self, path: str = YOUTUBE_CACHE_PATH, max_entries: int = YOUTUBE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use so importing the module creates no file
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, etag TEXT, body TEXT NOT NULL, "
+                "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get a cached response and mark it as recently used"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT etag, body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return CacheEntry(etag=row[0], body=json.loads(row[1]), fetched_at=row[2])
+
+    def put(self, key: str, etag: Optional[str], body: Dict[str, Any]) -> None:
+        """Store a fresh response, evicting the least recently used entries if full"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, body, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, etag, json.dumps(body), now, now)
+            )
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def touch(self, key: str) -> None:
+        """Mark a cached response as revalidated (the API answered 304)"""
+        now = time.time()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+            self.not_modified += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Entry count and hit counters; doesn't open the cache file if unused"""
+        return {
+            "entries": len(self) if self._conn is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified
+        }
+
+
+# Shared cache for YouTube Data API responses
+youtube_cache = ResponseCache()
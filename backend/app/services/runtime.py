@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config import RUNTIME_PROBE_INTERVAL_SECONDS, RUNTIME_DB_PING_SECONDS
+from app.database import engine
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Lag samples kept for the recent maximum and average
+LAG_WINDOW = 60
+
+# Above this the event loop is considered too busy to serve requests promptly
+LAG_DEGRADED_SECONDS = 0.5
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """Connection pool counters; pools without them report just their class"""
+    pool = engine.pool
+    stats: Dict[str, Any] = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            stats[name] = counter()
+    return stats
+
+
+class RuntimeMonitor:
+    """
+    Cheap process health signals for /status/runtime.
+
+    A background task samples event-loop lag (how late a sleep wakes up)
+    every probe_interval seconds and pings the database every
+    ping_interval seconds from a thread, so reading the status never
+    blocks on the database. Request middleware counts in-flight requests.
+    """
+
+    def __init__(self, engine: Engine, probe_interval: float = RUNTIME_PROBE_INTERVAL_SECONDS,
+                 ping_interval: float = RUNTIME_DB_PING_SECONDS):
+        self.engine = engine
+        self.probe_interval = probe_interval
+        self.ping_interval = ping_interval
+        self.started = time.monotonic()
+        self.in_flight = 0
+        self.requests_total = 0
+        self.lag_samples: Deque[float] = deque(maxlen=LAG_WINDOW)
+        self.db_latency: Optional[float] = None
+        self.db_error: Optional[str] = None
+        self.db_checked_at: Optional[float] = None
+
+    # Request accounting; called on the event loop, so no lock is needed
+
+    def request_started(self) -> None:
+        self.in_flight += 1
+        self.requests_total += 1
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+
+    # Probes
+
+    def ping_database(self) -> None:
+        """Time a SELECT 1 round trip, including the pool checkout"""
+        start = time.monotonic()
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            self.db_latency = time.monotonic() - start
+            self.db_error = None
+        except Exception as e:
+            logger.error(f"Database ping failed: {e}")
+            self.db_latency = None
+            self.db_error = str(e)
+        self.db_checked_at = time.monotonic()
+
+    async def run(self) -> None:
+        """Sample loop lag and ping the database until cancelled"""
+        ping: Optional[asyncio.Future] = None
+        next_ping = 0.0
+        while True:
+            now = time.monotonic()
+            # A ping still waiting on the pool is left to finish, not stacked
+            if now >= next_ping and (ping is None or ping.done()):
+                ping = asyncio.ensure_future(asyncio.to_thread(self.ping_database))
+                next_ping = now + self.ping_interval
+
+            start = time.monotonic()
+            await asyncio.sleep(self.probe_interval)
+            self.lag_samples.append(max(0.0, time.monotonic() - start - self.probe_interval))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current runtime state; cheap enough to poll every few seconds"""
+        now = time.monotonic()
+        lags = list(self.lag_samples)
+        lag = lags[-1] if lags else None
+
+        healthy = self.db_error is None and (lag is None or lag < LAG_DEGRADED_SECONDS)
+        return {
+            "status": "ok" if healthy else "degraded",
+            "uptime_seconds": round(now - self.started, 1),
+            "database": {
+                "ok": self.db_error is None,
+                "ping_ms": round(self.db_latency * 1000, 2) if self.db_latency is not None else None,
+                "error": self.db_error,
+                "checked_seconds_ago": round(now - self.db_checked_at, 1) if self.db_checked_at else None,
+                "pool": pool_stats(self.engine)
+            },
+            "event_loop": {
+                "lag_ms": round(lag * 1000, 2) if lag is not None else None,
+                "max_lag_ms": round(max(lags) * 1000, 2) if lags else None,
+                "avg_lag_ms": round(sum(lags) / len(lags) * 1000, 2) if lags else None
+            },
+            "requests": {
+                "in_flight": self.in_flight,
+                "total": self.requests_total
+            }
+        }
+
+
+# Shared monitor for the API process
+runtime_monitor = RuntimeMonitor(engine)
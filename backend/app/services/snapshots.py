@@ -0,0 +1,286 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+
+from app.config import SNAPSHOT_RAW_DAYS, SNAPSHOT_DAILY_DAYS
+from app.models import VideoMetricsSnapshot
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Counters stored per snapshot
+METRICS = ("views", "likes", "comments")
+
+# Longest run of delta rows between keyframes at each resolution; bounds
+# how far back a range read has to start decoding
+KEYFRAME_SPANS = {
+    "raw": timedelta(days=1),
+    "daily": timedelta(days=30),
+    "weekly": timedelta(weeks=26)
+}
+
+
+@dataclass
+class SnapshotPoint:
+    """Absolute counts for one video at one time"""
+    video_id: int
+    timestamp: datetime
+    views: int
+    likes: int
+    comments: int
+
+
+@dataclass
+class SnapshotSeries:
+    """Decoded history of one video as parallel arrays"""
+    timestamps: List[datetime]
+    resolutions: List[str]
+    values: np.ndarray  # shape (n, len(METRICS)), absolute counts
+
+    def column(self, metric: str) -> List[int]:
+        return self.values[:, METRICS.index(metric)].tolist()
+
+
+def decode_deltas(is_keyframe: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Turn keyframe/delta rows back into absolute counts
+
+    A running sum restarts at each keyframe: subtract, for every row, the
+    running sum just before its keyframe.
+
+    Args:
+        is_keyframe: Boolean per row, in time order
+        values: Stored values per row, shape (n, len(METRICS))
+
+    Returns:
+        Absolute counts, same shape as values
+    """
+    if not len(values):
+        return values
+    is_keyframe = is_keyframe.copy()
+    # A series must start from absolute values
+    is_keyframe[0] = True
+    totals = np.cumsum(values, axis=0)
+    key_rows = np.flatnonzero(is_keyframe)
+    group = np.cumsum(is_keyframe) - 1
+    base = totals[key_rows] - values[key_rows]
+    return totals - base[group]
+
+
+def encode_deltas(
+    timestamps: Sequence[datetime],
+    values: np.ndarray,
+    span: timedelta
+) -> List[tuple]:
+    """
+    Delta-encode absolute counts, starting a keyframe at least every span
+
+    Args:
+        timestamps: Point times, in order
+        values: Absolute counts, shape (n, len(METRICS))
+        span: Longest time between keyframes; the first point is always one
+
+    Returns:
+        (is_keyframe, stored values) per point
+    """
+    encoded = []
+    last_keyframe = None
+    for i, timestamp in enumerate(timestamps):
+        if last_keyframe is None or timestamp - last_keyframe >= span:
+            encoded.append((True, values[i]))
+            last_keyframe = timestamp
+        else:
+            encoded.append((False, values[i] - values[i - 1]))
+    return encoded
+
+
+def latest_keyframes(db: Session, video_ids: Iterable[int]) -> Dict[int, datetime]:
+    """Time of each video's most recent keyframe"""
+    video_ids = list(video_ids)
+    if not video_ids:
+        return {}
+    rows = db.query(VideoMetricsSnapshot.video_id, func.max(VideoMetricsSnapshot.timestamp)).filter(
+        VideoMetricsSnapshot.video_id.in_(video_ids),
+        VideoMetricsSnapshot.is_keyframe == True
+    ).group_by(VideoMetricsSnapshot.video_id).all()
+    return dict(rows)
+
+
+def append_snapshots(db: Session, points: List[SnapshotPoint], previous: Dict[int, Sequence[int]]) -> int:
+    """
+    Append one raw point per video with a single multi-row INSERT
+
+    A point is stored as a keyframe when the video has no keyframe in the
+    last raw KEYFRAME_SPANS interval or no previous counts, otherwise as
+    the change since previous. The caller commits.
+
+    Args:
+        db: Database session
+        points: New counts
+        previous: Counts of each video's last point, by video id
+
+    Returns:
+        Number of rows written
+    """
+    if not points:
+        return 0
+    keyframes = latest_keyframes(db, (point.video_id for point in points))
+    span = KEYFRAME_SPANS["raw"]
+
+    rows = []
+    for point in points:
+        current = (point.views, point.likes, point.comments)
+        last_keyframe = keyframes.get(point.video_id)
+        base = previous.get(point.video_id)
+        is_keyframe = base is None or last_keyframe is None or point.timestamp - last_keyframe >= span
+        stored = current if is_keyframe else tuple(c - (b or 0) for c, b in zip(current, base))
+        rows.append({
+            "video_id": point.video_id,
+            "timestamp": point.timestamp,
+            "resolution": "raw",
+            "is_keyframe": is_keyframe,
+            **dict(zip(METRICS, stored))
+        })
+
+    db.execute(insert(VideoMetricsSnapshot), rows)
+    return len(rows)
+
+
+def _load_rows(db: Session, video_id: int, start: Optional[datetime], end: Optional[datetime]):
+    """Rows of a video from the last keyframe at or before start through end"""
+    query = db.query(
+        VideoMetricsSnapshot.id,
+        VideoMetricsSnapshot.timestamp,
+        VideoMetricsSnapshot.resolution,
+        VideoMetricsSnapshot.is_keyframe,
+        VideoMetricsSnapshot.views,
+        VideoMetricsSnapshot.likes,
+        VideoMetricsSnapshot.comments
+    ).filter(VideoMetricsSnapshot.video_id == video_id)
+
+    if start is not None:
+        keyframe_at = db.query(func.max(VideoMetricsSnapshot.timestamp)).filter(
+            VideoMetricsSnapshot.video_id == video_id,
+            VideoMetricsSnapshot.is_keyframe == True,
+            VideoMetricsSnapshot.timestamp <= start
+        ).scalar()
+        if keyframe_at is not None:
+            query = query.filter(VideoMetricsSnapshot.timestamp >= keyframe_at)
+    if end is not None:
+        query = query.filter(VideoMetricsSnapshot.timestamp < end)
+
+    return query.order_by(VideoMetricsSnapshot.timestamp, VideoMetricsSnapshot.id).all()
+
+
+def _decode_rows(rows) -> np.ndarray:
+    is_keyframe = np.fromiter((bool(row.is_keyframe) for row in rows), dtype=bool, count=len(rows))
+    values = np.array([[row.views or 0, row.likes or 0, row.comments or 0] for row in rows],
+                      dtype=np.int64).reshape(len(rows), len(METRICS))
+    return decode_deltas(is_keyframe, values)
+
+
+def get_history(
+    db: Session,
+    video_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> SnapshotSeries:
+    """
+    Decode a video's history in a time range
+
+    Args:
+        db: Database session
+        video_id: Video id
+        start: Points at or after this time (default: all)
+        end: Points before this time (default: all)
+
+    Returns:
+        SnapshotSeries with absolute counts
+    """
+    rows = _load_rows(db, video_id, start, end)
+    values = _decode_rows(rows)
+    keep = [i for i, row in enumerate(rows) if start is None or row.timestamp >= start]
+    return SnapshotSeries(
+        timestamps=[rows[i].timestamp for i in keep],
+        resolutions=[rows[i].resolution for i in keep],
+        values=values[keep]
+    )
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Start of the day or ISO week a timestamp falls in"""
+    day = datetime.combine(timestamp.date(), datetime.min.time())
+    if resolution == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _downsample_video(db: Session, video_id: int, source: str, target: str, cutoff: datetime) -> int:
+    """Collapse one video's source-resolution points before cutoff to the last point per bucket"""
+    rows = _load_rows(db, video_id, None, cutoff)
+    values = _decode_rows(rows)
+
+    selected = [i for i, row in enumerate(rows) if row.resolution == source]
+    if not selected:
+        return 0
+
+    # Last point of each bucket, so the value the next stored delta is
+    # relative to is unchanged
+    last_in_bucket: Dict[datetime, int] = {}
+    for i in selected:
+        last_in_bucket[bucket_start(rows[i].timestamp, target)] = i
+    keep = sorted(last_in_bucket.values())
+
+    timestamps = [rows[i].timestamp for i in keep]
+    encoded = encode_deltas(timestamps, values[keep], KEYFRAME_SPANS[target])
+
+    db.execute(delete(VideoMetricsSnapshot).where(
+        VideoMetricsSnapshot.id.in_([rows[i].id for i in selected])
+    ))
+    db.execute(insert(VideoMetricsSnapshot), [
+        {
+            "video_id": video_id,
+            "timestamp": timestamp,
+            "resolution": target,
+            "is_keyframe": is_keyframe,
+            **{metric: int(value) for metric, value in zip(METRICS, stored)}
+        }
+        for timestamp, (is_keyframe, stored) in zip(timestamps, encoded)
+    ])
+    return len(selected) - len(keep)
+
+
+def downsample_snapshots(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Downsample old snapshots: raw to daily after SNAPSHOT_RAW_DAYS, daily
+    to weekly after SNAPSHOT_DAILY_DAYS
+
+    Only whole days or weeks before the cutoff are collapsed. Each video
+    is rewritten and committed on its own.
+
+    Args:
+        db: Database session
+        now: Current time (default: utcnow)
+
+    Returns:
+        Number of rows removed
+    """
+    now = now or datetime.utcnow()
+    removed = 0
+    for source, target, days in (("raw", "daily", SNAPSHOT_RAW_DAYS), ("daily", "weekly", SNAPSHOT_DAILY_DAYS)):
+        cutoff = bucket_start(now - timedelta(days=days), target)
+        video_ids = [video_id for (video_id,) in db.query(VideoMetricsSnapshot.video_id).filter(
+            VideoMetricsSnapshot.resolution == source,
+            VideoMetricsSnapshot.timestamp < cutoff
+        ).distinct().all()]
+        for video_id in video_ids:
+            removed += _downsample_video(db, video_id, source, target, cutoff)
+            db.commit()
+
+    logger.info(f"Downsampled video metrics snapshots ({removed} rows removed)")
+    return removed
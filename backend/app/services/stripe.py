@@ -2,7 +2,8 @@ import stripe
 import logging
 from typing import Dict, Any, List, Optional
 
-from app.config import STRIPE_API_KEY, STRIPE_WEBHOOK_SECRET
+from app.config import STRIPE_API_KEY, STRIPE_WEBHOOK_SECRET, STRIPE_API_BASE_URL, HTTP_MAX_RETRIES
+from app.services.http_client import http_client
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -12,6 +13,11 @@ if STRIPE_API_KEY:
     stripe.api_key = STRIPE_API_KEY
 else:
     logger.warning("Stripe API key not configured")
+stripe.api_base = STRIPE_API_BASE_URL
+# Share the outbound connection pool and timeouts; the SDK does its own
+# jittered retries on 429/5xx
+stripe.default_http_client = stripe.RequestsClient(timeout=http_client.timeout, session=http_client.session)
+stripe.max_network_retries = HTTP_MAX_RETRIES
 
 def get_customer(customer_id: str) -> Optional[Dict[str, Any]]:
     """
@@ -71,7 +77,7 @@ def list_recent_payments(limit: int = 10) -> List[Dict[str, Any]]:
         
     try:
         payments = stripe.PaymentIntent.list(limit=limit)
-        return payments.get("data", [])
+        return list(payments.data)
     except stripe.error.StripeError as e:
         logger.error(f"Stripe API error: {e}")
         return []
@@ -92,8 +98,9 @@ def verify_webhook_signature(payload: bytes, signature: str) -> bool:
         return False
         
     try:
-        stripe.Webhook.construct_event(
-            payload, signature, STRIPE_WEBHOOK_SECRET
+        # Check the signature only; the body is parsed once by the caller
+        stripe.WebhookSignature.verify_header(
+            payload, signature, STRIPE_WEBHOOK_SECRET, stripe.Webhook.DEFAULT_TOLERANCE
         )
         return True
     except (stripe.error.SignatureVerificationError, ValueError) as e:
@@ -0,0 +1,180 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import (
+    GOOGLE_OAUTH_BASE_URL,
+    YOUTUBE_CLIENT_ID,
+    YOUTUBE_CLIENT_SECRET,
+    YOUTUBE_TOKEN_REFRESH_MARGIN_MINUTES
+)
+from app.database import SessionLocal
+from app.models import YouTubeToken
+from app.services.http_client import http_client
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Google OAuth token endpoint
+GOOGLE_TOKEN_URL = f"{GOOGLE_OAUTH_BASE_URL}/token"
+
+# After a failed load or refresh, callers get no token for this long
+# instead of each retrying
+RETRY_AFTER = timedelta(seconds=30)
+
+
+def exchange_refresh_token(refresh_token: str) -> Dict[str, Any]:
+    """
+    Get a new access token from Google using a refresh token
+
+    Raises:
+        requests.RequestException: If the token request fails
+    """
+    response = http_client.post(GOOGLE_TOKEN_URL, service="google_oauth", data={
+        "client_id": YOUTUBE_CLIENT_ID,
+        "client_secret": YOUTUBE_CLIENT_SECRET,
+        "refresh_token": refresh_token,
+        "grant_type": "refresh_token"
+    })
+    response.raise_for_status()
+    return response.json()
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    """Snapshot of the active YouTubeToken row"""
+    id: int
+    access_token: str
+    refresh_token: Optional[str]
+    expires_at: Optional[datetime]
+
+    def expires_within(self, margin: timedelta, now: datetime) -> bool:
+        return self.expires_at is None or now >= self.expires_at - margin
+
+
+class TokenCache:
+    """
+    Process-level cache of the active YouTube OAuth access token.
+
+    The token is read from the database once and served from memory until
+    it is within refresh_margin of expiring. Then one caller refreshes it
+    with Google and writes it back while concurrent callers wait for that
+    single refresh instead of starting their own. Call invalidate() when
+    the stored token changes elsewhere.
+    """
+
+    def __init__(self, refresh_margin: timedelta = timedelta(minutes=YOUTUBE_TOKEN_REFRESH_MARGIN_MINUTES)):
+        self.refresh_margin = refresh_margin
+        self._token: Optional[CachedToken] = None
+        self._loaded = False
+        self._retry_at: Optional[datetime] = None
+        self._refreshing = False
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def invalidate(self) -> None:
+        """Drop the cached token so the next caller reloads it from the database"""
+        with self._condition:
+            self._token = None
+            self._loaded = False
+            self._retry_at = None
+            self._generation += 1
+            self._condition.notify_all()
+
+    def get_access_token(self, db: Optional[Session] = None) -> Optional[str]:
+        """
+        Get a valid access token, loading or refreshing it if needed
+
+        Args:
+            db: Database session used to load or store the token; a new
+                session is opened when None
+
+        Returns:
+            Access token, or None if there is no usable OAuth token
+        """
+        with self._condition:
+            while True:
+                now = datetime.utcnow()
+                token = self._token
+                if self._loaded and (token is None or not token.expires_within(self.refresh_margin, now)):
+                    return token.access_token if token else None
+                if self._retry_at and now < self._retry_at:
+                    return self._usable(token, now)
+                if not self._refreshing:
+                    break
+                self._condition.wait()
+
+            self._refreshing = True
+            generation = self._generation
+            loaded = self._loaded
+
+        result = token
+        try:
+            result = self._load_and_refresh(db, token if loaded else None, loaded)
+            failed = result is not None and result.expires_within(self.refresh_margin, datetime.utcnow())
+        except Exception as e:
+            logger.error(f"Failed to load or refresh YouTube token: {e}")
+            failed = True
+
+        with self._condition:
+            self._refreshing = False
+            if generation == self._generation:
+                self._token = result
+                self._loaded = not failed
+                self._retry_at = datetime.utcnow() + RETRY_AFTER if failed else None
+            self._condition.notify_all()
+        return self._usable(result, datetime.utcnow())
+
+    @staticmethod
+    def _usable(token: Optional[CachedToken], now: datetime) -> Optional[str]:
+        if token is None or token.expires_within(timedelta(0), now):
+            return None
+        return token.access_token
+
+    def _load_and_refresh(self, db: Optional[Session], token: Optional[CachedToken],
+                          loaded: bool) -> Optional[CachedToken]:
+        if db is None:
+            with SessionLocal() as session:
+                return self._load_and_refresh(session, token, loaded)
+
+        if not loaded:
+            row = db.query(
+                YouTubeToken.id,
+                YouTubeToken.access_token,
+                YouTubeToken.refresh_token,
+                YouTubeToken.expires_at
+            ).filter(YouTubeToken.is_active == True).order_by(YouTubeToken.updated_at.desc()).first()
+            if row is None:
+                return None
+            token = CachedToken(*row)
+
+        if not token.expires_within(self.refresh_margin, datetime.utcnow()) or not token.refresh_token:
+            return token
+
+        tokens = exchange_refresh_token(token.refresh_token)
+        now = datetime.utcnow()
+        refreshed = CachedToken(
+            id=token.id,
+            access_token=tokens["access_token"],
+            # The response might not include a new refresh token
+            refresh_token=tokens.get("refresh_token", token.refresh_token),
+            expires_at=now + timedelta(seconds=tokens["expires_in"])
+        )
+        db.execute(update(YouTubeToken).where(YouTubeToken.id == token.id).values(
+            access_token=refreshed.access_token,
+            refresh_token=refreshed.refresh_token,
+            expires_at=refreshed.expires_at,
+            updated_at=now
+        ))
+        db.commit()
+        logger.info("Refreshed YouTube access token")
+        return refreshed
+
+
+# Shared cache for the process
+token_cache = TokenCache()
@@ -1,11 +1,13 @@
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
 from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.models import Link, VideoMetrics, ClickEvent, BookingEvent, SaleEvent
+from app.models import Link, VideoMetrics, ClickEvent, BookingEvent, SaleEvent, hash_email
 from app.database import get_db
+from app.services.click_matcher import click_matcher
+from app.services.metrics import tracked_events, tracked_revenue
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -138,10 +140,15 @@ class UTMTracker:
         db.commit()
         db.refresh(click)
         
+        # Keep the matcher's recent-clicks buffer current
+        click_matcher.record_click(click)
+        tracked_events.inc("click")
+        
         return click
     
     @staticmethod
-    def track_booking(db: Session, click_id: int, email: str, name: str) -> BookingEvent:
+    def track_booking(db: Session, click_id: int, email: str, name: str,
+                      external_id: Optional[str] = None) -> BookingEvent:
         """
         Track a booking event
         
@@ -150,6 +157,7 @@ class UTMTracker:
             click_id: ID of the associated click event
             email: User email
             name: User name
+            external_id: Calendly invitee URI
             
         Returns:
             Created BookingEvent object
@@ -158,17 +166,69 @@ class UTMTracker:
             click_id=click_id,
             email=email,
             name=name,
-            timestamp=datetime.utcnow()
+            timestamp=datetime.utcnow(),
+            external_id=external_id
         )
         
         db.add(booking)
         db.commit()
         db.refresh(booking)
+        tracked_events.inc("booking")
         
         return booking
     
     @staticmethod
-    def track_sale(db: Session, booking_id: int, amount: float) -> SaleEvent:
+    def find_latest_booking_by_email(db: Session, email: str) -> Optional[BookingEvent]:
+        """
+        Find the most recent booking for an email address
+        
+        Matching is case and whitespace insensitive and resolves with a
+        single seek on the (email_hash, timestamp DESC) index.
+        
+        Args:
+            db: Database session
+            email: Customer email as received
+            
+        Returns:
+            Latest BookingEvent or None if there is no booking for this email
+        """
+        email_hash = hash_email(email)
+        if not email_hash:
+            return None
+            
+        return db.query(BookingEvent).filter(
+            BookingEvent.email_hash == email_hash
+        ).order_by(BookingEvent.timestamp.desc()).first()
+    
+    @staticmethod
+    def find_latest_sale_by_email(db: Session, email: str) -> Optional[SaleEvent]:
+        """
+        Find the most recent sale attributed to an email address
+        
+        Looks across every booking for the email, so a newer booking that
+        never converted doesn't hide the sale of an earlier one.
+        
+        Args:
+            db: Database session
+            email: Customer email as received
+            
+        Returns:
+            Latest SaleEvent or None if no booking for this email has a sale
+        """
+        email_hash = hash_email(email)
+        if not email_hash:
+            return None
+            
+        return db.query(SaleEvent).join(
+            BookingEvent, SaleEvent.booking_id == BookingEvent.id
+        ).filter(
+            BookingEvent.email_hash == email_hash
+        ).order_by(SaleEvent.timestamp.desc(), SaleEvent.id.desc()).first()
+    
+    @staticmethod
+    def track_sale(db: Session, booking_id: int, amount: float,
+                   external_id: Optional[str] = None,
+                   timestamp: Optional[datetime] = None) -> SaleEvent:
         """
         Track a sale event
         
@@ -176,6 +236,8 @@ class UTMTracker:
             db: Database session
             booking_id: ID of the associated booking event
             amount: Sale amount
+            external_id: Stripe payment intent id
+            timestamp: When the payment was made (default: now)
             
         Returns:
             Created SaleEvent object
@@ -183,69 +245,145 @@ class UTMTracker:
         sale = SaleEvent(
             booking_id=booking_id,
             amount=amount,
-            timestamp=datetime.utcnow()
+            timestamp=timestamp or datetime.utcnow(),
+            external_id=external_id
         )
         
         db.add(sale)
         db.commit()
         db.refresh(sale)
+        tracked_events.inc("sale")
+        tracked_revenue.inc(amount=sale.amount or 0.0)
         
         return sale
     
     @staticmethod
-    def get_attribution_chain(db: Session, sale_id: int) -> Dict[str, Any]:
+    def attribution_query(db: Session):
         """
-        Get the complete attribution chain for a sale
+        Query joining each sale to its booking, click and video
+        
+        Sales whose chain is incomplete are excluded by the inner joins.
         
         Args:
             db: Database session
-            sale_id: Sale event ID
             
         Returns:
-            Dict with the complete attribution chain
+            SQLAlchemy query yielding one row per sale
+        """
+        return db.query(
+            SaleEvent.id.label("sale_id"),
+            SaleEvent.amount.label("sale_amount"),
+            SaleEvent.timestamp.label("sale_timestamp"),
+            BookingEvent.id.label("booking_id"),
+            BookingEvent.email.label("booking_email"),
+            BookingEvent.name.label("booking_name"),
+            BookingEvent.timestamp.label("booking_timestamp"),
+            ClickEvent.id.label("click_id"),
+            ClickEvent.ip_address.label("click_ip_address"),
+            ClickEvent.user_agent.label("click_user_agent"),
+            ClickEvent.referrer.label("click_referrer"),
+            ClickEvent.timestamp.label("click_timestamp"),
+            VideoMetrics.id.label("video_id"),
+            VideoMetrics.slug.label("video_slug"),
+            VideoMetrics.title.label("video_title"),
+            VideoMetrics.views.label("video_views"),
+            VideoMetrics.likes.label("video_likes"),
+            VideoMetrics.comments.label("video_comments")
+        ).join(
+            BookingEvent, SaleEvent.booking_id == BookingEvent.id
+        ).join(
+            ClickEvent, BookingEvent.click_id == ClickEvent.id
+        ).join(
+            VideoMetrics, ClickEvent.video_id == VideoMetrics.id
+        )
+    
+    @staticmethod
+    def chain_from_row(row) -> Dict[str, Any]:
+        """
+        Build an attribution chain dict from a row of attribution_query
         """
-        sale = db.query(SaleEvent).filter(SaleEvent.id == sale_id).first()
-        if not sale:
-            return None
-            
-        booking = db.query(BookingEvent).filter(BookingEvent.id == sale.booking_id).first()
-        if not booking:
-            return None
-            
-        click = db.query(ClickEvent).filter(ClickEvent.id == booking.click_id).first()
-        if not click:
-            return None
-            
-        video = db.query(VideoMetrics).filter(VideoMetrics.id == click.video_id).first()
-        if not video:
-            return None
-            
-        # Build the attribution chain
         return {
             "sale": {
-                "id": sale.id,
-                "amount": sale.amount,
-                "timestamp": sale.timestamp
+                "id": row.sale_id,
+                "amount": row.sale_amount,
+                "timestamp": row.sale_timestamp
             },
             "booking": {
-                "id": booking.id,
-                "email": booking.email,
-                "name": booking.name,
-                "timestamp": booking.timestamp
+                "id": row.booking_id,
+                "email": row.booking_email,
+                "name": row.booking_name,
+                "timestamp": row.booking_timestamp
             },
             "click": {
-                "id": click.id,
-                "ip_address": click.ip_address,
-                "user_agent": click.user_agent,
-                "referrer": click.referrer,
-                "timestamp": click.timestamp
+                "id": row.click_id,
+                "ip_address": row.click_ip_address,
+                "user_agent": row.click_user_agent,
+                "referrer": row.click_referrer,
+                "timestamp": row.click_timestamp
             },
             "video": {
-                "id": video.id,
-                "slug": video.slug,
-                "title": video.title,
-                "views": video.views,
-                "likes": video.likes,
-                "comments": video.comments
+                "id": row.video_id,
+                "slug": row.video_slug,
+                "title": row.video_title,
+                "views": row.video_views,
+                "likes": row.video_likes,
+                "comments": row.video_comments
             }
-        } 
\ No newline at end of file
+        }
+    
+    @staticmethod
+    def get_attribution_chain(db: Session, sale_id: int) -> Dict[str, Any]:
+        """
+        Get the complete attribution chain for a sale
+        
+        Args:
+            db: Database session
+            sale_id: Sale event ID
+            
+        Returns:
+            Dict with the complete attribution chain, or None if the sale
+            doesn't exist or its chain is incomplete
+        """
+        row = UTMTracker.attribution_query(db).filter(SaleEvent.id == sale_id).first()
+        if not row:
+            return None
+            
+        return UTMTracker.chain_from_row(row)
+    
+    @staticmethod
+    def iter_attribution_chains(
+        db: Session,
+        sale_ids: Optional[List[int]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        chunk_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream attribution chains for many sales
+        
+        Args:
+            db: Database session
+            sale_ids: Sales to resolve (queried in chunks to bound the IN list)
+            start: Only sales at or after this time
+            end: Only sales before this time
+            chunk_size: Sale ids per query, and rows fetched per round trip
+            
+        Yields:
+            Attribution chain dicts, in sale id order within each chunk
+        """
+        query = UTMTracker.attribution_query(db)
+        if start:
+            query = query.filter(SaleEvent.timestamp >= start)
+        if end:
+            query = query.filter(SaleEvent.timestamp < end)
+        
+        if sale_ids is None:
+            for row in query.order_by(SaleEvent.id).yield_per(chunk_size):
+                yield UTMTracker.chain_from_row(row)
+            return
+        
+        unique_ids = sorted(set(sale_ids))
+        for i in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[i:i + chunk_size]
+            for row in query.filter(SaleEvent.id.in_(chunk)).order_by(SaleEvent.id):
+                yield UTMTracker.chain_from_row(row)
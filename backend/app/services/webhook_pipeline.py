@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, Optional, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+EventT = TypeVar("EventT", bound=BaseModel)
+
+# Handler signature: (validated event, db session) -> response body
+WebhookHandler = Callable[[Any, Session], Dict[str, Any]]
+
+# Pipeline stages, in order
+STAGES = ("verify", "parse", "handle")
+
+
+class WebhookSignatureError(Exception):
+    """The webhook signature did not verify"""
+
+
+class WebhookPayloadError(Exception):
+    """The webhook body is not valid JSON or does not match the event schema"""
+
+
+class WebhookRegistry:
+    """
+    Maps event types to handler functions
+
+    Usage:
+        registry = WebhookRegistry("stripe")
+
+        @registry.on("payment_intent.succeeded")
+        def handle_payment(event, db):
+            ...
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._handlers: Dict[str, WebhookHandler] = {}
+
+    def on(self, *event_types: str) -> Callable[[WebhookHandler], WebhookHandler]:
+        """Register the decorated function for one or more event types"""
+        def decorator(handler: WebhookHandler) -> WebhookHandler:
+            for event_type in event_types:
+                if event_type in self._handlers:
+                    raise ValueError(f"{self.source} handler already registered for {event_type}")
+                self._handlers[event_type] = handler
+            return handler
+        return decorator
+
+    def get(self, event_type: Optional[str]) -> Optional[WebhookHandler]:
+        return self._handlers.get(event_type) if event_type else None
+
+    @property
+    def event_types(self):
+        return sorted(self._handlers)
+
+
+@dataclass
+class StageStats:
+    """Running totals for one pipeline stage"""
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3)
+        }
+
+
+@dataclass
+class WebhookResult:
+    """Handler response plus how long each stage took"""
+    body: Dict[str, Any]
+    event_type: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def server_timing(self) -> str:
+        """Format the stage timings as a Server-Timing header value"""
+        return ", ".join(f"{stage};dur={ms:.3f}" for stage, ms in self.timings.items())
+
+
+class WebhookPipeline(Generic[EventT]):
+    """
+    Verify -> parse -> handle pipeline for one webhook source.
+
+    The raw body is verified as bytes, then parsed and validated into the
+    typed event model in a single pass, then dispatched to the handler
+    registered for its event type. Each stage is timed.
+    """
+
+    def __init__(
+        self,
+        registry: WebhookRegistry,
+        event_model: Type[EventT],
+        get_event_type: Callable[[EventT], Optional[str]],
+        verify_signature: Callable[[bytes, str], bool]
+    ):
+        self.registry = registry
+        self.event_model = event_model
+        self.get_event_type = get_event_type
+        self.verify_signature = verify_signature
+        self._stats: Dict[str, StageStats] = {stage: StageStats() for stage in STAGES}
+        self._lock = threading.Lock()
+
+    def _record(self, timings: Dict[str, float]) -> None:
+        with self._lock:
+            for stage, duration_ms in timings.items():
+                self._stats[stage].add(duration_ms)
+
+    def process(self, body: bytes, signature: Optional[str], db: Session) -> WebhookResult:
+        """
+        Run a webhook body through the pipeline
+
+        Args:
+            body: Raw request body
+            signature: Signature header, verified only when provided
+            db: Database session passed to the handler
+
+        Returns:
+            WebhookResult with the handler's response body
+
+        Raises:
+            WebhookSignatureError: If the signature is invalid
+            WebhookPayloadError: If the body doesn't match the event model
+        """
+        timings: Dict[str, float] = {}
+        try:
+            started = time.perf_counter()
+            if signature and not self.verify_signature(body, signature):
+                raise WebhookSignatureError("Invalid webhook signature")
+            timings["verify"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            try:
+                event = self.event_model.model_validate_json(body)
+            except ValidationError as e:
+                raise WebhookPayloadError(str(e)) from e
+            event_type = self.get_event_type(event)
+            timings["parse"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            handler = self.registry.get(event_type)
+            if handler is None:
+                response = {"status": "success", "message": "Webhook received"}
+            else:
+                try:
+                    response = handler(event, db)
+                except ValidationError as e:
+                    raise WebhookPayloadError(str(e)) from e
+            timings["handle"] = (time.perf_counter() - started) * 1000
+        finally:
+            self._record(timings)
+
+        result = WebhookResult(body=response, event_type=event_type, timings=timings)
+        logger.debug(f"{self.registry.source} webhook {event_type}: {result.server_timing()}")
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage call counts and average/max durations in milliseconds"""
+        with self._lock:
+            return {stage: stats.as_dict() for stage, stats in self._stats.items()}
@@ -1,17 +1,79 @@
+import asyncio
+import httpx
 import requests
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 
-from app.config import YOUTUBE_API_KEY, YOUTUBE_CLIENT_ID, YOUTUBE_CLIENT_SECRET
+from app.config import (
+    YOUTUBE_API_KEY,
+    YOUTUBE_API_BASE_URL,
+    YOUTUBE_MAX_CONCURRENCY,
+    YOUTUBE_REQUEST_TIMEOUT,
+    YOUTUBE_MAX_REQUESTS_PER_SECOND,
+    YOUTUBE_STATIC_TTL_HOURS
+)
 from app.models import YouTubeToken
+from app.services.http_client import RETRY_STATUSES, CircuitOpenError, http_client
+from app.services.response_cache import cache_key, youtube_cache
+from app.services.token_cache import exchange_refresh_token, token_cache
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# YouTube API base URL
-YOUTUBE_API_BASE_URL = "https://www.googleapis.com/youtube/v3"
+# videos.list accepts up to 50 comma-separated IDs and costs 1 quota unit
+# per call regardless of how many IDs it carries
+MAX_IDS_PER_REQUEST = 50
+
+# Parts that rarely change; served from the response cache until they are
+# older than YOUTUBE_STATIC_TTL_HOURS. Statistics are always revalidated.
+STATIC_PARTS = "snippet,contentDetails"
+STATIC_MAX_AGE = YOUTUBE_STATIC_TTL_HOURS * 3600
+
+def cached_get(
+    path: str,
+    params: Dict[str, Any],
+    headers: Dict[str, str],
+    key: str,
+    max_age: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    GET a Data API endpoint through the response cache
+    
+    A cached response younger than max_age is returned without a request.
+    Otherwise the request carries If-None-Match with the cached ETag, and a
+    304 answer returns the cached body.
+    
+    Args:
+        path: Endpoint path, e.g. "/videos"
+        params: Query parameters including auth
+        headers: Request headers including auth
+        key: Cache key from cache_key()
+        max_age: Seconds a cached response is used without revalidating
+        
+    Returns:
+        Parsed JSON response
+        
+    Raises:
+        requests.RequestException: On connection errors and non-2xx responses
+    """
+    entry = youtube_cache.get(key)
+    if entry is not None and max_age is not None and entry.age < max_age:
+        return entry.body
+    if entry is not None and entry.etag:
+        headers = dict(headers, **{"If-None-Match": entry.etag})
+    
+    response = http_client.get(f"{YOUTUBE_API_BASE_URL}{path}", service="youtube", params=params, headers=headers)
+    if response.status_code == 304 and entry is not None:
+        youtube_cache.touch(key)
+        return entry.body
+    response.raise_for_status()
+    
+    data = response.json()
+    youtube_cache.put(key, data.get("etag") or response.headers.get("ETag"), data)
+    return data
 
 def get_active_token(db: Session) -> Optional[YouTubeToken]:
     """
@@ -41,18 +103,7 @@ def refresh_token_if_needed(db: Session, token: YouTubeToken) -> Optional[YouTub
         
     try:
         # Get new tokens using the refresh token
-        refresh_url = "https://oauth2.googleapis.com/token"
-        refresh_data = {
-            "client_id": YOUTUBE_CLIENT_ID,
-            "client_secret": YOUTUBE_CLIENT_SECRET,
-            "refresh_token": token.refresh_token,
-            "grant_type": "refresh_token"
-        }
-        
-        response = requests.post(refresh_url, data=refresh_data)
-        response.raise_for_status()
-        
-        tokens = response.json()
+        tokens = exchange_refresh_token(token.refresh_token)
         
         # Update token
         token.access_token = tokens["access_token"]
@@ -64,6 +115,7 @@ def refresh_token_if_needed(db: Session, token: YouTubeToken) -> Optional[YouTub
         
         db.commit()
         db.refresh(token)
+        token_cache.invalidate()
         
         return token
     except Exception as e:
@@ -75,6 +127,10 @@ def get_authorization_header(db: Session = None) -> Dict[str, str]:
     Get authorization header for API requests.
     Tries to use OAuth token first, falls back to API key.
     
+    The OAuth token comes from the process-level token cache, so this
+    makes no database queries unless the token has to be loaded or
+    refreshed.
+    
     Args:
         db: Database session (optional)
         
@@ -82,11 +138,9 @@ def get_authorization_header(db: Session = None) -> Dict[str, str]:
         Dict with authorization header
     """
     if db:
-        token = get_active_token(db)
-        if token:
-            token = refresh_token_if_needed(db, token)
-            if token:
-                return {"Authorization": f"Bearer {token.access_token}"}
+        access_token = token_cache.get_access_token(db)
+        if access_token:
+            return {"Authorization": f"Bearer {access_token}"}
     
     # Fall back to API key
     if YOUTUBE_API_KEY:
@@ -105,50 +159,43 @@ def get_video_statistics(video_id: str, db: Session = None) -> Optional[Dict[str
     Returns:
         Dict containing video statistics or None if request fails
     """
+    auth = get_request_auth(db)
+    if auth is None:
+        return None
+    auth_params, headers = auth
+    
     try:
-        url = f"{YOUTUBE_API_BASE_URL}/videos"
-        
-        # Try to use OAuth first, fallback to API key
-        auth_header = get_authorization_header(db)
-        
-        if "Authorization" in auth_header:
-            # Using OAuth token
-            params = {
-                "part": "statistics,contentDetails,snippet",
-                "id": video_id
-            }
-            headers = {
-                "Authorization": auth_header["Authorization"],
-                "Content-Type": "application/json"
-            }
-            response = requests.get(url, params=params, headers=headers)
-        else:
-            # Fallback to API key
-            if not YOUTUBE_API_KEY:
-                logger.error("No YouTube authentication method available (neither OAuth token nor API key)")
-                return None
-                
-            params = {
-                "part": "statistics,contentDetails,snippet",
-                "id": video_id,
-                "key": YOUTUBE_API_KEY
-            }
-            response = requests.get(url, params=params)
-        
-        response.raise_for_status()
+        # Static parts come from the cache most of the time; statistics are
+        # revalidated on every call
+        static = cached_get(
+            "/videos",
+            dict(auth_params, part=STATIC_PARTS, id=video_id),
+            headers,
+            cache_key("videos", [video_id], STATIC_PARTS),
+            max_age=STATIC_MAX_AGE
+        )
+        if not static.get("items"):
+            logger.warning(f"No data found for video ID: {video_id}")
+            return None
         
-        data = response.json()
+        data = cached_get(
+            "/videos",
+            dict(auth_params, part="statistics", id=video_id),
+            headers,
+            cache_key("videos", [video_id], "statistics")
+        )
         
         if not data.get("items"):
             logger.warning(f"No data found for video ID: {video_id}")
             return None
             
         video_data = data["items"][0]
+        static_data = static["items"][0]
         
         # Extract relevant statistics
         stats = video_data["statistics"]
-        details = video_data["contentDetails"]
-        snippet = video_data["snippet"]
+        details = static_data["contentDetails"]
+        snippet = static_data["snippet"]
         
         # Parse duration
         duration = details["duration"]  # In ISO 8601 format
@@ -172,32 +219,277 @@ def get_video_statistics(video_id: str, db: Session = None) -> Optional[Dict[str
         logger.error(f"Error parsing YouTube API response: {e}")
         return None
 
-def get_channel_statistics(channel_id: str) -> Optional[Dict[str, Any]]:
+def get_request_auth(db: Session = None) -> Optional[Tuple[Dict[str, str], Dict[str, str]]]:
+    """
+    Resolve authentication for Data API requests once
+    
+    Args:
+        db: Database session for OAuth token (optional)
+        
+    Returns:
+        (query params, headers) to add to each request, or None if neither
+        an OAuth token nor an API key is available
+    """
+    auth_header = get_authorization_header(db)
+    if "Authorization" in auth_header:
+        return {}, {"Authorization": auth_header["Authorization"]}
+    if YOUTUBE_API_KEY:
+        return {"key": YOUTUBE_API_KEY}, {}
+    logger.error("No YouTube authentication method available (neither OAuth token nor API key)")
+    return None
+
+def batch_video_ids(video_ids: List[str]) -> List[List[str]]:
+    """
+    Deduplicate video IDs and split them into videos.list sized batches
+    
+    IDs are sorted so the same set of videos always produces the same
+    batches, and therefore the same response cache keys.
+    """
+    unique_ids = sorted(set(video_ids))
+    return [unique_ids[i:i + MAX_IDS_PER_REQUEST] for i in range(0, len(unique_ids), MAX_IDS_PER_REQUEST)]
+
+def parse_statistics_items(data: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Extract view, like and comment counts from a videos.list response"""
+    results = {}
+    for item in data.get("items", []):
+        stats = item.get("statistics", {})
+        results[item["id"]] = {
+            "views": int(stats.get("viewCount", 0)),
+            "likes": int(stats.get("likeCount", 0)),
+            "comments": int(stats.get("commentCount", 0))
+        }
+    return results
+
+def get_videos_statistics(video_ids: List[str], db: Session = None) -> Dict[str, Dict[str, int]]:
+    """
+    Get view, like and comment counts for many videos
+    
+    Requests statistics only, in batches of MAX_IDS_PER_REQUEST IDs per
+    videos.list call. A failed batch is logged and skipped.
+    
+    Args:
+        video_ids: YouTube video IDs
+        db: Database session for OAuth token (optional)
+        
+    Returns:
+        Dict mapping video ID to its statistics; IDs YouTube didn't return
+        (deleted or private videos) are missing
+    """
+    auth = get_request_auth(db)
+    if auth is None:
+        return {}
+    auth_params, headers = auth
+    
+    results = {}
+    for batch in batch_video_ids(video_ids):
+        params = dict(auth_params, part="statistics", id=",".join(batch), maxResults=len(batch))
+        
+        try:
+            data = cached_get("/videos", params, headers, cache_key("videos", batch, "statistics"))
+            results.update(parse_statistics_items(data))
+        except requests.RequestException as e:
+            logger.error(f"YouTube API request failed for batch of {len(batch)} videos: {e}")
+        except (KeyError, ValueError) as e:
+            logger.error(f"Error parsing YouTube API response: {e}")
+    
+    return results
+
+class AsyncYouTubeClient:
+    """
+    Async Data API client for fanning out batch requests concurrently.
+    
+    Keeps a pool of keep-alive connections, bounds in-flight requests with a
+    semaphore, spaces request starts to stay under a requests-per-second
+    limit, and applies a timeout to every request.
+    
+    Usage:
+        async with AsyncYouTubeClient() as client:
+            stats = await client.get_videos_statistics(ids, auth)
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = YOUTUBE_MAX_CONCURRENCY,
+        timeout: float = YOUTUBE_REQUEST_TIMEOUT,
+        max_requests_per_second: float = YOUTUBE_MAX_REQUESTS_PER_SECOND
+    ):
+        self._client = httpx.AsyncClient(
+            base_url=YOUTUBE_API_BASE_URL,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency
+            )
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._interval = 1.0 / max_requests_per_second if max_requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._throttle_lock = asyncio.Lock()
+    
+    async def __aenter__(self) -> "AsyncYouTubeClient":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        await self._client.aclose()
+    
+    async def _throttle(self) -> None:
+        """Wait for the next request slot under the rate limit"""
+        if not self._interval:
+            return
+        async with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    async def _send(self, path: str, params: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+        """
+        Send one GET with the shared client's breaker, retries and host metrics
+        """
+        breaker = http_client.breaker("youtube")
+        host = self._client.base_url.netloc.decode()
+        for attempt in range(http_client.max_retries + 1):
+            try:
+                trial = breaker.before_request()
+            except CircuitOpenError as e:
+                http_client.record(host, 0.0, None, True, rejected=True)
+                raise httpx.ConnectError(str(e))
+            
+            try:
+                async with self._semaphore:
+                    await self._throttle()
+                    start = time.monotonic()
+                    try:
+                        response = await self._client.get(path, params=params, headers=headers)
+                    except httpx.TransportError:
+                        http_client.record(host, time.monotonic() - start, None, True, retried=attempt > 0)
+                        breaker.record_failure()
+                        if attempt == http_client.max_retries:
+                            raise
+                        response = None
+            except BaseException:
+                # Cancelled (e.g. by a job timeout) or failed without an
+                # outcome; a failure above has already cleared the trial
+                if trial:
+                    breaker.release_trial()
+                raise
+            
+            if response is not None:
+                failed = response.status_code in RETRY_STATUSES
+                http_client.record(host, time.monotonic() - start, response.status_code, failed, retried=attempt > 0)
+                if not failed:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt == http_client.max_retries:
+                    return response
+            await asyncio.sleep(http_client.backoff_delay(attempt, response))
+        return response
+    
+    async def get(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        headers: Dict[str, str],
+        key: Optional[str] = None,
+        max_age: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        GET a Data API endpoint within the concurrency and rate limits
+        
+        When a cache key is given the request goes through the response
+        cache, like cached_get.
+        
+        Raises:
+            httpx.HTTPError: On timeouts, connection errors and non-2xx responses
+        """
+        # The cache is a SQLite file; keep its reads and writes off the event loop
+        entry = await asyncio.to_thread(youtube_cache.get, key) if key else None
+        if entry is not None and max_age is not None and entry.age < max_age:
+            return entry.body
+        if entry is not None and entry.etag:
+            headers = dict(headers, **{"If-None-Match": entry.etag})
+        
+        response = await self._send(path, params, headers)
+        if response.status_code == 304 and entry is not None:
+            await asyncio.to_thread(youtube_cache.touch, key)
+            return entry.body
+        response.raise_for_status()
+        
+        data = response.json()
+        if key:
+            await asyncio.to_thread(youtube_cache.put, key, data.get("etag") or response.headers.get("ETag"), data)
+        return data
+    
+    async def _get_statistics_batch(
+        self,
+        batch: List[str],
+        auth_params: Dict[str, str],
+        headers: Dict[str, str]
+    ) -> Dict[str, Dict[str, int]]:
+        params = dict(auth_params, part="statistics", id=",".join(batch), maxResults=len(batch))
+        try:
+            data = await self.get("/videos", params, headers, key=cache_key("videos", batch, "statistics"))
+            return parse_statistics_items(data)
+        except httpx.HTTPError as e:
+            logger.error(f"YouTube API request failed for batch of {len(batch)} videos: {e}")
+        except (KeyError, ValueError) as e:
+            logger.error(f"Error parsing YouTube API response: {e}")
+        return {}
+    
+    async def get_videos_statistics(
+        self,
+        video_ids: List[str],
+        auth: Tuple[Dict[str, str], Dict[str, str]]
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Get statistics for many videos, fetching the 50-ID batches concurrently
+        
+        Args:
+            video_ids: YouTube video IDs
+            auth: (query params, headers) from get_request_auth
+            
+        Returns:
+            Dict mapping video ID to its statistics; failed batches are skipped
+        """
+        auth_params, headers = auth
+        batches = batch_video_ids(video_ids)
+        results: Dict[str, Dict[str, int]] = {}
+        for batch_result in await asyncio.gather(
+            *(self._get_statistics_batch(batch, auth_params, headers) for batch in batches)
+        ):
+            results.update(batch_result)
+        return results
+
+def get_channel_statistics(channel_id: str, db: Session = None) -> Optional[Dict[str, Any]]:
     """
     Get statistics for a YouTube channel
     
     Args:
         channel_id: YouTube channel ID
+        db: Database session for OAuth token (optional)
         
     Returns:
         Dict containing channel statistics or None if request fails
     """
-    if not YOUTUBE_API_KEY:
-        logger.error("YouTube API key is not configured")
+    auth = get_request_auth(db)
+    if auth is None:
         return None
+    auth_params, headers = auth
         
     try:
-        url = f"{YOUTUBE_API_BASE_URL}/channels"
-        params = {
-            "part": "statistics,snippet,contentDetails",
-            "id": channel_id,
-            "key": YOUTUBE_API_KEY
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        params = dict(auth_params, part="statistics,snippet,contentDetails", id=channel_id)
         
-        data = response.json()
+        data = cached_get(
+            "/channels",
+            params,
+            headers,
+            cache_key("channels", [channel_id], params["part"])
+        )
         
         if not data.get("items"):
             logger.warning(f"No data found for channel ID: {channel_id}")
@@ -211,7 +503,8 @@ def get_channel_statistics(channel_id: str) -> Optional[Dict[str, Any]]:
             "subscriber_count": int(channel_data["statistics"].get("subscriberCount", 0)),
             "video_count": int(channel_data["statistics"].get("videoCount", 0)),
             "view_count": int(channel_data["statistics"].get("viewCount", 0)),
-            "published_at": channel_data["snippet"]["publishedAt"]
+            "published_at": channel_data["snippet"]["publishedAt"],
+            "uploads_playlist_id": channel_data.get("contentDetails", {}).get("relatedPlaylists", {}).get("uploads")
         }
         
     except requests.RequestException as e:
@@ -219,4 +512,41 @@ def get_channel_statistics(channel_id: str) -> Optional[Dict[str, Any]]:
         return None
     except (KeyError, ValueError) as e:
         logger.error(f"Error parsing YouTube API response: {e}")
-        return None 
\ No newline at end of file
+        return None
+
+def iter_playlist_items(playlist_id: str, auth: Tuple[Dict[str, str], Dict[str, str]]) -> Iterator[Dict[str, Any]]:
+    """
+    Page through every item of a playlist, 50 per playlistItems.list call
+    
+    Args:
+        playlist_id: YouTube playlist ID, e.g. a channel's uploads playlist
+        auth: (query params, headers) from get_request_auth
+        
+    Yields:
+        Raw playlist items with snippet and contentDetails
+        
+    Raises:
+        requests.RequestException: If a page request fails
+    """
+    auth_params, headers = auth
+    page_token = None
+    
+    while True:
+        params = dict(
+            auth_params,
+            part="snippet,contentDetails",
+            playlistId=playlist_id,
+            maxResults=MAX_IDS_PER_REQUEST
+        )
+        if page_token:
+            params["pageToken"] = page_token
+        
+        response = http_client.get(f"{YOUTUBE_API_BASE_URL}/playlistItems", service="youtube", params=params, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        
+        yield from data.get("items", [])
+        
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            return
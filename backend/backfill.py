@@ -0,0 +1,69 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow absolute imports
+parent_dir = str(Path(__file__).resolve().parent)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Import app modules after setting up path
+from app.database import SessionLocal, engine
+from app.migrations import ensure_schema
+from app.services.backfill import BackfillImporter
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Import historical Calendly and Stripe webhook events from NDJSON exports"
+    )
+    parser.add_argument(
+        "--calendly", action="append", default=[], metavar="FILE",
+        help="NDJSON file of Calendly webhook events (repeatable, '-' for stdin)"
+    )
+    parser.add_argument(
+        "--stripe", action="append", default=[], metavar="FILE",
+        help="NDJSON file of Stripe webhook events (repeatable, '-' for stdin)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000,
+        help="Events attributed and inserted per batch (default: 1000)"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.calendly and not args.stripe:
+        logger.error("Nothing to import: pass --calendly and/or --stripe")
+        return 1
+
+    ensure_schema(engine)
+
+    db = SessionLocal()
+    try:
+        importer = BackfillImporter(db, batch_size=args.batch_size)
+
+        # Bookings first so sales can be attributed to them
+        results = [importer.import_calendly(path) for path in args.calendly]
+        results += [importer.import_stripe(path) for path in args.stripe]
+    finally:
+        db.close()
+
+    logger.info("Backfill complete")
+    for stats in results:
+        logger.info(stats.summary())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
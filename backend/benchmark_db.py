@@ -0,0 +1,181 @@
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add the parent directory to sys.path to allow absolute imports
+parent_dir = str(Path(__file__).resolve().parent)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Import app modules after setting up path
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_db_engine
+from app.models import ClickEvent, VideoMetrics
+
+# Mixed workload: concurrent click inserts (one commit each, like the
+# redirect route) against dashboard-style aggregate reads over the same table.
+# The Postgres profiles need a scratch database, e.g.
+#   python benchmark_db.py --profiles postgres-baseline,postgres \
+#       --database-url postgresql://postgres@localhost:5432/bench
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare database engine profiles under a concurrent click-write / dashboard-read workload"
+    )
+    parser.add_argument(
+        "--profiles", default="sqlite-baseline,sqlite",
+        help="Comma-separated profiles to run (default: sqlite-baseline,sqlite)"
+    )
+    parser.add_argument(
+        "--database-url",
+        help="Database to run against (default: a temporary SQLite file per profile); "
+             "use a scratch Postgres database for the postgres profiles, its click data is replaced"
+    )
+    parser.add_argument("--writers", type=int, default=4, help="Concurrent click writers (default: 4)")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent dashboard readers (default: 4)")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration per profile (default: 10)")
+    parser.add_argument("--videos", type=int, default=50, help="Videos the clicks are spread over (default: 50)")
+    parser.add_argument("--seed-clicks", type=int, default=50000, help="Clicks inserted before the run (default: 50000)")
+    return parser.parse_args()
+
+def seed(session_factory, videos: int, clicks: int) -> List[int]:
+    with session_factory() as db:
+        db.query(ClickEvent).delete()
+        db.query(VideoMetrics).filter(VideoMetrics.slug.like("bench-%")).delete(synchronize_session=False)
+        db.execute(insert(VideoMetrics), [{"slug": f"bench-{i}", "title": f"Benchmark {i}"} for i in range(videos)])
+        video_ids = [video_id for (video_id,) in db.query(VideoMetrics.id).filter(VideoMetrics.slug.like("bench-%"))]
+        now = datetime.utcnow()
+        rng = random.Random(0)
+        for start in range(0, clicks, 5000):
+            db.execute(insert(ClickEvent), [{
+                "video_id": rng.choice(video_ids),
+                "ip_address": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+                "user_agent": "benchmark",
+                "timestamp": now - timedelta(seconds=rng.randrange(30 * 86400))
+            } for _ in range(min(5000, clicks - start))])
+        db.commit()
+    return video_ids
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+def run_profile(profile: str, url: str, args) -> Dict[str, Any]:
+    engine = create_db_engine(url, profile)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    video_ids = seed(session_factory, args.videos, args.seed_clicks)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {"write": [], "read": [], "errors": 0}
+
+    def writer(n: int):
+        rng = random.Random(n)
+        latencies = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with session_factory() as db:
+                    db.add(ClickEvent(video_id=rng.choice(video_ids), ip_address="10.1.0.1", user_agent="benchmark"))
+                    db.commit()
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                logger.debug(f"Write failed: {e}")
+                with lock:
+                    results["errors"] += 1
+        with lock:
+            results["write"].extend(latencies)
+
+    def reader(n: int):
+        latencies = []
+        since = datetime.utcnow() - timedelta(days=7)
+        query = select(ClickEvent.video_id, func.count()).where(
+            ClickEvent.timestamp >= since
+        ).group_by(ClickEvent.video_id)
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with session_factory() as db:
+                    db.execute(query).all()
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                logger.debug(f"Read failed: {e}")
+                with lock:
+                    results["errors"] += 1
+        with lock:
+            results["read"].extend(latencies)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes_per_s": len(results["write"]) / args.seconds,
+        "write_p50_ms": percentile(results["write"], 0.5),
+        "write_p99_ms": percentile(results["write"], 0.99),
+        "reads_per_s": len(results["read"]) / args.seconds,
+        "read_p50_ms": percentile(results["read"], 0.5),
+        "read_p99_ms": percentile(results["read"], 0.99),
+        "errors": results["errors"]
+    }
+
+def main():
+    args = parse_args()
+    rows = []
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        tmpdir = None
+        url = args.database_url
+        if not url:
+            tmpdir = tempfile.mkdtemp(prefix="insyte-bench-")
+            url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+        logger.info(f"Running {profile} for {args.seconds:g}s with {args.writers} writers and {args.readers} readers")
+        try:
+            rows.append(run_profile(profile, url, args))
+        finally:
+            if tmpdir:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+
+    header = f"{'profile':<18}{'writes/s':>10}{'w p50 ms':>10}{'w p99 ms':>10}{'reads/s':>10}{'r p50 ms':>10}{'r p99 ms':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['profile']:<18}{row['writes_per_s']:>10.0f}{row['write_p50_ms']:>10.2f}{row['write_p99_ms']:>10.2f}"
+            f"{row['reads_per_s']:>10.0f}{row['read_p50_ms']:>10.2f}{row['read_p99_ms']:>10.2f}{row['errors']:>8}"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the parent directory to sys.path to allow absolute imports
+parent_dir = str(Path(__file__).resolve().parent)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Import app modules after setting up path
+from app.database import engine
+from app.migrations import LATEST_VERSION, MIGRATIONS, current_version, run_migrations
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Apply pending database schema migrations"
+    )
+    parser.add_argument(
+        "--status", action="store_true",
+        help="Show the current version and pending migrations without applying them"
+    )
+    parser.add_argument(
+        "--target", type=int, default=None,
+        help=f"Last version to apply (default: latest, {LATEST_VERSION})"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    version = current_version(engine)
+
+    if args.status:
+        logger.info(f"Schema version {version} of {LATEST_VERSION}")
+        for migration in MIGRATIONS:
+            if migration.version > version:
+                logger.info(f"Pending {migration.version}: {migration.description}")
+        return 0
+
+    applied = run_migrations(engine, args.target)
+    if not applied:
+        logger.info(f"Schema is up to date (version {version})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,6 +19,10 @@ pip install -r requirements.txt
 echo "Waiting for PostgreSQL database to be ready..."
 sleep 5  # Simple wait to ensure database is up
 
+# Apply pending schema migrations once per deploy, before serving
+echo "Running database migrations..."
+python migrate.py
+
 # Run the application using Uvicorn
 echo "Starting web server..."
 exec uvicorn app.main:app --host 0.0.0.0 --port $PORT 
\ No newline at end of file
@@ -0,0 +1,478 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import sys
+import time
+from urllib.parse import parse_qs
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Offline stand-in for the YouTube Data/Analytics, Google OAuth, Stripe and
+# Calendly endpoints the backend calls. Start it and set
+# API_SIMULATOR_URL=http://localhost:8010 for the API and worker to use it.
+
+LATENCY_DISTRIBUTIONS = ("fixed", "normal", "lognormal", "exponential")
+
+# Reference point for the synthetic view counts, which grow while the
+# simulator runs so refreshes see changing numbers
+EPOCH = datetime(2024, 1, 1)
+
+
+@dataclass
+class SimulatorConfig:
+    """Behaviour of the simulator, adjustable at runtime via /_simulator/config"""
+    latency: str = "lognormal"
+    latency_ms: float = 80.0
+    latency_jitter_ms: float = 40.0
+    error_rate: float = 0.0
+    quota_error_rate: float = 0.0
+    videos: int = 250
+    payments: int = 120
+    events: int = 60
+    seed: int = 42
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for field in fields(self):
+            if field.name in values:
+                setattr(self, field.name, type(getattr(self, field.name))(values[field.name]))
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency must be one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+
+
+class Simulator:
+    """Deterministic fake data plus latency and fault injection"""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.started = time.time()
+        self.stats: Counter = Counter()
+
+    # Latency and faults
+
+    def sample_latency(self) -> float:
+        """Seconds to delay the next response"""
+        mean = self.config.latency_ms / 1000
+        jitter = self.config.latency_jitter_ms / 1000
+        distribution = self.config.latency
+        if distribution == "fixed" or mean <= 0:
+            value = mean
+        elif distribution == "normal":
+            value = self.random.gauss(mean, jitter)
+        elif distribution == "exponential":
+            value = self.random.expovariate(1 / mean)
+        else:
+            # Lognormal with the configured mean and standard deviation
+            variance = jitter ** 2
+            sigma2 = math.log(1 + variance / mean ** 2)
+            mu = math.log(mean) - sigma2 / 2
+            value = self.random.lognormvariate(mu, sigma2 ** 0.5)
+        return max(0.0, value)
+
+    def injected_fault(self, api: str) -> Optional[Response]:
+        """An error response to return instead of the real one, if any"""
+        roll = self.random.random()
+        if roll < self.config.quota_error_rate:
+            self.stats[f"{api}:quota_error"] += 1
+            return quota_error(api)
+        if roll < self.config.quota_error_rate + self.config.error_rate:
+            self.stats[f"{api}:error"] += 1
+            return JSONResponse({"error": {"code": 503, "message": "Simulated backend error"}}, status_code=503)
+        return None
+
+    # Fake data
+
+    def _hash(self, *parts: Any) -> int:
+        digest = hashlib.sha256(":".join([str(self.config.seed)] + [str(p) for p in parts]).encode()).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def _token(self, *parts: Any, length: int = 11) -> str:
+        alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+        value = self._hash(*parts)
+        chars = []
+        for _ in range(length):
+            value, index = divmod(value, len(alphabet))
+            chars.append(alphabet[index])
+            if value == 0:
+                value = self._hash(*parts, len(chars))
+        return "".join(chars)
+
+    def channel_video_ids(self, channel_id: str) -> List[str]:
+        return [self._token("video", channel_id, i) for i in range(self.config.videos)]
+
+    def video(self, video_id: str, parts: List[str]) -> Dict[str, Any]:
+        h = self._hash("stats", video_id)
+        published = EPOCH + timedelta(minutes=h % (60 * 24 * 365))
+        hours = max((datetime.utcnow() - published).total_seconds() / 3600, 1)
+        # Views keep rising at a per-video rate; likes and comments follow
+        rate = 1 + h % 500
+        views = int(rate * hours)
+
+        item: Dict[str, Any] = {"kind": "youtube#video", "id": video_id}
+        if "snippet" in parts:
+            item["snippet"] = {
+                "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "channelId": "UC" + self._token("channel", video_id, length=22),
+                "channelTitle": "Simulated channel",
+                "title": f"Simulated video {video_id}",
+                "description": "Generated by the API simulator",
+                "thumbnails": {"default": {"url": f"https://i.ytimg.com/vi/{video_id}/default.jpg"}}
+            }
+        if "contentDetails" in parts:
+            seconds = 60 + h % 3600
+            item["contentDetails"] = {"duration": f"PT{seconds // 60}M{seconds % 60}S"}
+        if "statistics" in parts:
+            item["statistics"] = {
+                "viewCount": str(views),
+                "likeCount": str(views // (20 + h % 30)),
+                "commentCount": str(views // (200 + h % 300))
+            }
+        return item
+
+    def payment_intents(self) -> List[Dict[str, Any]]:
+        """Succeeded payments, newest first"""
+        now = int(self.started)
+        payments = []
+        for i in range(self.config.payments):
+            h = self._hash("payment", i)
+            payments.append({
+                "id": "pi_" + self._token("payment", i, length=24),
+                "object": "payment_intent",
+                "amount": 10000 + (h % 200) * 500,
+                "currency": "usd",
+                "status": "succeeded" if h % 10 else "requires_payment_method",
+                "created": now - i * 3600,
+                "receipt_email": f"customer{h % 1000}@example.com",
+                "metadata": {}
+            })
+        return payments
+
+    def scheduled_events(self) -> List[Dict[str, Any]]:
+        now = datetime.utcfromtimestamp(self.started)
+        events = []
+        for i in range(self.config.events):
+            uuid = self._token("event", i, length=16)
+            start = now + timedelta(hours=i * 6)
+            events.append({
+                "uri": f"https://api.calendly.com/scheduled_events/{uuid}",
+                "name": "Strategy Call",
+                "status": "active",
+                "start_time": start.strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+                "end_time": (start + timedelta(minutes=30)).strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+                "created_at": (now - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+            })
+        return events
+
+
+def quota_error(api: str) -> Response:
+    """The rate/quota error each real API returns"""
+    if api == "youtube":
+        return JSONResponse({"error": {
+            "code": 403,
+            "message": "The request cannot be completed because you have exceeded your quota.",
+            "errors": [{"domain": "youtube.quota", "reason": "quotaExceeded"}]
+        }}, status_code=403)
+    if api == "stripe":
+        return JSONResponse({"error": {
+            "type": "rate_limit_error",
+            "message": "Too many requests made to the API too quickly"
+        }}, status_code=429)
+    return JSONResponse({"title": "Too Many Requests", "message": "Rate limit exceeded"},
+                        status_code=429, headers={"Retry-After": "1"})
+
+
+def api_for_path(path: str) -> Optional[str]:
+    for prefix, api in (("/youtube", "youtube"), ("/oauth2", "oauth2"), ("/stripe", "stripe"), ("/calendly", "calendly")):
+        if path.startswith(prefix):
+            return api
+    return None
+
+
+def page_bounds(page_token: Optional[str], size: int) -> tuple:
+    start = int(page_token) if page_token and page_token.isdigit() else 0
+    return start, start + size
+
+
+def create_app(config: Optional[SimulatorConfig] = None) -> FastAPI:
+    """
+    Build the simulator app
+
+    Args:
+        config: Initial behaviour (default: SimulatorConfig())
+
+    Returns:
+        FastAPI app serving the simulated endpoints
+    """
+    sim = Simulator(config or SimulatorConfig())
+    app = FastAPI(title="Insyte API Simulator")
+    app.state.simulator = sim
+
+    @app.middleware("http")
+    async def simulate_network(request: Request, call_next):
+        api = api_for_path(request.url.path)
+        if api is None:
+            return await call_next(request)
+
+        sim.stats[f"{api}:requests"] += 1
+        await asyncio.sleep(sim.sample_latency())
+        fault = sim.injected_fault(api)
+        if fault is not None:
+            return fault
+        return await call_next(request)
+
+    # Simulator control
+
+    @app.get("/_simulator/config")
+    async def get_config():
+        return asdict(sim.config)
+
+    @app.post("/_simulator/config")
+    async def set_config(request: Request):
+        values = await request.json()
+        try:
+            sim.config.update(values)
+        except (TypeError, ValueError) as e:
+            return JSONResponse({"detail": str(e)}, status_code=400)
+        sim.random.seed(sim.config.seed)
+        logger.info(f"Simulator config updated: {values}")
+        return asdict(sim.config)
+
+    @app.get("/_simulator/stats")
+    async def get_stats():
+        return {"uptime_seconds": round(time.time() - sim.started, 1), "counters": dict(sim.stats)}
+
+    # YouTube Data API v3
+
+    @app.get("/youtube/v3/videos")
+    async def youtube_videos(request: Request, id: str = "", part: str = "statistics"):
+        ids = [video_id for video_id in id.split(",") if video_id][:50]
+        parts = part.split(",")
+        body = {"kind": "youtube#videoListResponse", "items": [sim.video(video_id, parts) for video_id in ids]}
+        # Statistics change every request; snippet/contentDetails don't,
+        # so a conditional request for them gets a 304
+        etag = hashlib.md5(json.dumps(body, sort_keys=True).encode()).hexdigest()
+        if request.headers.get("if-none-match") == etag:
+            sim.stats["youtube:not_modified"] += 1
+            return Response(status_code=304, headers={"ETag": etag})
+        body["etag"] = etag
+        body["pageInfo"] = {"totalResults": len(ids), "resultsPerPage": len(ids)}
+        return JSONResponse(body, headers={"ETag": etag})
+
+    @app.get("/youtube/v3/channels")
+    async def youtube_channels(id: str = ""):
+        channel_id = id.split(",")[0]
+        video_ids = sim.channel_video_ids(channel_id)
+        views = sum(int(sim.video(video_id, ["statistics"])["statistics"]["viewCount"]) for video_id in video_ids)
+        return {"kind": "youtube#channelListResponse", "items": [{
+            "id": channel_id,
+            "snippet": {
+                "title": f"Simulated channel {channel_id}",
+                "description": "",
+                "publishedAt": EPOCH.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "thumbnails": {}
+            },
+            "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}},
+            "statistics": {
+                "viewCount": str(views),
+                "subscriberCount": str(views // 100),
+                "videoCount": str(len(video_ids))
+            }
+        }]}
+
+    @app.get("/youtube/v3/playlistItems")
+    async def youtube_playlist_items(playlistId: str = "", maxResults: int = 5, pageToken: Optional[str] = None):
+        video_ids = sim.channel_video_ids("UC" + playlistId[2:])
+        start, end = page_bounds(pageToken, min(max(maxResults, 0), 50))
+        items = []
+        for video_id in video_ids[start:end]:
+            snippet = sim.video(video_id, ["snippet"])["snippet"]
+            items.append({
+                "kind": "youtube#playlistItem",
+                "snippet": {"title": snippet["title"], "publishedAt": snippet["publishedAt"]},
+                "contentDetails": {"videoId": video_id, "videoPublishedAt": snippet["publishedAt"]}
+            })
+        body: Dict[str, Any] = {"items": items, "pageInfo": {"totalResults": len(video_ids), "resultsPerPage": maxResults}}
+        if end < len(video_ids):
+            body["nextPageToken"] = str(end)
+        return body
+
+    # YouTube Analytics API v2
+
+    @app.get("/youtubeanalytics/v2/reports")
+    async def youtube_reports(maxResults: int = 200, startIndex: int = 1):
+        video_ids = sim.channel_video_ids("UCsimulated")
+        rows = []
+        for video_id in video_ids[startIndex - 1:startIndex - 1 + maxResults]:
+            views = int(sim.video(video_id, ["statistics"])["statistics"]["viewCount"])
+            h = sim._hash("analytics", video_id)
+            duration = 30 + h % 600
+            rows.append([video_id, views, round(views * duration / 60), duration, round(20 + h % 6000 / 100, 2)])
+        return {
+            "kind": "youtubeAnalytics#resultTable",
+            "columnHeaders": [
+                {"name": "video", "columnType": "DIMENSION", "dataType": "STRING"},
+                {"name": "views", "columnType": "METRIC", "dataType": "INTEGER"},
+                {"name": "estimatedMinutesWatched", "columnType": "METRIC", "dataType": "INTEGER"},
+                {"name": "averageViewDuration", "columnType": "METRIC", "dataType": "INTEGER"},
+                {"name": "averageViewPercentage", "columnType": "METRIC", "dataType": "FLOAT"}
+            ],
+            "rows": rows
+        }
+
+    # Google OAuth
+
+    @app.post("/oauth2/token")
+    async def oauth_token(request: Request):
+        # Parsed by hand; request.form() needs python-multipart
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+        body = {
+            "access_token": "ya29.sim-" + sim._token("access", time.time(), length=32),
+            "expires_in": 3599,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/youtube.readonly"
+        }
+        if form.get("grant_type") == "authorization_code":
+            body["refresh_token"] = "1//sim-" + sim._token("refresh", form.get("code"), length=32)
+        return body
+
+    # Stripe
+
+    @app.get("/stripe/v1/balance")
+    async def stripe_balance():
+        return {"object": "balance", "available": [{"amount": 125000, "currency": "usd"}], "pending": []}
+
+    @app.get("/stripe/v1/payment_intents")
+    async def stripe_payment_intents(limit: int = 10, starting_after: Optional[str] = None):
+        payments = sim.payment_intents()
+        start = 0
+        if starting_after:
+            start = next((i + 1 for i, p in enumerate(payments) if p["id"] == starting_after), len(payments))
+        page = payments[start:start + min(max(limit, 1), 100)]
+        return {
+            "object": "list",
+            "url": "/v1/payment_intents",
+            "data": page,
+            "has_more": start + len(page) < len(payments)
+        }
+
+    @app.get("/stripe/v1/payment_intents/{payment_id}")
+    async def stripe_payment_intent(payment_id: str):
+        for payment in sim.payment_intents():
+            if payment["id"] == payment_id:
+                return payment
+        return JSONResponse({"error": {"type": "invalid_request_error", "code": "resource_missing",
+                                       "message": f"No such payment_intent: '{payment_id}'"}}, status_code=404)
+
+    @app.get("/stripe/v1/customers/{customer_id}")
+    async def stripe_customer(customer_id: str):
+        h = sim._hash("customer", customer_id)
+        return {"id": customer_id, "object": "customer", "email": f"customer{h % 1000}@example.com",
+                "name": f"Customer {h % 1000}"}
+
+    # Calendly
+
+    @app.get("/calendly/users/me")
+    async def calendly_me():
+        return {"resource": {
+            "uri": "https://api.calendly.com/users/SIMULATED",
+            "name": "Simulated User",
+            "email": "owner@example.com",
+            "current_organization": "https://api.calendly.com/organizations/SIMULATED"
+        }}
+
+    @app.get("/calendly/scheduled_events")
+    async def calendly_events(request: Request, count: int = 20, page_token: Optional[str] = None):
+        events = sim.scheduled_events()
+        start, end = page_bounds(page_token, min(max(count, 1), 100))
+        next_page = None
+        if end < len(events):
+            next_page = str(request.url.include_query_params(page_token=str(end)))
+        return {
+            "collection": events[start:end],
+            "pagination": {"count": len(events[start:end]), "next_page": next_page, "next_page_token": str(end) if next_page else None}
+        }
+
+    @app.get("/calendly/scheduled_events/{event_uuid}")
+    async def calendly_event(event_uuid: str):
+        for event in sim.scheduled_events():
+            if event["uri"].endswith(f"/{event_uuid}"):
+                return {"resource": event}
+        return JSONResponse({"title": "Resource Not Found", "message": "The server could not find the requested resource."},
+                            status_code=404)
+
+    @app.get("/calendly/scheduled_events/{event_uuid}/invitees")
+    async def calendly_invitees(event_uuid: str):
+        h = sim._hash("invitee", event_uuid)
+        return {"collection": [{
+            "uri": f"https://api.calendly.com/scheduled_events/{event_uuid}/invitees/{event_uuid[::-1]}",
+            "email": f"customer{h % 1000}@example.com",
+            "name": f"Customer {h % 1000}",
+            "status": "active",
+            "tracking": {"utm_source": "youtube", "utm_medium": "video", "utm_campaign": None, "utm_content": None}
+        }], "pagination": {"count": 1, "next_page": None}}
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run an offline stand-in for the YouTube, Google OAuth, Stripe and Calendly APIs"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8010, help="Port to listen on (default: 8010)")
+    parser.add_argument(
+        "--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+        help="Latency distribution (default: lognormal)"
+    )
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Mean latency in ms (default: 80)")
+    parser.add_argument(
+        "--latency-jitter-ms", type=float, default=40.0,
+        help="Standard deviation for normal/lognormal latency in ms (default: 40)"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument(
+        "--quota-error-rate", type=float, default=0.0,
+        help="Fraction of requests failing with the API's quota/rate-limit error"
+    )
+    parser.add_argument("--videos", type=int, default=250, help="Uploads per simulated channel (default: 250)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the generated data and faults")
+    return parser.parse_args()
+
+def main():
+    import uvicorn
+
+    args = parse_args()
+    config = SimulatorConfig(
+        latency=args.latency,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        quota_error_rate=args.quota_error_rate,
+        videos=args.videos,
+        seed=args.seed
+    )
+    logger.info(f"API simulator listening on http://{args.host}:{args.port} with {asdict(config)}")
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
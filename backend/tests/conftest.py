@@ -0,0 +1,73 @@
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the backend directory to sys.path to allow absolute imports
+backend_dir = str(Path(__file__).resolve().parent.parent)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Settings are read at import time, so point the app at a scratch database
+# and the local API simulator before anything from app/ is imported
+_tmpdir = tempfile.mkdtemp(prefix="insyte-tests-")
+SIMULATOR_PORT = _free_port()
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_tmpdir, 'test.db')}",
+    YOUTUBE_CACHE_PATH=os.path.join(_tmpdir, "youtube_cache.db"),
+    API_SIMULATOR_URL=f"http://127.0.0.1:{SIMULATOR_PORT}",
+    YOUTUBE_API_KEY="test-key",
+    STRIPE_API_KEY="sk_test_simulator",
+    HTTP_BACKOFF_SECONDS="0"
+)
+
+from app.database import SessionLocal, engine
+from app.migrations import run_migrations
+from app.models import AttributionCredit, BookingEvent, ClickEvent, Link, SaleEvent, VideoMetrics, VideoMetricsSnapshot
+
+@pytest.fixture(scope="session")
+def simulator():
+    """The API simulator on SIMULATOR_PORT, with latency turned down"""
+    import uvicorn
+    from simulator import SimulatorConfig, create_app
+
+    config = SimulatorConfig(latency="fixed", latency_ms=1.0, latency_jitter_ms=0.0)
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=SIMULATOR_PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Simulator didn't start")
+        time.sleep(0.05)
+    yield config
+    server.should_exit = True
+    thread.join(timeout=5)
+
+@pytest.fixture(scope="session")
+def schema():
+    run_migrations(engine)
+    return engine
+
+@pytest.fixture
+def db(schema):
+    """A session on the migrated scratch database, emptied after the test"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for model in (AttributionCredit, SaleEvent, BookingEvent, ClickEvent, Link, VideoMetricsSnapshot, VideoMetrics):
+            session.query(model).delete()
+        session.commit()
+        session.close()
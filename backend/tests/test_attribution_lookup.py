@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_read_db
+from app.models import BookingEvent, ClickEvent, SaleEvent, VideoMetrics
+from app.routes import webhooks
+
+
+def test_attribution_by_email_finds_a_sale_behind_a_newer_booking(db):
+    app = FastAPI()
+    app.include_router(webhooks.router)
+    app.dependency_overrides[get_read_db] = lambda: db
+
+    video = VideoMetrics(slug="lookup", title="Lookup")
+    db.add(video)
+    db.flush()
+    click = ClickEvent(video_id=video.id, ip_address="10.0.0.1", user_agent="test")
+    db.add(click)
+    db.flush()
+    now = datetime.utcnow()
+    converted = BookingEvent(click_id=click.id, email="buyer@example.com", name="Buyer", timestamp=now - timedelta(days=10))
+    db.add(converted)
+    db.flush()
+    sale = SaleEvent(booking_id=converted.id, amount=997.0, timestamp=now - timedelta(days=9))
+    db.add(sale)
+    # A later booking by the same customer that hasn't turned into a sale
+    db.add(BookingEvent(click_id=click.id, email="Buyer@Example.com ", name="Buyer", timestamp=now - timedelta(days=1)))
+    db.commit()
+
+    client = TestClient(app)
+    response = client.get("/webhooks/attribution", params={"email": "buyer@example.com"})
+    assert response.status_code == 200
+    assert response.json()["sale"]["id"] == sale.id
+
+    assert client.get("/webhooks/attribution", params={"email": "nobody@example.com"}).status_code == 404
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from app.models import VideoMetrics
+from app.services import youtube
+from app.services.channel_discovery import discover_channel
+from app.services.refresh_scheduler import NEW_VIDEO_HEAT, refresh_heat, video_age
+
+
+def test_discovered_videos_are_aged_by_publish_date(simulator, db):
+    result = discover_channel(db, "UCsimulated")
+    assert result["videos"] == simulator.videos
+
+    now = datetime.utcnow()
+    videos = db.query(VideoMetrics).all()
+    assert len(videos) == simulator.videos
+    for video in videos:
+        # The simulator publishes its uploads during 2024
+        assert datetime(2024, 1, 1) <= video.published_at < datetime(2025, 1, 1)
+        assert video_age(video, now) > timedelta(days=365)
+        # The back catalogue is not treated as brand new
+        assert refresh_heat(video_age(video, now), 0.0, None) < NEW_VIDEO_HEAT / 100
+
+
+def test_channel_statistics_use_the_oauth_token_without_an_api_key(simulator, db, monkeypatch):
+    monkeypatch.setattr(youtube, "YOUTUBE_API_KEY", None)
+    monkeypatch.setattr(youtube, "get_authorization_header", lambda db=None: {"Authorization": "Bearer test-token"})
+
+    channel = youtube.get_channel_statistics("UCsimulated", db)
+
+    assert channel is not None
+    assert channel["uploads_playlist_id"] == "UUsimulated"
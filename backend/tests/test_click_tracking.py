@@ -0,0 +1,26 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.models import ClickEvent, Link
+from app.routes import links, redirect
+from app.services.metrics import tracked_events
+
+
+def test_both_redirect_routes_count_clicks(db):
+    app = FastAPI()
+    app.include_router(links.router)
+    app.include_router(redirect.router)
+    app.dependency_overrides[get_db] = lambda: db
+    db.add(Link(slug="launch", title="Launch", destination_url="https://example.com/offer"))
+    db.commit()
+
+    before = tracked_events.values().get(("click",), 0.0)
+    client = TestClient(app, follow_redirects=False)
+    for path in ("/links/go/launch", "/go/launch"):
+        response = client.get(path)
+        assert response.status_code in (302, 307)
+        assert response.headers["location"].startswith("https://example.com/offer?utm_source=youtube")
+
+    assert db.query(ClickEvent).count() == 2
+    assert tracked_events.values()[("click",)] - before == 2
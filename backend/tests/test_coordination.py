@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from app.database import create_db_engine
+from app.services.coordination import WorkerCoordinator, advisory_lock_key
+
+# Advisory locks need a real server, e.g.
+#   TEST_POSTGRES_URL=postgresql://postgres@localhost:5432/scratch
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+
+
+def lock_is_free(engine, name: str) -> bool:
+    with engine.connect() as conn:
+        key = advisory_lock_key(name)
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar()
+        if acquired:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+        conn.commit()
+        return bool(acquired)
+
+
+@pytest.fixture
+def engines():
+    worker_engine = create_db_engine(TEST_POSTGRES_URL, "postgres")
+    other_engine = create_db_engine(TEST_POSTGRES_URL, "postgres")
+    yield worker_engine, other_engine
+    worker_engine.dispose()
+    other_engine.dispose()
+
+
+def test_release_all_frees_advisory_locks(engines):
+    worker_engine, other_engine = engines
+    coordinator = WorkerCoordinator(worker_engine, worker_id="test-worker")
+
+    assert coordinator.try_acquire("test-singleton")
+    assert not lock_is_free(other_engine, "test-singleton")
+
+    coordinator.release_all()
+
+    # The connection went back to the pool, but the lock must not have gone with it
+    assert worker_engine.pool.checkedin() >= 1
+    assert lock_is_free(other_engine, "test-singleton")
+
+
+def test_lock_is_free_after_a_broken_connection_is_reset(engines):
+    worker_engine, other_engine = engines
+    coordinator = WorkerCoordinator(worker_engine, worker_id="test-worker")
+    assert coordinator.try_acquire("test-singleton")
+
+    # Leave the session in an aborted transaction so the unlock fails
+    with pytest.raises(Exception):
+        coordinator._lock_conn.execute(text("SELECT 1/0"))
+    coordinator.release_all()
+
+    assert lock_is_free(other_engine, "test-singleton")
+    assert coordinator.try_acquire("test-singleton")
+    coordinator.release_all()
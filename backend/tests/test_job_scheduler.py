@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+
+from app.services.job_scheduler import AsyncScheduler
+
+
+def test_timed_out_thread_blocks_next_run_until_it_finishes():
+    lock = threading.Lock()
+    state = {"active": 0, "max_active": 0, "finished": 0}
+
+    def blocking_work():
+        with lock:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        time.sleep(0.6)
+        with lock:
+            state["active"] -= 1
+            state["finished"] += 1
+
+    async def job():
+        await asyncio.to_thread(blocking_work)
+
+    async def main():
+        scheduler = AsyncScheduler()
+        scheduler.add_job("slow", job, interval=0.2, timeout=0.1, jitter=0)
+        asyncio.get_running_loop().call_later(1.0, scheduler.stop)
+        await scheduler.run()
+        return scheduler.stats()["slow"]
+
+    stats = asyncio.run(main())
+
+    # The thread outlives each timeout, and no run starts while it's busy
+    assert state["max_active"] == 1
+    assert stats["timeouts"] >= 1
+    assert stats["skipped"] >= 1
+    # run() returns only once the last thread is done
+    assert state["active"] == 0
+    assert state["finished"] == stats["runs"]
+    assert stats["running"] is False
+    assert stats["last_duration_s"] >= 0.6
+
+
+def test_completed_jobs_are_not_held():
+    async def job():
+        await asyncio.to_thread(time.sleep, 0.01)
+
+    async def main():
+        scheduler = AsyncScheduler()
+        scheduler.add_job("quick", job, interval=0.1, timeout=1, jitter=0)
+        asyncio.get_running_loop().call_later(0.35, scheduler.stop)
+        await scheduler.run()
+        return scheduler.stats()["quick"]
+
+    stats = asyncio.run(main())
+    assert stats["runs"] >= 3
+    assert stats["skipped"] == 0
+    assert stats["timeouts"] == 0
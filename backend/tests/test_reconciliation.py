@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import stripe
+
+from app.models import BookingEvent, ClickEvent, SaleEvent, VideoMetrics
+from app.services.reconciliation import reconcile_stripe_payments
+from app.services.stripe import list_recent_payments
+
+
+def test_reconciles_simulator_payments_as_stripe_objects(simulator, db):
+    payments = list_recent_payments(100)
+    assert payments
+    # The SDK's own objects, not dicts, as in production
+    assert all(isinstance(payment, stripe.StripeObject) and not isinstance(payment, dict) for payment in payments)
+    succeeded = [payment for payment in payments if payment["status"] == "succeeded"]
+    assert 0 < len(succeeded) < len(payments)
+
+    video = VideoMetrics(slug="reconcile", title="Reconcile")
+    db.add(video)
+    db.flush()
+    click = ClickEvent(video_id=video.id, ip_address="10.0.0.1", user_agent="test")
+    db.add(click)
+    db.flush()
+    booked_at = datetime.utcnow() - timedelta(days=30)
+    for email in {payment["receipt_email"] for payment in succeeded}:
+        db.add(BookingEvent(click_id=click.id, email=email, name="Customer", timestamp=booked_at))
+    db.commit()
+
+    result = reconcile_stripe_payments(db, limit=100)
+    assert result == {"checked": len(succeeded), "recovered": len(succeeded), "unattributed": 0}
+    sales = db.query(SaleEvent).all()
+    assert {sale.external_id for sale in sales} == {payment["id"] for payment in succeeded}
+    assert {sale.external_id: sale.amount for sale in sales} == {
+        payment["id"]: payment["amount"] / 100 for payment in succeeded
+    }
+
+    # Already recorded payments are left alone
+    again = reconcile_stripe_payments(db, limit=100)
+    assert again["recovered"] == 0
+    assert db.query(SaleEvent).count() == len(succeeded)
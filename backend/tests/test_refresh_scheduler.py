@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from app.models import ClickEvent, VideoMetrics
+from app.services.refresh_scheduler import QuotaBudget, plan_refresh
+
+
+def add_video(db, name: str, created_at: datetime, last_refreshed_at=None, next_refresh_at=None) -> int:
+    video = VideoMetrics(
+        slug=name, title=name, youtube_id=f"yt-{name}", created_at=created_at,
+        last_refreshed_at=last_refreshed_at, next_refresh_at=next_refresh_at
+    )
+    db.add(video)
+    db.flush()
+    return video.id
+
+
+def test_due_queue_follows_next_refresh_at(db):
+    now = datetime(2026, 3, 1, 12, 0)
+    old = now - timedelta(days=365)
+    never = add_video(db, "never", old)
+    overdue = add_video(db, "overdue", old, now - timedelta(hours=7), now - timedelta(hours=1))
+    # Refreshed long enough ago that last_refreshed_at plus the cold interval
+    # has passed, but the stored next_refresh_at is still ahead
+    add_video(db, "scheduled", old, now - timedelta(hours=7), now + timedelta(hours=1))
+    db.commit()
+
+    assert plan_refresh(db, QuotaBudget(daily_units=10000), now) == [never, overdue]
+
+
+def test_clicks_pull_a_scheduled_video_forward(db):
+    now = datetime(2026, 3, 1, 12, 0)
+    old = now - timedelta(days=365)
+    clicked = add_video(db, "clicked", old, now - timedelta(hours=2), now + timedelta(hours=4))
+    add_video(db, "quiet", old, now - timedelta(hours=2), now + timedelta(hours=4))
+    db.add_all([
+        ClickEvent(video_id=clicked, ip_address="10.0.0.1", user_agent="test", timestamp=now - timedelta(minutes=i))
+        for i in range(120)
+    ])
+    db.commit()
+
+    assert plan_refresh(db, QuotaBudget(daily_units=10000), now) == [clicked]
+
+
+def test_budget_defers_the_rest(db):
+    now = datetime(2026, 3, 1, 12, 0)
+    old = now - timedelta(days=365)
+    first = add_video(db, "first", old, now - timedelta(hours=9), now - timedelta(hours=3))
+    for i in range(60):
+        add_video(db, f"later-{i}", old, now - timedelta(hours=7), now - timedelta(hours=1))
+    db.commit()
+
+    # One unit buys one 50-id videos.list call; the most overdue video comes first
+    due = plan_refresh(db, QuotaBudget(daily_units=1), now.replace(hour=23, minute=59))
+    assert len(due) == 50
+    assert due[0] == first
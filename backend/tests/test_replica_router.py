@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.database import ReplicaRouter, create_db_engine
+from app.models import ReplicationHeartbeat
+
+
+@pytest.fixture
+def primary(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'primary.db'}", "sqlite")
+    ReplicationHeartbeat.__table__.create(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def in_sync_replica(tmp_path, primary):
+    # A second engine on the primary's file sees every heartbeat at once,
+    # like a replica with no replication lag
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'primary.db'}", "sqlite")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def lagging_replica(tmp_path):
+    # A separate file whose heartbeat only moves when the test says so
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'replica.db'}", "sqlite")
+    ReplicationHeartbeat.__table__.create(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def stamp(engine, heartbeat_at: float) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM replication_heartbeat"))
+        conn.execute(text("INSERT INTO replication_heartbeat (id, heartbeat_at) VALUES (1, :at)"), {"at": heartbeat_at})
+
+
+def test_replica_with_fresh_heartbeat_is_used(primary, in_sync_replica):
+    router = ReplicaRouter(primary, in_sync_replica, max_lag=30, check_interval=60)
+    router.write_heartbeat()
+
+    assert router.check()
+    assert 0 <= router.lag < 1
+    assert router.use_replica()
+    assert router.stats()["in_use"]
+
+
+def test_replica_is_bypassed_while_lagging_and_used_once_caught_up(primary, lagging_replica):
+    router = ReplicaRouter(primary, lagging_replica, max_lag=30, check_interval=60)
+    router.write_heartbeat()
+    stamp(lagging_replica, time.time() - 120)
+
+    assert not router.check()
+    assert router.lag > 30
+
+    # Replication catches up
+    stamp(lagging_replica, time.time())
+    assert router.check()
+
+
+def test_replica_without_heartbeat_table_is_bypassed(primary, tmp_path):
+    replica = create_db_engine(f"sqlite:///{tmp_path / 'empty.db'}", "sqlite")
+    router = ReplicaRouter(primary, replica, max_lag=30, check_interval=60)
+
+    assert not router.check()
+    assert router.lag is None
+    replica.dispose()
+
+
+def test_background_task_keeps_the_replica_in_use(primary, in_sync_replica):
+    router = ReplicaRouter(primary, in_sync_replica, max_lag=0.5, check_interval=0.05)
+
+    async def main():
+        task = asyncio.create_task(router.run())
+        await asyncio.sleep(0.3)
+        task.cancel()
+
+    asyncio.run(main())
+
+    assert router.healthy
+    assert router.lag < 0.5
+
+
+def test_read_session_routes_to_the_replica(primary, in_sync_replica, monkeypatch):
+    router = ReplicaRouter(primary, in_sync_replica, max_lag=30, check_interval=60)
+    monkeypatch.setattr(database, "replica_router", router)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=primary))
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=in_sync_replica))
+
+    router.write_heartbeat()
+    router.check()
+    with database.read_session() as session:
+        assert session.get_bind() is in_sync_replica
+
+    router.mark_unhealthy()
+    with database.read_session() as session:
+        assert session.get_bind() is primary
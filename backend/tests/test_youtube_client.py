@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from app.services import youtube
+from app.services.response_cache import ResponseCache, cache_key
+from app.services.youtube import AsyncYouTubeClient
+
+
+def test_cache_is_used_off_the_event_loop(simulator, tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache.db"))
+    calls = []
+    for name in ("get", "put", "touch"):
+        method = getattr(cache, name)
+
+        def record(*args, _name=name, _method=method):
+            calls.append((_name, threading.get_ident()))
+            return _method(*args)
+
+        monkeypatch.setattr(cache, name, record)
+    monkeypatch.setattr(youtube, "youtube_cache", cache)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        params = {"key": "test-key", "part": "snippet", "id": "abc"}
+        key = cache_key("videos", ["abc"], "snippet")
+        async with AsyncYouTubeClient() as client:
+            first = await client.get("/videos", params, {}, key=key)
+            # Unchanged snippet: the simulator answers 304
+            second = await client.get("/videos", params, {}, key=key)
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(main())
+
+    assert first["items"] == second["items"]
+    assert [name for name, _ in calls] == ["get", "put", "get", "touch"]
+    assert all(thread != loop_thread for _, thread in calls)
+    assert cache.not_modified == 1
@@ -1,6 +1,5 @@
 import asyncio
-import schedule
-import time
+import signal
 import logging
 from datetime import datetime
 import sys
@@ -25,70 +24,195 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import app modules after setting up path
-from app.config import YOUTUBE_REFRESH_INTERVAL
-from app.services.youtube import get_video_statistics
+from datetime import timedelta
+from app.config import (
+    YOUTUBE_SCHEDULER_TICK_MINUTES,
+    ATTRIBUTION_ROLLUP_INTERVAL,
+    ATTRIBUTION_ROLLUP_DAYS,
+    ANALYTICS_INGEST_INTERVAL,
+    STRIPE_RECONCILE_INTERVAL_MINUTES,
+    STRIPE_RECONCILE_LIMIT,
+    WORKER_JOB_JITTER,
+    WORKER_HEARTBEAT_SECONDS,
+    WORKER_METRICS_PORT
+)
+from app.database import SessionLocal, engine
+from app.services.analytics_ingest import ingest_video_analytics
+from app.services.coordination import WorkerCoordinator
+from app.services.job_scheduler import AsyncScheduler, JobFunc
+from app.services.metrics import start_metrics_server
+from app.services.metrics_refresh import refresh_due_videos
+from app.services.multitouch import compute_attribution_credit
+from app.services.query_stats import query_monitor
+from app.services.reconciliation import reconcile_stripe_payments
+from app.services.refresh_scheduler import QuotaBudget
+from app.services.snapshots import downsample_snapshots
+
+# Slow-query log (with EXPLAIN plans) for job queries
+query_monitor.instrument(engine)
+
+# Daily Data API quota shared by every refresh tick
+quota_budget = QuotaBudget()
+
+# Leases for singleton jobs and shards for partitioned work when several
+# worker instances share the database
+coordinator = WorkerCoordinator(engine)
+
+def singleton(name: str, func: JobFunc) -> JobFunc:
+    """Wrap a job so only the worker holding its lock runs it"""
+    async def run():
+        if not await asyncio.to_thread(coordinator.try_acquire, name):
+            logger.info(f"Job {name} is owned by another worker, skipping")
+            return
+        await func()
+    return run
+
+async def send_heartbeat():
+    """Report this worker alive and renew its leases"""
+    await asyncio.to_thread(coordinator.heartbeat)
 
 async def refresh_youtube_data():
-    """Refresh all YouTube video data"""
+    """Refresh the due YouTube videos in this worker's shard"""
+    db = SessionLocal()
     try:
-        # Here we would query the database for all tracked videos
-        # and update their metrics
-        # This is a simplified placeholder
-        logger.info("Starting YouTube data refresh")
-        
-        # For now, just log that we would update data
-        # In the real implementation, you would:
-        # 1. Query all VideoMetrics from the database
-        # 2. For each video, call get_video_statistics
-        # 3. Update the database with new metrics
-        
-        logger.info(f"YouTube metrics refreshed at {datetime.now().isoformat()}")
-        return True
-    except Exception as e:
-        logger.error(f"Error refreshing YouTube metrics: {e}")
-        return False
+        # Videos picked by the adaptive scheduler within the quota budget,
+        # 50 per videos.list request, with batches fetched concurrently;
+        # each live worker takes the videos whose id falls in its shard
+        shard = await asyncio.to_thread(coordinator.shard)
+        result = await refresh_due_videos(db, quota_budget, shard)
+        logger.info(f"YouTube metrics refreshed at {datetime.now().isoformat()}: {result}")
+    finally:
+        db.close()
+
+def _rollup_attribution_credit():
+    db = SessionLocal()
+    try:
+        end = datetime.utcnow()
+        start = end - timedelta(days=ATTRIBUTION_ROLLUP_DAYS)
+        rows = compute_attribution_credit(db, start, end)
+        logger.info(f"Attribution credit recomputed ({rows} rows)")
+    finally:
+        db.close()
+
+async def rollup_attribution_credit():
+    """Recompute multi-touch attribution credit for recent sales"""
+    await asyncio.to_thread(_rollup_attribution_credit)
+
+def _compact_snapshots():
+    db = SessionLocal()
+    try:
+        removed = downsample_snapshots(db)
+        logger.info(f"Snapshot history compacted ({removed} rows removed)")
+    finally:
+        db.close()
+
+async def compact_snapshots():
+    """Downsample old video metrics snapshots (retention)"""
+    await asyncio.to_thread(_compact_snapshots)
+
+def _ingest_analytics():
+    db = SessionLocal()
+    try:
+        ingest_video_analytics(db)
+    finally:
+        db.close()
+
+async def ingest_analytics():
+    """Update watch time and retention from the YouTube Analytics report"""
+    await asyncio.to_thread(_ingest_analytics)
+
+def _reconcile_payments():
+    db = SessionLocal()
+    try:
+        reconcile_stripe_payments(db, STRIPE_RECONCILE_LIMIT)
+    finally:
+        db.close()
+
+async def reconcile_payments():
+    """Record recent Stripe payments whose webhook was missed"""
+    await asyncio.to_thread(_reconcile_payments)
+
+def build_scheduler() -> AsyncScheduler:
+    """Register the worker's periodic jobs"""
+    scheduler = AsyncScheduler()
+
+    scheduler.add_job(
+        "worker_heartbeat",
+        send_heartbeat,
+        interval=WORKER_HEARTBEAT_SECONDS,
+        timeout=WORKER_HEARTBEAT_SECONDS,
+        jitter=0
+    )
+
+    # Each YouTube tick only fetches the videos that are due; sharded
+    # across workers rather than singleton
+    scheduler.add_job(
+        "youtube_refresh",
+        refresh_youtube_data,
+        interval=YOUTUBE_SCHEDULER_TICK_MINUTES * 60,
+        timeout=YOUTUBE_SCHEDULER_TICK_MINUTES * 60,
+        jitter=WORKER_JOB_JITTER
+    )
+    scheduler.add_job(
+        "attribution_rollup",
+        singleton("attribution_rollup", rollup_attribution_credit),
+        interval=ATTRIBUTION_ROLLUP_INTERVAL * 3600,
+        timeout=ATTRIBUTION_ROLLUP_INTERVAL * 3600,
+        jitter=WORKER_JOB_JITTER
+    )
+    scheduler.add_job(
+        "snapshot_retention",
+        singleton("snapshot_retention", compact_snapshots),
+        interval=24 * 3600,
+        timeout=3600,
+        jitter=WORKER_JOB_JITTER
+    )
+    scheduler.add_job(
+        "analytics_ingest",
+        singleton("analytics_ingest", ingest_analytics),
+        interval=ANALYTICS_INGEST_INTERVAL * 3600,
+        timeout=1800,
+        jitter=WORKER_JOB_JITTER
+    )
+    scheduler.add_job(
+        "stripe_reconciliation",
+        singleton("stripe_reconciliation", reconcile_payments),
+        interval=STRIPE_RECONCILE_INTERVAL_MINUTES * 60,
+        timeout=300,
+        jitter=WORKER_JOB_JITTER
+    )
+    return scheduler
+
+async def main():
+    """Run the scheduler on one event loop until SIGINT/SIGTERM"""
+    scheduler = build_scheduler()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, scheduler.stop)
+        except NotImplementedError:
+            # Not supported on Windows; Ctrl+C still raises KeyboardInterrupt
+            pass
+
+    if WORKER_METRICS_PORT:
+        # Job durations, outbound API calls and reconciled sales for Prometheus
+        start_metrics_server(WORKER_METRICS_PORT)
 
-def run_async_task(coroutine):
-    """Run an async task from a sync context"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    logger.info(f"Starting scheduler as worker {coordinator.worker_id}")
     try:
-        return loop.run_until_complete(coroutine)
+        await scheduler.run()
     finally:
-        loop.close()
-
-def youtube_refresh_job():
-    """Wrapper to run the async refresh job"""
-    logger.info("Running scheduled YouTube refresh job")
-    success = run_async_task(refresh_youtube_data())
-    if success:
-        logger.info("YouTube refresh completed successfully")
-    else:
-        logger.error("YouTube refresh failed")
-
-def start_scheduler():
-    """Start the scheduler for periodic tasks"""
-    logger.info("Starting scheduler")
-    
-    # Schedule YouTube refresh
-    interval_hours = YOUTUBE_REFRESH_INTERVAL
-    logger.info(f"Scheduling YouTube refresh every {interval_hours} hours")
-    
-    schedule.every(interval_hours).hours.do(youtube_refresh_job)
-    
-    # Run once at startup
-    youtube_refresh_job()
-    
-    # Keep running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+        # Hand singleton jobs and shards over to the other workers now
+        # rather than after the lease expires
+        await asyncio.to_thread(coordinator.stop)
+    logger.info(f"Scheduler stopped: {scheduler.stats()}")
 
 if __name__ == "__main__":
     logger.info("Worker process starting")
     try:
-        start_scheduler()
+        asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Worker process stopped by user")
     except Exception as e:
-        logger.error(f"Worker process failed with error: {e}") 
\ No newline at end of file
+        logger.error(f"Worker process failed with error: {e}")